@@ -0,0 +1,194 @@
+import random
+import threading
+import time
+import logging
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class OllamaClient:
+    """
+    Transporte HTTP compartido para Ollama.
+    - Pool de conexiones keep-alive (requests.Session + HTTPAdapter)
+    - Timeout por llamada
+    - Reintentos con backoff exponencial + jitter en 5xx y errores de conexión
+    - Contadores de peticiones y latencia
+    """
+
+    RETRY_STATUS = {500, 502, 503, 504}
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        timeout: float = 120,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        pool_size: int = 16
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        logging.basicConfig(level=logging.INFO)
+        self.logger = logging.getLogger(__name__)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "total_latency": 0.0,
+            "by_endpoint": {}
+        }
+
+    # ===============================
+    # PUBLIC API
+    # ===============================
+
+    def post(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None
+    ) -> requests.Response:
+        """
+        POST con reintentos. Devuelve la respuesta (incluidos 4xx, y el último
+        5xx si se agotan los reintentos); relanza el error de conexión final.
+        """
+        return self._request("POST", path, json=payload, timeout=timeout, max_retries=max_retries)
+
+    def get(self, path: str, timeout: Optional[float] = None) -> requests.Response:
+        return self._request("GET", path, timeout=timeout, max_retries=0)
+
+    def generate(
+        self,
+        prompt: str,
+        model: str,
+        options: Optional[Dict[str, Any]] = None,
+        format: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Atajo para /api/generate sin streaming. Devuelve el texto generado.
+        """
+        payload = {"model": model, "prompt": prompt, "stream": False}
+        if options:
+            payload["options"] = options
+        if format:
+            payload["format"] = format
+
+        response = self.post("/api/generate", payload, timeout=timeout)
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Ollama generate error: {response.status_code} - {response.text}"
+            )
+        return response.json().get("response", "")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["by_endpoint"] = {
+                k: {**v, "total_latency": round(v["total_latency"], 4)}
+                for k, v in self._stats["by_endpoint"].items()
+            }
+
+        stats["avg_latency"] = (
+            round(stats["total_latency"] / stats["requests"], 4) if stats["requests"] else 0.0
+        )
+        stats["total_latency"] = round(stats["total_latency"], 4)
+        return stats
+
+    def next_retry(self, attempt: int, max_retries: Optional[int] = None) -> Optional[float]:
+        """
+        Espera antes del reintento `attempt + 1`, o None si ya se agotaron.
+        Política compartida con el transporte async (AsyncOllamaEmbedder).
+        """
+        retries = self.max_retries if max_retries is None else max_retries
+        if attempt >= retries:
+            return None
+        with self._lock:
+            self._stats["retries"] += 1
+        return self._backoff(attempt + 1)
+
+    def record(self, path: str, latency: float, failed: bool):
+        """Registra una petición (también las del transporte async)."""
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["total_latency"] += latency
+            if failed:
+                self._stats["failures"] += 1
+
+            endpoint = self._stats["by_endpoint"].setdefault(
+                path, {"requests": 0, "failures": 0, "total_latency": 0.0}
+            )
+            endpoint["requests"] += 1
+            endpoint["total_latency"] += latency
+            if failed:
+                endpoint["failures"] += 1
+
+    # ===============================
+    # INTERNAL METHODS
+    # ===============================
+
+    def _request(self, method: str, path: str, timeout=None, max_retries=None, **kwargs):
+        url = f"{self.base_url}{path}"
+        timeout = self.timeout if timeout is None else timeout
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.record(path, time.perf_counter() - start, failed=True)
+                delay = self.next_retry(attempt, max_retries)
+                if delay is None:
+                    raise
+                self.logger.warning(f"Ollama {path} connection error ({e}), retrying...")
+            else:
+                failed = response.status_code in self.RETRY_STATUS
+                self.record(path, time.perf_counter() - start, failed=failed)
+                if not failed:
+                    return response
+                delay = self.next_retry(attempt, max_retries)
+                if delay is None:
+                    return response
+                self.logger.warning(f"Ollama {path} returned {response.status_code}, retrying...")
+
+            attempt += 1
+            time.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": espera aleatoria en [0, min(max, base * 2^intento)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+# ===============================
+# CLIENTE COMPARTIDO POR PROCESO
+# ===============================
+
+_clients: Dict[str, OllamaClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_ollama_client(base_url: str = "http://localhost:11434") -> OllamaClient:
+    """
+    Devuelve el cliente compartido para `base_url` (uno por proceso),
+    de modo que embedder, QA, extractor y scripts reutilizan el mismo pool.
+    """
+    key = base_url.rstrip("/")
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = OllamaClient(base_url=key)
+        return _clients[key]
@@ -0,0 +1,266 @@
+import asyncio
+import threading
+import time
+from typing import List, Optional
+
+import httpx
+
+from embedding.ollama_embedder import OllamaEmbedder
+from embedding.embedding_cache import EmbeddingCache
+from embedding.batch_scheduler import AdaptiveBatchScheduler, estimate_tokens
+
+
+class AsyncOllamaEmbedder(OllamaEmbedder):
+    """
+    Variante asíncrona de OllamaEmbedder.
+    Mantiene hasta `max_concurrency` sub-batches en vuelo (semáforo) sobre un
+    único cliente httpx con pool de conexiones keep-alive.
+
+    El cliente y el semáforo viven en un event loop propio (un hilo por
+    instancia, creado en la primera llamada) que se reutiliza entre llamadas;
+    close() cierra ambos. Las llamadas síncronas y las async (desde cualquier
+    otro loop) se encolan en ese loop, así que el pool nunca cambia de loop.
+
+    Reintentos y backoff: los mismos que el OllamaClient del proceso (5xx y
+    errores de conexión), y si un sub-batch sigue fallando se reduce el
+    presupuesto del scheduler y se re-parte ese tramo, igual que en la ruta
+    síncrona.
+
+    Expone la misma API síncrona (embed_text / embed_batch), de modo que los
+    pipelines y el HybridRetriever pueden usarlo sin cambios; desde código
+    async se usan aembed_text / aembed_batch.
+    """
+
+    def __init__(
+        self,
+        model: str = "nomic-embed-text",
+        base_url: str = "http://localhost:11434",
+        timeout: int = 60,
+        batch_size: int = 64,
+        use_batch_endpoint: bool = True,
+        cache: Optional[EmbeddingCache] = None,
+        scheduler: Optional[AdaptiveBatchScheduler] = None,
+        max_concurrency: int = 4,
+        dimensions: Optional[int] = None,
+        max_batch_failures: int = 3
+    ):
+        super().__init__(
+            model=model,
+            base_url=base_url,
+            timeout=timeout,
+            batch_size=batch_size,
+            use_batch_endpoint=use_batch_endpoint,
+            cache=cache,
+            scheduler=scheduler,
+            max_batch_failures=max_batch_failures,
+            dimensions=dimensions
+        )
+        self.max_concurrency = max_concurrency
+
+        # Loop + hilo propios (lazy); cliente y semáforo solo se usan dentro de él
+        self._loop_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    # ===============================
+    # ASYNC API
+    # ===============================
+
+    async def aembed_text(self, text: str) -> List[float]:
+        return (await self.aembed_batch([text]))[0]
+
+    async def aembed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Igual que embed_batch (caché incluida) pero sin bloquear el event loop.
+        """
+        if self.cache is None:
+            return [self._truncate(e) for e in await self._aembed_batch_uncached(texts)]
+
+        results = self.cache.get_many(self.cache_key, texts)
+        missing = [i for i in range(len(texts)) if i not in results]
+
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            new_embeddings = [self._truncate(e) for e in await self._aembed_batch_uncached(missing_texts)]
+            self.cache.put_many(self.cache_key, missing_texts, new_embeddings)
+
+            for i, emb in zip(missing, new_embeddings):
+                results[i] = emb
+
+        return [results[i] for i in range(len(texts))]
+
+    def close(self):
+        """Cierra el cliente httpx y detiene el loop propio (si llegaron a crearse)."""
+        with self._loop_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+
+        if loop is None:
+            return
+        if self._http is not None:
+            asyncio.run_coroutine_threadsafe(self._http.aclose(), loop).result()
+            self._http = None
+        self._semaphore = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    # ===============================
+    # INTERNAL METHODS
+    # ===============================
+
+    def _embed_text_uncached(self, text: str) -> List[float]:
+        return self._run(self._aembed_all([text]))[0]
+
+    def _embed_batch_uncached(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._run(self._aembed_all(texts))
+
+    async def _aembed_batch_uncached(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        future = asyncio.run_coroutine_threadsafe(self._aembed_all(texts), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    def _run(self, coro):
+        """
+        Ejecuta una corrutina en el loop propio desde código síncrono.
+        Funciona igual si el llamante ya tiene un loop activo (Jupyter, Streamlit async).
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="async-ollama-embedder", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    # ---------- Dentro del loop propio ----------
+
+    async def _aembed_all(self, texts: List[str]) -> List[List[float]]:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Particionado por tokens con el presupuesto actual del scheduler;
+        # cada sub-batch reporta su latencia para ajustar los siguientes.
+        parts = await asyncio.gather(
+            *(self._aembed_span(texts[start:end]) for start, end in self.scheduler.split(texts))
+        )
+        # gather preserva el orden de entrada
+        return [emb for part in parts for emb in part]
+
+    async def _aembed_span(self, batch: List[str], failures: int = 0) -> List[List[float]]:
+        """
+        Un sub-batch. Si falla (tras los reintentos del transporte) se reduce
+        el presupuesto y se re-parte solo este tramo, como _embed_batch_uncached.
+        """
+        n_tokens = sum(estimate_tokens(t) for t in batch)
+        error = None
+
+        async with self._semaphore:
+            t0 = time.perf_counter()
+            try:
+                embeddings = None
+                if self.use_batch_endpoint:
+                    embeddings = await self._aembed_multi(batch)
+
+                if embeddings is None:
+                    embeddings = [await self._aembed_single(text) for text in batch]
+
+            except (RuntimeError, httpx.HTTPError) as e:
+                error = e
+            latency = time.perf_counter() - t0
+
+        self.scheduler.record(latency, n_tokens, ok=error is None)
+        if error is None:
+            return embeddings
+
+        # Reducción multiplicativa y reintento del mismo tramo con batches menores
+        failures += 1
+        if len(batch) == 1 or failures > self.max_batch_failures:
+            raise error
+        self.logger.warning(
+            f"Embedding batch failed ({error}), shrinking to {self.scheduler.token_budget} tokens"
+        )
+        parts = await asyncio.gather(
+            *(self._aembed_span(batch[start:end], failures) for start, end in self.scheduler.split(batch))
+        )
+        return [emb for part in parts for emb in part]
+
+    async def _apost(self, path: str, payload: dict) -> httpx.Response:
+        """
+        POST con la política de reintentos del OllamaClient compartido
+        (5xx y errores de conexión, backoff con jitter) y sus contadores.
+        """
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = await self._http.post(path, json=payload)
+            except httpx.TransportError as e:
+                self.client.record(path, time.perf_counter() - start, failed=True)
+                delay = self.client.next_retry(attempt)
+                if delay is None:
+                    raise
+                self.logger.warning(f"Ollama {path} connection error ({e}), retrying...")
+            else:
+                failed = response.status_code in self.client.RETRY_STATUS
+                self.client.record(path, time.perf_counter() - start, failed=failed)
+                if not failed:
+                    return response
+                delay = self.client.next_retry(attempt)
+                if delay is None:
+                    return response
+                self.logger.warning(f"Ollama {path} returned {response.status_code}, retrying...")
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _aembed_multi(self, batch: List[str]):
+        response = await self._apost("/api/embed", {"model": self.model, "input": batch})
+
+        if response.status_code in (404, 405) and "model" not in response.text.lower():
+            if self.use_batch_endpoint:
+                self.logger.warning(
+                    "Ollama server does not support /api/embed, falling back to /api/embeddings"
+                )
+                self.use_batch_endpoint = False
+            return None
+
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Ollama embedding error: {response.status_code} - {response.text}"
+            )
+
+        embeddings = response.json().get("embeddings")
+        if not embeddings or len(embeddings) != len(batch):
+            raise RuntimeError(
+                f"Ollama returned {len(embeddings or [])} embeddings for a batch of {len(batch)}"
+            )
+
+        return embeddings
+
+    async def _aembed_single(self, text: str) -> List[float]:
+        response = await self._apost("/api/embeddings", {"model": self.model, "prompt": text})
+
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Ollama embedding error: {response.status_code} - {response.text}"
+            )
+
+        return self._normalize(response.json()["embedding"])
@@ -0,0 +1,36 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+
+class BaseEmbedder(ABC):
+    """
+    Interfaz común de los backends de embedding.
+    Pipelines y HybridRetriever solo dependen de estos métodos/atributos.
+    """
+
+    model: str = ""
+    dimensions: Optional[int] = None
+    cache = None
+
+    @abstractmethod
+    def embed_text(self, text: str) -> List[float]:
+        """Embedding de un solo texto."""
+
+    @abstractmethod
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embeddings de varios textos, en el mismo orden de entrada."""
+
+    @property
+    def cache_key(self) -> str:
+        """
+        Identidad del espacio de embeddings (modelo + dimensión) para la caché.
+        """
+        if self.dimensions is None:
+            return self.model
+        return f"{self.model}@{self.dimensions}"
+
+    def health_check(self) -> bool:
+        return True
+
+    def close(self):
+        """Libera recursos propios del backend (no-op si no tiene)."""
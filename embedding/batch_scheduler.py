@@ -0,0 +1,120 @@
+import threading
+from typing import List, Dict, Tuple
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Misma estimación que AcademicChunker._estimate_tokens (≈ 4 chars/token).
+    """
+    return max(1, len(text) // 4)
+
+
+class AdaptiveBatchScheduler:
+    """
+    Dimensiona los sub-batches de embedding por tokens estimados (no por
+    número de textos) y ajusta el presupuesto estilo AIMD:
+    - incremento aditivo mientras la latencia observada esté bajo el objetivo
+    - reducción multiplicativa ante errores o latencia por encima del objetivo
+    Así se satura el Ollama local sin sobrecargarlo y sin pausas artificiales.
+    """
+
+    def __init__(
+        self,
+        initial_tokens: int = 4096,
+        min_tokens: int = 512,
+        max_tokens: int = 32768,
+        max_items: int = 64,
+        target_latency: float = 2.0,
+        increase_tokens: int = 1024,
+        decrease_factor: float = 0.5
+    ):
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self.max_items = max_items
+        self.target_latency = target_latency
+        self.increase_tokens = increase_tokens
+        self.decrease_factor = decrease_factor
+
+        self.token_budget = max(min_tokens, min(initial_tokens, max_tokens))
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "batches": 0,
+            "errors": 0,
+            "increases": 0,
+            "decreases": 0,
+            "tokens": 0,
+            "total_latency": 0.0
+        }
+
+    # ===============================
+    # PUBLIC API
+    # ===============================
+
+    def next_batch_end(self, texts: List[str], start: int) -> int:
+        """
+        Índice final (exclusivo) del siguiente sub-batch que cabe en el
+        presupuesto actual. Siempre incluye al menos un texto.
+        """
+        budget = self.token_budget
+        end = start
+        used = 0
+
+        while end < len(texts) and end - start < self.max_items:
+            tokens = estimate_tokens(texts[end])
+            if end > start and used + tokens > budget:
+                break
+            used += tokens
+            end += 1
+
+        return end
+
+    def split(self, texts: List[str]) -> List[Tuple[int, int]]:
+        """
+        Particiona todos los textos con el presupuesto actual
+        (para el modo concurrente, donde los batches salen a la vez).
+        """
+        spans = []
+        start = 0
+        while start < len(texts):
+            end = self.next_batch_end(texts, start)
+            spans.append((start, end))
+            start = end
+        return spans
+
+    def record(self, latency: float, tokens: int, ok: bool = True):
+        """
+        Registra el resultado de un sub-batch y ajusta el presupuesto (AIMD).
+        """
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["tokens"] += tokens
+            self._stats["total_latency"] += latency
+
+            if not ok:
+                self._stats["errors"] += 1
+                self._decrease()
+            elif latency > self.target_latency:
+                self._decrease()
+            elif tokens >= self.token_budget * 0.5:
+                # Solo crecemos si el batch realmente usó el presupuesto
+                self._stats["increases"] += 1
+                self.token_budget = min(self.max_tokens, self.token_budget + self.increase_tokens)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["token_budget"] = self.token_budget
+        stats["tokens_per_second"] = (
+            round(stats["tokens"] / stats["total_latency"], 1) if stats["total_latency"] else 0.0
+        )
+        stats["total_latency"] = round(stats["total_latency"], 4)
+        return stats
+
+    # ===============================
+    # INTERNAL METHODS
+    # ===============================
+
+    def _decrease(self):
+        self._stats["decreases"] += 1
+        self.token_budget = max(self.min_tokens, int(self.token_budget * self.decrease_factor))
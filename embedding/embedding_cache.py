@@ -0,0 +1,167 @@
+import os
+import sqlite3
+import hashlib
+import threading
+import time
+import logging
+from array import array
+from typing import List, Dict, Optional
+
+
+class EmbeddingCache:
+    """
+    Caché persistente de embeddings direccionada por contenido.
+    Clave = sha256(modelo + texto); valor = vector float32 serializado.
+    Evicción LRU acotada por número de entradas.
+    """
+
+    def __init__(
+        self,
+        path: str = "./embedding_cache.sqlite",
+        max_entries: int = 500_000
+    ):
+        self.path = path
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        logging.basicConfig(level=logging.INFO)
+        self.logger = logging.getLogger(__name__)
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        # Un solo connection compartido; el lock serializa accesos entre hilos
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_access ON embeddings(last_access)"
+        )
+        self._conn.commit()
+
+    # ===============================
+    # PUBLIC API
+    # ===============================
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[int, List[float]]:
+        """
+        Devuelve {posición: embedding} solo para los textos en caché.
+        """
+        keys = [self.make_key(model, t) for t in texts]
+        found = {}
+
+        with self._lock:
+            # SQLite limita el número de parámetros por sentencia
+            for start in range(0, len(keys), 500):
+                page = list(set(keys[start:start + 500]))
+                placeholders = ",".join("?" * len(page))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    page
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = self._decode(blob)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, k) for k in found]
+                )
+                self._conn.commit()
+
+        result = {i: found[k] for i, k in enumerate(keys) if k in found}
+        self.hits += len(result)
+        self.misses += len(texts) - len(result)
+        return result
+
+    def put_many(self, model: str, texts: List[str], embeddings: List[List[float]]):
+        if not texts:
+            return
+
+        now = time.time()
+        rows = [
+            (self.make_key(model, t), self._encode(e), now)
+            for t, e in zip(texts, embeddings)
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self)
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    # ===============================
+    # INTERNAL METHODS
+    # ===============================
+
+    def _evict(self):
+        """
+        Elimina las entradas menos usadas recientemente si superamos el límite.
+        Debe llamarse con el lock tomado.
+        """
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return
+
+        self._conn.execute(
+            """
+            DELETE FROM embeddings WHERE key IN (
+                SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?
+            )
+            """,
+            (overflow,)
+        )
+        self.evictions += overflow
+        self.logger.info(f"Embedding cache evicted {overflow} entries")
+
+    def _encode(self, vector: List[float]) -> bytes:
+        return array("f", vector).tobytes()
+
+    def _decode(self, blob: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
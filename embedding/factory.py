@@ -0,0 +1,68 @@
+import os
+from typing import Dict, Any, Optional
+
+import yaml
+
+from embedding.base_embedder import BaseEmbedder
+from embedding.ollama_embedder import OllamaEmbedder
+from embedding.async_ollama_embedder import AsyncOllamaEmbedder
+from embedding.hashing_embedder import HashingEmbedder
+from embedding.embedding_cache import EmbeddingCache
+
+
+EMBEDDING_BACKENDS = ("ollama", "ollama_async", "hashing")
+
+
+def load_models_config(config_path: str = "config/models.yaml") -> Dict[str, Any]:
+    """
+    Lee config/models.yaml. Si no existe devolvemos {} (valores por defecto).
+    """
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path, "r") as f:
+        return yaml.safe_load(f) or {}
+
+
+def build_embedder(
+    config: Optional[Dict[str, Any]] = None,
+    cache: Optional[EmbeddingCache] = None,
+    dimensions: Optional[int] = None
+) -> BaseEmbedder:
+    """
+    Construye el backend de embedding indicado en la configuración:
+
+        embedding_backend: ollama | ollama_async | hashing
+        embedding: nomic-embed-text
+        embedding_dim: 768
+        ollama_base_url: http://localhost:11434
+        embedding_concurrency: 4
+    """
+    if config is None:
+        config = load_models_config()
+
+    backend = config.get("embedding_backend", "ollama")
+    model = config.get("embedding", "nomic-embed-text")
+    base_url = config.get("ollama_base_url", "http://localhost:11434")
+    dimensions = dimensions or config.get("embedding_dim")
+
+    if backend == "ollama":
+        return OllamaEmbedder(
+            model=model,
+            base_url=base_url,
+            cache=cache,
+            dimensions=dimensions
+        )
+
+    if backend == "ollama_async":
+        return AsyncOllamaEmbedder(
+            model=model,
+            base_url=base_url,
+            cache=cache,
+            dimensions=dimensions,
+            max_concurrency=config.get("embedding_concurrency", 4)
+        )
+
+    if backend == "hashing":
+        return HashingEmbedder(dimensions=dimensions or 768, cache=cache)
+
+    raise ValueError(f"Unknown embedding_backend '{backend}'. Use one of {EMBEDDING_BACKENDS}")
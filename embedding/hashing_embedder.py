@@ -0,0 +1,103 @@
+import re
+import hashlib
+import unicodedata
+from typing import List, Optional
+
+import numpy as np
+
+from embedding.base_embedder import BaseEmbedder
+from embedding.embedding_cache import EmbeddingCache
+
+
+class HashingEmbedder(BaseEmbedder):
+    """
+    Backend de embedding local y determinista (sin Ollama).
+    Proyección por hashing de n-gramas de caracteres + palabras, con signo,
+    TF sublineal y normalización L2. Mismo texto -> mismo vector en cualquier
+    proceso o máquina, con la dimensión configurada.
+
+    Pensado para tests, CI y benchmarks de chunking/upsert/rerank a escala;
+    captura solapamiento léxico, no semántica.
+    """
+
+    TOKEN_PATTERN = re.compile(r"\w+(?:[.\-]\w+)*", re.UNICODE)
+
+    def __init__(
+        self,
+        dimensions: int = 768,
+        ngram_range: tuple = (3, 5),
+        model: str = "hashing-ngram",
+        cache: Optional[EmbeddingCache] = None
+    ):
+        self.dimensions = dimensions
+        self.ngram_range = ngram_range
+        self.model = model
+        self.cache = cache
+
+    # ===============================
+    # PUBLIC API
+    # ===============================
+
+    def embed_text(self, text: str) -> List[float]:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        if self.cache is None:
+            return np.vstack([self._embed(t) for t in texts]).tolist()
+
+        # Misma caché (y misma clave) que OllamaEmbedder
+        results = self.cache.get_many(self.cache_key, texts)
+        missing = [i for i in range(len(texts)) if i not in results]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            new_embeddings = np.vstack([self._embed(t) for t in missing_texts]).tolist()
+            self.cache.put_many(self.cache_key, missing_texts, new_embeddings)
+            results.update(zip(missing, new_embeddings))
+
+        return [results[i] for i in range(len(texts))]
+
+    # ===============================
+    # INTERNAL METHODS
+    # ===============================
+
+    def _features(self, text: str) -> List[str]:
+        text = unicodedata.normalize("NFKC", text).lower()
+        words = self.TOKEN_PATTERN.findall(text)
+
+        features = [f"w:{w}" for w in words]
+
+        low, high = self.ngram_range
+        for w in words:
+            padded = f" {w} "
+            for n in range(low, high + 1):
+                features.extend(
+                    f"c:{padded[i:i + n]}" for i in range(max(1, len(padded) - n + 1))
+                )
+        return features
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        features = self._features(text)
+        if not features:
+            return vector
+
+        # blake2b es estable entre procesos (hash() de Python no lo es)
+        digests = np.frombuffer(
+            b"".join(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest() for f in features),
+            dtype=np.uint64
+        )
+        indices = (digests % np.uint64(self.dimensions)).astype(np.int64)
+        signs = np.where((digests >> np.uint64(63)) == 1, -1.0, 1.0).astype(np.float32)
+
+        np.add.at(vector, indices, signs)
+
+        # TF sublineal conservando el signo
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
@@ -1,10 +1,17 @@
-import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
+import math
 import time
 
+import requests
+
+from embedding.base_embedder import BaseEmbedder
+from embedding.embedding_cache import EmbeddingCache
+from embedding.batch_scheduler import AdaptiveBatchScheduler, estimate_tokens
+from clients.ollama_client import OllamaClient, get_ollama_client
+
 
-class OllamaEmbedder:
+class OllamaEmbedder(BaseEmbedder):
     """
     Wrapper profesional para generar embeddings usando Ollama.
     Diseñado para integrarse con pipelines académicos + ChromaDB.
@@ -15,13 +22,36 @@ class OllamaEmbedder:
         model: str = "nomic-embed-text",
         base_url: str = "http://localhost:11434",
         timeout: int = 60,
-        batch_size: int = 16
+        batch_size: int = 64,
+        use_batch_endpoint: bool = True,
+        cache: Optional[EmbeddingCache] = None,
+        client: Optional[OllamaClient] = None,
+        scheduler: Optional[AdaptiveBatchScheduler] = None,
+        max_batch_failures: int = 3,
+        dimensions: Optional[int] = None
     ):
         self.model = model
         self.base_url = base_url.rstrip("/")
+
+        # Transporte compartido (pool keep-alive + reintentos)
+        self.client = client or get_ollama_client(self.base_url)
         self.timeout = timeout
         self.batch_size = batch_size
 
+        # Tamaño de sub-batch adaptativo por tokens (batch_size = tope de textos)
+        self.scheduler = scheduler or AdaptiveBatchScheduler(max_items=batch_size)
+        self.max_batch_failures = max_batch_failures
+
+        # /api/embed acepta una lista en "input" (Ollama >= 0.3.4).
+        # Si el servidor es antiguo se desactiva y usamos /api/embeddings.
+        self.use_batch_endpoint = use_batch_endpoint
+
+        # Caché persistente opcional (hash(modelo, texto) -> vector)
+        self.cache = cache
+
+        # Dimensión Matryoshka (nomic-embed-text: 768/512/256/128). None = nativa
+        self.dimensions = dimensions
+
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
@@ -33,9 +63,118 @@ class OllamaEmbedder:
         """
         Genera embedding para un solo texto.
         """
-        response = requests.post(
-            f"{self.base_url}/api/embeddings",
-            json={
+        if self.cache is not None:
+            cached = self.cache.get_many(self.cache_key, [text])
+            if cached:
+                return cached[0]
+
+        embedding = self._truncate(self._embed_text_uncached(text))
+
+        if self.cache is not None:
+            self.cache.put_many(self.cache_key, [text], [embedding])
+
+        return embedding
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Genera embeddings en batch (con manejo interno de sub-batches).
+        Consulta primero la caché y solo envía a Ollama los textos faltantes.
+        """
+        if self.cache is None:
+            return [self._truncate(e) for e in self._embed_batch_uncached(texts)]
+
+        results = self.cache.get_many(self.cache_key, texts)
+        missing = [i for i in range(len(texts)) if i not in results]
+
+        if missing:
+            self.logger.info(
+                f"Embedding cache: {len(results)} hits, {len(missing)} misses"
+            )
+            missing_texts = [texts[i] for i in missing]
+            new_embeddings = [self._truncate(e) for e in self._embed_batch_uncached(missing_texts)]
+            self.cache.put_many(self.cache_key, missing_texts, new_embeddings)
+
+            for i, emb in zip(missing, new_embeddings):
+                results[i] = emb
+
+        return [results[i] for i in range(len(texts))]
+
+    # ===============================
+    # INTERNAL METHODS
+    # ===============================
+
+    def _truncate(self, vector: List[float]) -> List[float]:
+        """
+        Truncado Matryoshka a `dimensions` + re-normalización L2.
+        """
+        if self.dimensions is None:
+            return vector
+        if len(vector) < self.dimensions:
+            raise ValueError(
+                f"Model '{self.model}' returned {len(vector)} dims, cannot truncate to {self.dimensions}"
+            )
+        return self._normalize(vector[:self.dimensions])
+
+    def _embed_text_uncached(self, text: str) -> List[float]:
+        if self.use_batch_endpoint:
+            embeddings = self._embed_multi([text])
+            if embeddings is not None:
+                return embeddings[0]
+
+        return self._embed_single(text)
+
+    def _embed_batch_uncached(self, texts: List[str]) -> List[List[float]]:
+        """
+        Cada sub-batch viaja en una sola petición a /api/embed; el orden
+        de salida es el mismo que el de `texts`. El scheduler decide el
+        tamaño de cada sub-batch según tokens, latencia y errores.
+        """
+        all_embeddings = []
+        start = 0
+        failures = 0
+
+        while start < len(texts):
+            end = self.scheduler.next_batch_end(texts, start)
+            batch = texts[start:end]
+            n_tokens = sum(estimate_tokens(t) for t in batch)
+            self.logger.info(f"Embedding batch {start} - {end} (~{n_tokens} tokens)")
+
+            t0 = time.perf_counter()
+            try:
+                batch_embeddings = None
+                if self.use_batch_endpoint:
+                    batch_embeddings = self._embed_multi(batch)
+
+                if batch_embeddings is None:
+                    batch_embeddings = [self._embed_single(text) for text in batch]
+
+            except (RuntimeError, requests.RequestException) as e:
+                # Reducción multiplicativa y reintento del mismo tramo con un batch menor
+                self.scheduler.record(time.perf_counter() - t0, n_tokens, ok=False)
+                failures += 1
+                if len(batch) == 1 or failures > self.max_batch_failures:
+                    raise
+                self.logger.warning(
+                    f"Embedding batch failed ({e}), shrinking to {self.scheduler.token_budget} tokens"
+                )
+                continue
+
+            self.scheduler.record(time.perf_counter() - t0, n_tokens, ok=True)
+            failures = 0
+
+            all_embeddings.extend(batch_embeddings)
+            start = end
+
+        return all_embeddings
+
+    def _embed_single(self, text: str) -> List[float]:
+        """
+        Ruta legacy: un texto por petición a /api/embeddings.
+        Normalizamos para que el vector sea idéntico al de /api/embed.
+        """
+        response = self.client.post(
+            "/api/embeddings",
+            {
                 "model": self.model,
                 "prompt": text
             },
@@ -47,29 +186,52 @@ class OllamaEmbedder:
                 f"Ollama embedding error: {response.status_code} - {response.text}"
             )
 
-        return response.json()["embedding"]
+        return self._normalize(response.json()["embedding"])
 
-    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+    def _embed_multi(self, batch: List[str]):
         """
-        Genera embeddings en batch (con manejo interno de sub-batches).
+        Envía un sub-batch completo a /api/embed.
+        Devuelve None si el servidor no soporta el endpoint (fallback).
         """
-        all_embeddings = []
+        response = self.client.post(
+            "/api/embed",
+            {
+                "model": self.model,
+                "input": batch
+            },
+            timeout=self.timeout
+        )
 
-        for i in range(0, len(texts), self.batch_size):
-            batch = texts[i:i + self.batch_size]
-            self.logger.info(f"Embedding batch {i} - {i + len(batch)}")
+        # Servidores antiguos: 404 (ruta inexistente) o 405.
+        # Un 404 de "model not found" sí es un error real.
+        if response.status_code in (404, 405) and "model" not in response.text.lower():
+            self.logger.warning(
+                "Ollama server does not support /api/embed, falling back to /api/embeddings"
+            )
+            self.use_batch_endpoint = False
+            return None
 
-            batch_embeddings = []
-            for text in batch:
-                emb = self.embed_text(text)
-                batch_embeddings.append(emb)
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Ollama embedding error: {response.status_code} - {response.text}"
+            )
 
-            all_embeddings.extend(batch_embeddings)
+        embeddings = response.json().get("embeddings")
+        if not embeddings or len(embeddings) != len(batch):
+            raise RuntimeError(
+                f"Ollama returned {len(embeddings or [])} embeddings for a batch of {len(batch)}"
+            )
 
-            # pequeña pausa para no saturar Ollama
-            time.sleep(0.2)
+        return embeddings
 
-        return all_embeddings
+    def _normalize(self, vector: List[float]) -> List[float]:
+        """
+        Normalización L2 (la misma que aplica Ollama en /api/embed).
+        """
+        norm = math.sqrt(sum(x * x for x in vector))
+        if norm == 0:
+            return vector
+        return [x / norm for x in vector]
 
     # ===============================
     # HEALTH CHECK
@@ -80,7 +242,7 @@ class OllamaEmbedder:
         Verifica que Ollama esté activo.
         """
         try:
-            response = requests.get(f"{self.base_url}/api/tags")
+            response = self.client.get("/api/tags", timeout=5)
             return response.status_code == 200
         except Exception:
             return False
@@ -1,10 +1,11 @@
-import requests
 import json
 
+from clients.ollama_client import get_ollama_client
+
 class AcademicIntelligenceExtractor:
     def __init__(self, model="llama3.1", base_url="http://localhost:11434"):
         self.model = model
-        self.url = f"{base_url}/api/generate"
+        self.client = get_ollama_client(base_url)
 
     def _get_specialized_prompt(self, section_name: str, text: str) -> str:
         section_lower = section_name.lower()
@@ -68,9 +69,9 @@ class AcademicIntelligenceExtractor:
         prompt = self._get_specialized_prompt(section_name, clean_text)
         
         try:
-            response = requests.post(
-                self.url,
-                json={
+            response = self.client.post(
+                "/api/generate",
+                {
                     "model": self.model,
                     "prompt": prompt,
                     "stream": False,
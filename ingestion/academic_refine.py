@@ -1,10 +1,11 @@
-import requests
 import time
 
+from clients.ollama_client import get_ollama_client
+
 class AcademicRefiner:
     def __init__(self, model="llama3.1", base_url="http://localhost:11434"):
         self.model = model
-        self.base_url = f"{base_url}/api/generate"
+        self.client = get_ollama_client(base_url)
 
     def _get_academic_clean_prompt(self, raw_text_chunk: str) -> str:
         return f"""
@@ -112,19 +113,18 @@ class AcademicRefiner:
         return self._call_ollama2(prompt)
 
     def _call_ollama2(self, prompt):
-        res = requests.post(self.base_url, json={
-            "model": self.model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {"temperature": 0} # 0 para máxima fidelidad al texto
-        })
-        return res.json().get("response", "")
+        return self.client.generate(
+            prompt,
+            model=self.model,
+            options={"temperature": 0}, # 0 para máxima fidelidad al texto
+            timeout=180
+        )
 
     def _call_ollama(self, text: str) -> str:
         try:
-            response = requests.post(
-                self.base_url,
-                json={
+            response = self.client.post(
+                "/api/generate",
+                {
                     "model": self.model,
                     "prompt": self._get_academic_clean_prompt(text),
                     "stream": False,
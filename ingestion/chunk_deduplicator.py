@@ -0,0 +1,149 @@
+import re
+import hashlib
+import unicodedata
+from collections import defaultdict
+from typing import List, Dict, Optional
+
+import numpy as np
+
+
+class ChunkDeduplicator:
+    """
+    Deduplicación de chunks entre documentos y colecciones antes del embedding.
+    - Duplicados exactos: sha1 del texto normalizado (sin la cabecera
+      "[Source: ... | Section: ...]" que añade AcademicChunker).
+    - Casi duplicados: SimHash de 64 bits sobre shingles de palabras, indexado
+      por bandas; dos chunks son casi duplicados si su distancia de Hamming es
+      <= `max_hamming`.
+
+    Cada chunk nuevo se registra como canónico; los posteriores que coincidan
+    devuelven el ID de ese canónico para reutilizar su embedding.
+    """
+
+    HEADER_PATTERN = re.compile(r"^\[Source: .*?\]\n")
+    TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+    def __init__(
+        self,
+        max_hamming: int = 3,
+        shingle_size: int = 3,
+        min_shingles: int = 8,
+        near_duplicates: bool = True
+    ):
+        self.max_hamming = max_hamming
+        self.shingle_size = shingle_size
+        self.min_shingles = min_shingles  # chunks muy cortos: solo match exacto
+        self.near_duplicates = near_duplicates
+
+        # Con max_hamming + 1 bandas, dos firmas a distancia <= max_hamming
+        # comparten al menos una banda completa (principio del palomar)
+        self.num_bands = max_hamming + 1
+        self._band_bits = 64 // self.num_bands
+
+        self._exact: Dict[str, str] = {}
+        self._signatures: Dict[str, int] = {}
+        self._bands: List[Dict[int, List[str]]] = [defaultdict(list) for _ in range(self.num_bands)]
+
+        self.unique = 0
+        self.exact_duplicates = 0
+        self.near_duplicates_found = 0
+
+    # ===============================
+    # PUBLIC API
+    # ===============================
+
+    def assign(self, ids: List[str], texts: List[str]) -> List[Optional[str]]:
+        """
+        Para cada chunk devuelve el ID canónico del que es duplicado,
+        o None si es nuevo (y queda registrado como canónico).
+        """
+        if len(ids) != len(texts):
+            raise ValueError("ids y texts deben tener el mismo tamaño")
+
+        canonical = []
+        for chunk_id, text in zip(ids, texts):
+            canonical.append(self._assign_one(chunk_id, text))
+        return canonical
+
+    def stats(self) -> Dict[str, float]:
+        total = self.unique + self.exact_duplicates + self.near_duplicates_found
+        duplicates = self.exact_duplicates + self.near_duplicates_found
+        return {
+            "unique": self.unique,
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates_found,
+            "duplicate_rate": round(duplicates / total, 4) if total else 0.0
+        }
+
+    def reset(self):
+        self._exact.clear()
+        self._signatures.clear()
+        for band in self._bands:
+            band.clear()
+        self.unique = self.exact_duplicates = self.near_duplicates_found = 0
+
+    # ===============================
+    # INTERNAL METHODS
+    # ===============================
+
+    def _assign_one(self, chunk_id: str, text: str) -> Optional[str]:
+        tokens = self._tokens(text)
+        digest = hashlib.sha1(" ".join(tokens).encode("utf-8")).hexdigest()
+
+        match = self._exact.get(digest)
+        if match is not None and match != chunk_id:
+            self.exact_duplicates += 1
+            return match
+
+        signature = None
+        if self.near_duplicates and len(tokens) - self.shingle_size + 1 >= self.min_shingles:
+            signature = self._simhash(tokens)
+            match = self._find_near(signature, chunk_id)
+            if match is not None:
+                self.near_duplicates_found += 1
+                return match
+
+        # Chunk nuevo -> canónico
+        self._exact.setdefault(digest, chunk_id)
+        if signature is not None and chunk_id not in self._signatures:
+            self._signatures[chunk_id] = signature
+            for band, key in enumerate(self._band_keys(signature)):
+                self._bands[band][key].append(chunk_id)
+        self.unique += 1
+        return None
+
+    def _tokens(self, text: str) -> List[str]:
+        text = self.HEADER_PATTERN.sub("", text, count=1)
+        text = unicodedata.normalize("NFKC", text).lower()
+        return self.TOKEN_PATTERN.findall(text)
+
+    def _simhash(self, tokens: List[str]) -> int:
+        n = self.shingle_size
+        shingles = [" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+
+        hashes = np.frombuffer(
+            b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles),
+            dtype=np.uint64
+        )
+        bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+        weights = (bits.astype(np.int32) * 2 - 1).sum(axis=0)
+
+        signature = 0
+        for position in np.flatnonzero(weights > 0):
+            signature |= 1 << int(position)
+        return signature
+
+    def _band_keys(self, signature: int) -> List[int]:
+        mask = (1 << self._band_bits) - 1
+        return [(signature >> (band * self._band_bits)) & mask for band in range(self.num_bands)]
+
+    def _find_near(self, signature: int, chunk_id: str) -> Optional[str]:
+        seen = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            for candidate in self._bands[band].get(key, ()):
+                if candidate in seen or candidate == chunk_id:
+                    continue
+                seen.add(candidate)
+                if (signature ^ self._signatures[candidate]).bit_count() <= self.max_hamming:
+                    return candidate
+        return None
@@ -0,0 +1,139 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+import time
+from typing import Dict, List, Optional, Any
+
+
+class IngestionManifest:
+    """
+    Manifiesto persistente de la ingesta: una fila por (colección, doc_id) con
+    el hash del PDF, el hash del JSON de metadata, la versión de configuración
+    de chunker/splitter y el modelo de embedding con que se indexó.
+    Un paper solo se re-procesa si alguno de esos valores cambia.
+    """
+
+    def __init__(self, path: str = "./ingestion_manifest.sqlite"):
+        self.path = path
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS papers (
+                collection TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                pdf_hash TEXT NOT NULL,
+                metadata_hash TEXT NOT NULL,
+                config_version TEXT NOT NULL,
+                embedding_model TEXT NOT NULL,
+                chunk_count INTEGER NOT NULL,
+                ingested_at REAL NOT NULL,
+                PRIMARY KEY (collection, doc_id)
+            )
+            """
+        )
+        self._conn.commit()
+
+    # ===============================
+    # HASHES
+    # ===============================
+
+    @staticmethod
+    def file_hash(path: str, block_size: int = 1 << 20) -> str:
+        """sha256 del contenido del fichero (lectura por bloques)."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def config_version(config: Dict[str, Any]) -> str:
+        """Huella estable de la configuración de chunking/splitting."""
+        payload = json.dumps(config, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    # ===============================
+    # PUBLIC API
+    # ===============================
+
+    def get(self, collection: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT * FROM papers WHERE collection = ? AND doc_id = ?",
+                (collection, doc_id)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([c[0] for c in cursor.description], row))
+
+    def is_current(
+        self,
+        collection: str,
+        doc_id: str,
+        pdf_hash: str,
+        metadata_hash: str,
+        config_version: str,
+        embedding_model: str
+    ) -> bool:
+        entry = self.get(collection, doc_id)
+        return (
+            entry is not None
+            and entry["pdf_hash"] == pdf_hash
+            and entry["metadata_hash"] == metadata_hash
+            and entry["config_version"] == config_version
+            and entry["embedding_model"] == embedding_model
+        )
+
+    def record(
+        self,
+        collection: str,
+        doc_id: str,
+        pdf_hash: str,
+        metadata_hash: str,
+        config_version: str,
+        embedding_model: str,
+        chunk_count: int
+    ):
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO papers
+                (collection, doc_id, pdf_hash, metadata_hash, config_version,
+                 embedding_model, chunk_count, ingested_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (collection, doc_id, pdf_hash, metadata_hash, config_version,
+                 embedding_model, chunk_count, time.time())
+            )
+            self._conn.commit()
+
+    def remove(self, collection: str, doc_id: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM papers WHERE collection = ? AND doc_id = ?", (collection, doc_id)
+            )
+            self._conn.commit()
+
+    def doc_ids(self, collection: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT doc_id FROM papers WHERE collection = ?", (collection,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
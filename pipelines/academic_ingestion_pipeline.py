@@ -1,19 +1,21 @@
 import os
 import json
-from typing import List, Dict
+from typing import Dict, Optional
 
 import re
 import unicodedata
 
 from ingestion.section_splitter import SectionSplitter
 from ingestion.academic_chunker import AcademicChunker
-from embedding.ollama_embedder import OllamaEmbedder
-from vectorstore.chroma_vector_store import ChromaVectorStore
+from embedding.base_embedder import BaseEmbedder
+from embedding.factory import load_models_config
+from ingestion.ingestion_manifest import IngestionManifest
+from pipelines.ingestion_storage import IngestionStorageMixin
 from ingestion.pdf_loader import extract_clean_text
 
 
 
-class AcademicIngestionPipelineV2:
+class AcademicIngestionPipelineV2(IngestionStorageMixin):
     """
     Orquestador principal del sistema de investigación estructurada.
     Coordina extracción, chunking, embedding y almacenamiento.
@@ -22,27 +24,56 @@ class AcademicIngestionPipelineV2:
     def __init__(
         self,
         collection_name: str = "academic_research",
-        persist_directory: str = "./chroma_db"
+        persist_directory: str = "./chroma_db",
+        embedding_cache_path: Optional[str] = "{persist_directory}/embedding_cache.sqlite",
+        embedder: Optional[BaseEmbedder] = None,
+        embedding_dim: Optional[int] = None,
+        deduplicate: bool = True,
+        background_writes: bool = False,
+        manifest_path: Optional[str] = "{persist_directory}/ingestion_manifest.sqlite",
+        lexical_index_path: Optional[str] = "{persist_directory}/bm25_index",
+        search_cache_path: Optional[str] = "{persist_directory}/search_cache.sqlite",
+        section_index: bool = False
     ):
         self.section_splitter = SectionSplitter()
         self.chunker = AcademicChunker()
-        self.embedder = OllamaEmbedder()
-        self.vector_store = ChromaVectorStore(
+        self._init_storage(
+            load_models_config(),
             collection_name=collection_name,
-            persist_directory=persist_directory
+            persist_directory=persist_directory,
+            embedding_cache_path=embedding_cache_path,
+            embedder=embedder,
+            embedding_dim=embedding_dim,
+            deduplicate=deduplicate,
+            background_writes=background_writes,
+            manifest_path=manifest_path,
+            lexical_index_path=lexical_index_path,
+            search_cache_path=search_cache_path,
+            section_index=section_index
         )
+        self.config_version = IngestionManifest.config_version(self._ingestion_config())
 
     # ============================================================
-    # PUBLIC METHODS
+    # INTERNAL METHODS
     # ============================================================
-    def ingest_paper(self, pdf_path: str, metadata_path: str):
-        print(f"🧐 Ingesting: {os.path.basename(pdf_path)}")
-        
+
+    def _ingest_paper(self, pdf_path: str, metadata_path: str, force: bool = False) -> str:
+        """
+        Ingesta de un paper sin confirmar el lote (ver ingest_paper /
+        ingest_collection). Devuelve "ingested", "skipped" o "failed".
+        """
         try:
             # 1. Carga y preparación de Metadata
             metadata = self._load_metadata(metadata_path)
             metadata = self._prepare_metadata(metadata)
 
+            # ¿Cambió algo desde la última ingesta? (manifiesto incremental)
+            fingerprint = self._paper_fingerprint(pdf_path, metadata_path)
+            if not force and self._is_unchanged(metadata["doc_id"], fingerprint):
+                print(f"⏭️ Unchanged, skipping: {os.path.basename(pdf_path)}")
+                return "skipped"
+            print(f"🧐 Ingesting: {os.path.basename(pdf_path)}")
+
             # 2. Extracción y Limpieza Profunda
             raw_text = extract_clean_text(pdf_path)
             
@@ -58,7 +89,9 @@ class AcademicIngestionPipelineV2:
 
             if not chunks:
                 print(f"⚠️ No chunks generated for {pdf_path}")
-                return
+                self._replace_chunks(metadata["doc_id"], [], [], [], [])
+                self._record_ingestion(metadata["doc_id"], fingerprint, 0)
+                return "ingested"
 
             texts = []
             metadatas = []
@@ -66,48 +99,38 @@ class AcademicIngestionPipelineV2:
 
             for i, chunk in enumerate(chunks):
                 texts.append(chunk["text"])
-                metadatas.append(self._build_vector_metadata(chunk))
+                metadatas.append(self._build_vector_metadata(chunk, metadata))
                 # IDs deterministas para evitar duplicados al re-ingestar
                 vector_ids.append(f"{metadata['doc_id']}_ch{i}")
 
-            # 5. Generación de Embeddings
-            embeddings = self.embedder.embed_batch(texts)
-
-            # 6. Almacenamiento en ChromaDB
-            self.vector_store.add_documents(
-                ids=vector_ids,
-                texts=texts,
-                embeddings=embeddings,
-                metadatas=metadatas
-            )
+            # 5. Deduplicación + Embeddings + Almacenamiento en ChromaDB
+            stored = self._embed_and_store(metadata["doc_id"], vector_ids, texts, metadatas)
 
-            print(f"✅ Ingested {len(chunks)} chunks from {metadata.get('doc_id')}")
+            print(f"✅ Ingested {stored} chunks from {metadata.get('doc_id')}")
+            self._record_ingestion(metadata["doc_id"], fingerprint, stored)
+            return "ingested"
             
         except Exception as e:
             print(f"❌ Error ingesting {pdf_path}: {str(e)}")
-    
-    def ingest_collection(self, folder_path: str):
+            return "failed"
+
+    def _ingestion_config(self) -> Dict:
         """
-        Ingesta automática de una carpeta con PDFs y JSONs emparejados.
+        Parámetros que cambian los chunks generados; si cambian, la versión
+        de configuración del manifiesto cambia y se re-procesa todo.
         """
-
-        files = os.listdir(folder_path + "/pdfs")
-        pdf_files = [f for f in files if f.endswith(".pdf")]
-
-        for pdf_file in pdf_files:
-            base_name = os.path.splitext(pdf_file)[0]
-            pdf_path = os.path.join(folder_path + "/pdfs", pdf_file)
-            json_path = os.path.join(folder_path + "/metadata", f"{base_name}.json")
-
-            if not os.path.exists(json_path):
-                print(f"Metadata not found for {pdf_file}, skipping.")
-                continue
-
-            self.ingest_paper(pdf_path, json_path)
-
-    # ============================================================
-    # INTERNAL METHODS
-    # ============================================================
+        config = {
+            "pipeline": type(self).__name__,
+            "chunker": {
+                "default_chunk_size": self.chunker.default_chunk_size,
+                "overlap": self.chunker.overlap,
+                "min_chunk_size": self.chunker.min_chunk_size,
+                "section_sizes": self.chunker.SECTION_SIZES
+            },
+            "splitter": self.section_splitter.section_keywords
+        }
+        config.update(self._storage_config())
+        return config
 
     def _prepare_metadata(self, metadata: dict):
         """
@@ -157,7 +180,7 @@ class AcademicIngestionPipelineV2:
 
         return metadata
 
-    def _build_vector_metadata(self, chunk: Dict) -> Dict:
+    def _build_vector_metadata(self, chunk: Dict, paper_metadata: Optional[Dict] = None) -> Dict:
         """
         Construye metadata limpia para Chroma.
         Solo campos necesarios para filtrado y boost.
@@ -173,7 +196,8 @@ class AcademicIngestionPipelineV2:
             "journal": chunk.get("journal", ""),
             "doi": chunk.get("doi", ""),
             "collection": chunk.get("collection", ""),
-            "research_question": chunk.get("research_question", ""),
+            "root_collection": (paper_metadata or {}).get("root_collection", ""),
+            "research_question": chunk.get("research_question") or (paper_metadata or {}).get("research_question", ""),
             "section": chunk.get("section", ""),
             "chunk_id": chunk.get("chunk_id", ""),
             "structural_weight": structural_weight,
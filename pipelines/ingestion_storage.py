@@ -0,0 +1,277 @@
+import os
+from typing import List, Dict, Optional, Any
+
+from ingestion.chunk_deduplicator import ChunkDeduplicator
+from ingestion.ingestion_manifest import IngestionManifest
+from embedding.base_embedder import BaseEmbedder
+from embedding.embedding_cache import EmbeddingCache
+from embedding.factory import build_embedder
+from vectorstore.factory import build_vector_store, storage_path
+from retrieval.bm25_index import BM25Index
+from retrieval.result_cache import CollectionVersions
+from retrieval.section_index import SectionIndex
+
+
+class IngestionStorageMixin:
+    """
+    Almacenamiento compartido por los pipelines de ingesta: caché de
+    embeddings, deduplicación, vector store, manifiesto incremental, índice
+    BM25, índice de secciones y versión de la colección (caché de búsquedas).
+
+    Cada pipeline solo decide cómo convertir un paper en chunks; la forma de
+    guardarlos y mantener los índices al día vive aquí una sola vez.
+    """
+
+    def _init_storage(
+        self,
+        config: Dict[str, Any],
+        collection_name: str,
+        persist_directory: str,
+        embedding_cache_path: Optional[str],
+        embedder: Optional[BaseEmbedder],
+        embedding_dim: Optional[int],
+        deduplicate: bool,
+        background_writes: bool,
+        manifest_path: Optional[str],
+        lexical_index_path: Optional[str],
+        search_cache_path: Optional[str],
+        section_index: bool
+    ):
+        self.collection_name = collection_name
+        # Ficheros auxiliares junto al vector store ("{persist_directory}/..."; None = desactivado)
+        embedding_cache_path, manifest_path, lexical_index_path, search_cache_path = (
+            storage_path(path, persist_directory)
+            for path in (embedding_cache_path, manifest_path, lexical_index_path, search_cache_path)
+        )
+        # Caché de embeddings: re-indexar una biblioteca sin cambios no llama a Ollama
+        self.embedding_cache = EmbeddingCache(embedding_cache_path) if embedding_cache_path else None
+
+        # Backends según config/models.yaml (embedding_backend / vector_backend),
+        # o un embedder inyectado directamente
+        if embedder is None:
+            embedder = build_embedder(
+                config, cache=self.embedding_cache, dimensions=embedding_dim
+            )
+        elif embedder.cache is None:
+            embedder.cache = self.embedding_cache
+        self.embedder = embedder
+        # Dedup entre documentos/colecciones antes del embedding
+        self.deduplicator = ChunkDeduplicator() if deduplicate else None
+        self.vector_store = build_vector_store(
+            config,
+            collection_name=collection_name,
+            persist_directory=persist_directory,
+            # La colección registra la dimensión y rechaza mezclas
+            embedding_dim=self.embedder.dimensions,
+            # Upserts paginados en un hilo aparte mientras se embebe el siguiente paper
+            background_writes=background_writes
+        )
+
+        # Manifiesto incremental: solo se re-procesan papers nuevos o modificados
+        self.manifest = IngestionManifest(manifest_path) if manifest_path else None
+        self._pending_manifest = []
+        # Índice léxico BM25 (search_hybrid), actualizado junto al vector store;
+        # lexical_index_path es el directorio raíz, con un índice por colección
+        self.lexical_index = BM25Index(
+            BM25Index.collection_path(collection_name, lexical_index_path)
+        ) if lexical_index_path else None
+        # Versión de la colección: cada cambio invalida las búsquedas cacheadas por HybridRetriever
+        self.collection_versions = CollectionVersions(search_cache_path) if search_cache_path else None
+        self._collection_changed = False
+        # Índice grueso por (doc_id, sección) para HybridRetriever.search_two_stage
+        self.section_index = SectionIndex(build_vector_store(
+            config,
+            collection_name=SectionIndex.collection_name(collection_name),
+            persist_directory=persist_directory,
+            embedding_dim=self.embedder.dimensions
+        )) if section_index else None
+
+    # ============================================================
+    # PUBLIC METHODS
+    # ============================================================
+
+    def ingest_paper(self, pdf_path: str, metadata_path: str, force: bool = False) -> str:
+        """
+        Ingesta un paper. Devuelve "ingested", "skipped" (sin cambios según
+        el manifiesto) o "failed". Al volver el paper ya está escrito (también
+        con background_writes=True), en el manifiesto y en el índice BM25.
+        """
+        status = self._ingest_paper(pdf_path, metadata_path, force=force)
+        self._commit_batch()
+        return status
+
+    def ingest_collection(self, folder_path: str, force: bool = False) -> Dict[str, int]:
+        """
+        Ingesta automática de una carpeta con PDFs y JSONs emparejados.
+        Solo procesa papers nuevos o modificados (force=True re-procesa todo).
+        """
+        counts = {"ingested": 0, "skipped": 0, "failed": 0}
+
+        files = os.listdir(folder_path + "/pdfs")
+        pdf_files = [f for f in files if f.endswith(".pdf")]
+
+        for pdf_file in pdf_files:
+            base_name = os.path.splitext(pdf_file)[0]
+            pdf_path = os.path.join(folder_path + "/pdfs", pdf_file)
+            json_path = os.path.join(folder_path + "/metadata", f"{base_name}.json")
+
+            if not os.path.exists(json_path):
+                print(f"Metadata not found for {pdf_file}, skipping.")
+                continue
+
+            counts[self._ingest_paper(pdf_path, json_path, force=force)] += 1
+
+        self._commit_batch()
+
+        print(
+            f"📊 Ingested: {counts['ingested']} | "
+            f"Skipped (unchanged): {counts['skipped']} | Failed: {counts['failed']}"
+        )
+
+        if self.embedding_cache is not None:
+            print(f"📦 Embedding cache: {self.embedding_cache.stats()}")
+        if self.deduplicator is not None:
+            print(f"♻️ Chunk dedup: {self.deduplicator.stats()}")
+        if self.lexical_index is not None:
+            print(f"🔤 BM25 index: {self.lexical_index.stats()}")
+
+        return counts
+
+    # ============================================================
+    # INTERNAL METHODS
+    # ============================================================
+
+    def _storage_config(self) -> Dict:
+        """
+        Parte de la configuración de ingesta que depende del almacenamiento
+        (se mezcla en el _ingestion_config de cada pipeline).
+        """
+        config = {"deduplicate": self.deduplicator is not None}
+
+        # Activar el sharding re-ubica todos los papers (sin sharding la versión no cambia)
+        shard_key = getattr(self.vector_store, "shard_key", None)
+        if shard_key:
+            config["shard_key"] = shard_key
+        # Activar el índice de secciones re-procesa los papers para construirlo
+        if self.section_index is not None:
+            config["section_index"] = True
+        return config
+
+    def _paper_fingerprint(self, pdf_path: str, metadata_path: str) -> Dict[str, str]:
+        return {
+            "pdf_hash": IngestionManifest.file_hash(pdf_path),
+            "metadata_hash": IngestionManifest.file_hash(metadata_path),
+            "config_version": self.config_version,
+            "embedding_model": self.embedder.cache_key
+        }
+
+    def _is_unchanged(self, doc_id: str, fingerprint: Dict[str, str]) -> bool:
+        if self.manifest is None or not self.manifest.is_current(self.collection_name, doc_id, **fingerprint):
+            return False
+        # Un paper que falta en el índice léxico (p. ej. índice recién activado) se re-procesa,
+        # salvo que el manifiesto diga que no generó chunks (nunca estará en BM25)
+        if self.lexical_index is not None and not self.lexical_index.has_document(doc_id):
+            return self.manifest.get(self.collection_name, doc_id)["chunk_count"] == 0
+        return True
+
+    def _record_ingestion(self, doc_id: str, fingerprint: Dict[str, str], chunk_count: int):
+        if self.manifest is None:
+            return
+        self._pending_manifest.append((doc_id, fingerprint, chunk_count))
+        # Con escrituras en segundo plano solo se confirma tras flush()
+        if not getattr(self.vector_store, "background_writes", False):
+            self._commit_manifest()
+
+    def _commit_batch(self):
+        """Confirma el lote: escrituras pendientes, manifiesto, versión y BM25 en disco."""
+        self._commit_manifest()
+        if self.lexical_index is not None:
+            self.lexical_index.save()
+
+    def _commit_manifest(self):
+        self.vector_store.flush()
+        if self.section_index is not None:
+            self.section_index.flush()
+        for doc_id, fingerprint, chunk_count in self._pending_manifest:
+            self.manifest.record(self.collection_name, doc_id, chunk_count=chunk_count, **fingerprint)
+        self._pending_manifest = []
+        self._publish_collection_version()
+
+    def _mark_collection_changed(self):
+        self._collection_changed = True
+        # Con escrituras en segundo plano la versión se sube tras flush() (_commit_manifest)
+        if not getattr(self.vector_store, "background_writes", False):
+            self._publish_collection_version()
+
+    def _publish_collection_version(self):
+        if self._collection_changed and self.collection_versions is not None:
+            self.collection_versions.bump(self.collection_name)
+        self._collection_changed = False
+
+    def _embed_and_store(self, doc_id: str, ids: List[str], texts: List[str], metadatas: List[Dict]) -> int:
+        """
+        Embedding + upsert con deduplicación previa: solo los chunks nuevos
+        pasan por el embedder; los duplicados reutilizan el embedding de su
+        chunk canónico pero se guardan en su propia fila, así que no dependen
+        de que el documento canónico siga existiendo o no cambie.
+        El conjunto de chunks del documento se sustituye entero: los chunks de
+        una ingesta anterior que ya no existen se eliminan.
+        Devuelve el número de chunks almacenados.
+        """
+        if self.deduplicator is None:
+            embeddings = self.embedder.embed_batch(texts)
+            self._replace_chunks(doc_id, ids, texts, embeddings, metadatas)
+            return len(texts)
+
+        canonical = self.deduplicator.assign(ids, texts)
+
+        # Canónicos de documentos anteriores: su embedding ya está en el vector store
+        batch_ids = set(ids)
+        previous = self.vector_store.get_embeddings(
+            [c for c in canonical if c is not None and c not in batch_ids]
+        )
+
+        # Si el canónico no llegó a guardarse (p. ej. falló su ingesta) o es un chunk
+        # antiguo de este mismo documento (se va a borrar), el chunk se trata como nuevo
+        for i, c in enumerate(canonical):
+            if c is not None and c not in batch_ids and (c not in previous or c.startswith(f"{doc_id}_")):
+                canonical[i] = None
+
+        new_positions = [i for i, c in enumerate(canonical) if c is None]
+        embedded = self.embedder.embed_batch([texts[i] for i in new_positions])
+        by_id = dict(previous)
+        by_id.update({ids[i]: emb for i, emb in zip(new_positions, embedded)})
+
+        for metadata, c in zip(metadatas, canonical):
+            metadata["duplicate_of"] = c or ""
+
+        self._replace_chunks(
+            doc_id, ids, texts, [by_id[c or chunk_id] for chunk_id, c in zip(ids, canonical)], metadatas
+        )
+
+        skipped = len(texts) - len(new_positions)
+        if skipped:
+            print(f"   ♻️ {skipped} duplicate chunks reused an existing embedding")
+        return len(texts)
+
+    def _replace_chunks(self, doc_id: str, ids, texts, embeddings, metadatas):
+        # Sin doc_id no podemos acotar qué chunks son de este paper: solo upsert
+        if not doc_id:
+            self.vector_store.add_documents(ids=ids, texts=texts, embeddings=embeddings, metadatas=metadatas)
+            if self.lexical_index is not None:
+                self.lexical_index.add(ids, texts)
+            if self.section_index is not None:
+                self.section_index.add(ids, texts, embeddings, metadatas)
+            self._mark_collection_changed()
+            return
+
+        stale = self.vector_store.replace_document(
+            doc_id, texts=texts, embeddings=embeddings, metadatas=metadatas, ids=ids
+        )
+        if self.lexical_index is not None:
+            self.lexical_index.replace_document(doc_id, ids, texts)
+        if self.section_index is not None:
+            self.section_index.replace_document(doc_id, ids, texts, embeddings, metadatas)
+        self._mark_collection_changed()
+        if stale:
+            print(f"   🧹 Removed {stale} stale chunks from a previous ingestion")
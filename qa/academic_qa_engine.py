@@ -1,6 +1,7 @@
-import requests
 from typing import List, Dict
 
+from clients.ollama_client import get_ollama_client
+
 
 class AcademicQAEngine:
     """
@@ -13,11 +14,14 @@ class AcademicQAEngine:
         self,
         retriever,
         model_name: str = "llama3",
-        base_url: str = "http://localhost:11434"
+        base_url: str = "http://localhost:11434",
+        timeout: int = 180
     ):
         self.retriever = retriever
         self.model_name = model_name
         self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.client = get_ollama_client(self.base_url)
 
     # =====================================================
     # PUBLIC METHOD
@@ -110,21 +114,13 @@ ACADEMIC ANSWER:
 
     def _generate(self, prompt: str) -> str:
 
-        response = requests.post(
-            f"{self.base_url}/api/generate",
-            json={
-                "model": self.model_name,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.2,
-                    "top_p": 0.9,
-                    "num_predict": 600
-                }
-            }
+        return self.client.generate(
+            prompt,
+            model=self.model_name,
+            options={
+                "temperature": 0.2,
+                "top_p": 0.9,
+                "num_predict": 600
+            },
+            timeout=self.timeout
         )
-
-        if response.status_code != 200:
-            raise RuntimeError(response.text)
-
-        return response.json()["response"]
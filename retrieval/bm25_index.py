@@ -0,0 +1,369 @@
+import os
+import re
+import json
+import math
+import threading
+import unicodedata
+from typing import List, Dict, Optional, Tuple, Iterable
+
+import numpy as np
+
+
+class BM25Index:
+    """
+    Índice léxico BM25 persistido, construido de forma incremental por los
+    pipelines de ingesta (complementa al índice denso en HybridRetriever).
+
+    Postings en formato CSR compacto:
+    - term_offsets[t]:term_offsets[t + 1] delimita los postings del término t
+    - post_rows (int32): fila del chunk, ascendente dentro de cada término
+    - post_tfs (uint16): frecuencia del término en el chunk
+
+    Las altas se acumulan en un delta en memoria y se fusionan con el CSR al
+    buscar o guardar; las bajas marcan la fila como muerta y se purgan al
+    compactar (save() compacta si más del 20% de las filas están muertas).
+    """
+
+    # Conserva términos compuestos ("20022", "2.2", "erc-20", "iso/iec")
+    TOKEN_PATTERN = re.compile(r"[^\W_]+(?:[.\-/][^\W_]+)*", re.UNICODE)
+    # Postings y metadatos en un único fichero: un solo os.replace al guardar
+    INDEX_FILE = "index.npz"
+    COMPACT_RATIO = 0.2
+
+    def __init__(self, path: str = "./bm25_index", k1: float = 1.2, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.RLock()
+
+        # Vocabulario y postings (CSR + delta pendiente)
+        self._vocab: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._post_rows = np.empty(0, dtype=np.int32)
+        self._post_tfs = np.empty(0, dtype=np.uint16)
+        self._pending: Dict[int, List[Tuple[int, int]]] = {}
+
+        # Filas (una por chunk; las re-ingestas añaden filas nuevas)
+        self._ids: List[str] = []
+        self._doc_ids: List[str] = []
+        self._lengths: List[int] = []
+        self._live: List[bool] = []
+        self._row_of: Dict[str, int] = {}
+        self._rows_of_doc: Dict[str, List[int]] = {}
+        # Papers indexados (incluye los que no generaron chunks)
+        self._documents: set = set()
+
+        # Vistas numpy de _lengths/_live (se invalidan al escribir)
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._dirty = False
+
+        self._load()
+
+    @staticmethod
+    def collection_path(collection_name: str, directory: str = "./bm25_index") -> str:
+        """Ruta del índice de una colección (un índice BM25 por colección)."""
+        return os.path.join(directory, collection_name)
+
+    # ===============================
+    # TOKENIZACIÓN
+    # ===============================
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        """
+        Minúsculas + NFKC. Los compuestos con guion o barra se indexan
+        también por partes ("erc-20" -> "erc-20", "erc", "20").
+        """
+        tokens = []
+        for token in cls.TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()):
+            tokens.append(token)
+            if "-" in token or "/" in token:
+                tokens.extend(p for p in re.split(r"[\-/]", token) if p)
+        return tokens
+
+    # ===============================
+    # ESCRITURA
+    # ===============================
+
+    def add(self, ids: List[str], texts: List[str], doc_ids: Optional[List[str]] = None):
+        """
+        Upsert por ID: un ID existente deja su fila anterior como muerta.
+        """
+        if doc_ids is None:
+            doc_ids = [""] * len(ids)
+        if not (len(ids) == len(texts) == len(doc_ids)):
+            raise ValueError("ids, texts y doc_ids deben tener el mismo tamaño")
+
+        with self._lock:
+            for chunk_id, text, doc_id in zip(ids, texts, doc_ids):
+                self._kill_row(self._row_of.get(chunk_id))
+
+                row = len(self._ids)
+                tokens = self.tokenize(text)
+                self._ids.append(chunk_id)
+                self._doc_ids.append(doc_id)
+                self._lengths.append(len(tokens))
+                self._live.append(True)
+                self._row_of[chunk_id] = row
+                if doc_id:
+                    self._rows_of_doc.setdefault(doc_id, []).append(row)
+
+                counts: Dict[str, int] = {}
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                for token, tf in counts.items():
+                    term_id = self._vocab.get(token)
+                    if term_id is None:
+                        term_id = len(self._terms)
+                        self._vocab[token] = term_id
+                        self._terms.append(token)
+                    self._pending.setdefault(term_id, []).append((row, min(tf, 65535)))
+
+            self._arrays = None
+            self._dirty = True
+
+    def replace_document(self, doc_id: str, ids: List[str], texts: List[str]):
+        """
+        Sustituye el conjunto de chunks de un paper (mismo contrato que
+        BaseVectorStore.replace_document).
+        """
+        with self._lock:
+            self.remove_document(doc_id)
+            self.add(ids, texts, [doc_id] * len(ids))
+            self._documents.add(doc_id)
+
+    def remove_document(self, doc_id: str) -> int:
+        with self._lock:
+            rows = self._rows_of_doc.pop(doc_id, [])
+            removed = sum(self._kill_row(row) for row in rows)
+            self._documents.discard(doc_id)
+            self._arrays = None
+            self._dirty = True
+            return removed
+
+    def remove(self, ids: Iterable[str]) -> int:
+        with self._lock:
+            removed = sum(self._kill_row(self._row_of.get(chunk_id)) for chunk_id in ids)
+            self._arrays = None
+            self._dirty = True
+            return removed
+
+    def has_document(self, doc_id: str) -> bool:
+        return doc_id in self._documents
+
+    def doc_ids(self) -> List[str]:
+        with self._lock:
+            return sorted(self._documents)
+
+    # ===============================
+    # BÚSQUEDA
+    # ===============================
+
+    def search(self, query: str, n_results: int = 10) -> List[Tuple[str, float]]:
+        """
+        Top-k BM25: [(chunk_id, score), ...] de mayor a menor score.
+        """
+        terms = set(self.tokenize(query))
+
+        with self._lock:
+            self._merge_pending()
+            lengths, live = self._row_arrays()
+            n_live = int(live.sum())
+            if n_live == 0 or not terms:
+                return []
+
+            avg_length = float(lengths[live].mean()) or 1.0
+            scores = np.zeros(len(self._ids), dtype=np.float32)
+
+            for term in terms:
+                term_id = self._vocab.get(term)
+                if term_id is None:
+                    continue
+                start, end = self._offsets[term_id], self._offsets[term_id + 1]
+                rows = self._post_rows[start:end]
+                keep = live[rows]
+                rows = rows[keep]
+                if len(rows) == 0:
+                    continue
+                tfs = self._post_tfs[start:end][keep].astype(np.float32)
+
+                df = len(rows)
+                idf = math.log(1.0 + (n_live - df + 0.5) / (df + 0.5))
+                norm = self.k1 * (1.0 - self.b + self.b * lengths[rows] / avg_length)
+                # Cada fila aparece una vez por término: += con índices es seguro
+                scores[rows] += idf * tfs * (self.k1 + 1.0) / (tfs + norm)
+
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > n_results:
+                top = np.argpartition(-scores[candidates], n_results - 1)[:n_results]
+                candidates = candidates[top]
+            # Orden estable: a igual score, el chunk indexado antes
+            order = candidates[np.lexsort((candidates, -scores[candidates]))]
+            return [(self._ids[row], float(scores[row])) for row in order]
+
+    # ===============================
+    # PERSISTENCIA
+    # ===============================
+
+    def save(self):
+        """
+        Escritura atómica: postings y metadatos van en un único .npz temporal
+        que sustituye al anterior con un solo os.replace (un lector o un
+        proceso interrumpido nunca ven una mezcla de versiones).
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._merge_pending()
+            dead = self._live.count(False)
+            if self._ids and dead / len(self._ids) > self.COMPACT_RATIO:
+                self.compact()
+
+            os.makedirs(self.path, exist_ok=True)
+            meta = json.dumps(
+                {
+                    "k1": self.k1,
+                    "b": self.b,
+                    "terms": self._terms,
+                    "ids": self._ids,
+                    "doc_ids": self._doc_ids,
+                    "documents": sorted(self._documents)
+                },
+                ensure_ascii=False
+            )
+            tmp_path = os.path.join(self.path, "index.tmp.npz")
+            np.savez(
+                tmp_path,
+                term_offsets=self._offsets,
+                post_rows=self._post_rows,
+                post_tfs=self._post_tfs,
+                lengths=np.asarray(self._lengths, dtype=np.int32),
+                live=np.asarray(self._live, dtype=bool),
+                meta=np.frombuffer(meta.encode("utf-8"), dtype=np.uint8)
+            )
+            os.replace(tmp_path, os.path.join(self.path, self.INDEX_FILE))
+            self._dirty = False
+
+    def compact(self):
+        """
+        Elimina las filas muertas de los postings y renumera las vivas.
+        """
+        with self._lock:
+            self._merge_pending()
+            live = np.asarray(self._live, dtype=bool)
+            if live.all():
+                return
+
+            new_row = np.full(len(live), -1, dtype=np.int64)
+            new_row[live] = np.arange(int(live.sum()))
+
+            term_of = np.repeat(np.arange(len(self._terms)), np.diff(self._offsets))
+            keep = live[self._post_rows]
+            self._post_rows = new_row[self._post_rows[keep]].astype(np.int32)
+            self._post_tfs = self._post_tfs[keep]
+            counts = np.bincount(term_of[keep], minlength=len(self._terms))
+            self._offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+            kept_rows = np.flatnonzero(live).tolist()
+            self._ids = [self._ids[r] for r in kept_rows]
+            self._doc_ids = [self._doc_ids[r] for r in kept_rows]
+            self._lengths = [self._lengths[r] for r in kept_rows]
+            self._live = [True] * len(kept_rows)
+            self._rebuild_row_maps()
+            self._arrays = None
+            self._dirty = True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "chunks": self._live.count(True),
+                "dead_rows": self._live.count(False),
+                "documents": len(self._documents),
+                "terms": len(self._terms),
+                "postings": int(len(self._post_rows) + sum(len(p) for p in self._pending.values()))
+            }
+
+    def __len__(self) -> int:
+        return self._live.count(True)
+
+    # ===============================
+    # INTERNOS
+    # ===============================
+
+    def _kill_row(self, row: Optional[int]) -> int:
+        if row is None or not self._live[row]:
+            return 0
+        self._live[row] = False
+        chunk_id = self._ids[row]
+        if self._row_of.get(chunk_id) == row:
+            del self._row_of[chunk_id]
+        return 1
+
+    def _row_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._arrays is None:
+            self._arrays = (
+                np.asarray(self._lengths, dtype=np.float32),
+                np.asarray(self._live, dtype=bool)
+            )
+        return self._arrays
+
+    def _merge_pending(self):
+        """
+        Fusiona el delta con el CSR: orden estable por término, así las
+        filas nuevas (mayores) quedan detrás de las existentes.
+        """
+        if not self._pending:
+            return
+
+        n_terms = len(self._terms)
+        old_terms = np.repeat(np.arange(len(self._offsets) - 1), np.diff(self._offsets))
+
+        new_terms, new_rows, new_tfs = [], [], []
+        for term_id, postings in self._pending.items():
+            new_terms.extend([term_id] * len(postings))
+            for row, tf in postings:
+                new_rows.append(row)
+                new_tfs.append(tf)
+
+        terms = np.concatenate([old_terms, np.asarray(new_terms, dtype=np.int64)])
+        rows = np.concatenate([self._post_rows, np.asarray(new_rows, dtype=np.int32)])
+        tfs = np.concatenate([self._post_tfs, np.asarray(new_tfs, dtype=np.uint16)])
+
+        order = np.argsort(terms, kind="stable")
+        self._post_rows = rows[order]
+        self._post_tfs = tfs[order]
+        counts = np.bincount(terms, minlength=n_terms)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._pending = {}
+
+    def _rebuild_row_maps(self):
+        self._row_of = {}
+        self._rows_of_doc = {}
+        for row, (chunk_id, doc_id) in enumerate(zip(self._ids, self._doc_ids)):
+            if not self._live[row]:
+                continue
+            self._row_of[chunk_id] = row
+            if doc_id:
+                self._rows_of_doc.setdefault(doc_id, []).append(row)
+
+    def _load(self):
+        index_path = os.path.join(self.path, self.INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+
+        with np.load(index_path) as arrays:
+            self._offsets = arrays["term_offsets"]
+            self._post_rows = arrays["post_rows"]
+            self._post_tfs = arrays["post_tfs"]
+            self._lengths = arrays["lengths"].tolist()
+            self._live = arrays["live"].tolist()
+            meta = json.loads(arrays["meta"].tobytes().decode("utf-8"))
+
+        self._terms = meta["terms"]
+        self._vocab = {term: i for i, term in enumerate(self._terms)}
+        self._ids = meta["ids"]
+        self._doc_ids = meta["doc_ids"]
+        self._documents = set(meta["documents"])
+        self._rebuild_row_maps()
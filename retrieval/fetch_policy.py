@@ -0,0 +1,116 @@
+import math
+import threading
+from collections import deque
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+
+class AdaptiveFetchPolicy:
+    """
+    Tamaño adaptativo del conjunto de candidatos del re-ranking, en lugar
+    del factor fijo del perfil (n_results * 2 en search2, * 3 en search3).
+
+    Se empieza con pocos candidatos y solo se amplía (growth x, hasta
+    max_factor x n_results) cuando el top-k re-rankeado tiene menos de
+    min_distinct_ratio * n_results papers distintos: la penalización de
+    diversidad está tirando de chunks repetidos. Si el vector store devuelve
+    menos candidatos de los pedidos (filtro muy selectivo o colección
+    pequeña) ya no hay más que traer y se para.
+
+    Registra el factor que realmente necesitó cada consulta (stats /
+    suggested_factor) para poder ajustar initial_factor con datos.
+    """
+
+    def __init__(
+        self,
+        initial_factor: float = 1.5,
+        growth: float = 2.0,
+        max_factor: float = 8.0,
+        min_distinct_ratio: float = 0.5,
+        history_size: int = 10000
+    ):
+        if initial_factor < 1.0 or max_factor < initial_factor or growth <= 1.0:
+            raise ValueError("Need 1 <= initial_factor <= max_factor and growth > 1")
+
+        self.initial_factor = initial_factor
+        self.growth = growth
+        self.max_factor = max_factor
+        self.min_distinct_ratio = min_distinct_ratio
+
+        self._lock = threading.Lock()
+        self._needed: "deque[float]" = deque(maxlen=history_size)
+
+        self.queries = 0
+        self.rounds = 0
+        self.expansions = 0
+        self.exhausted = 0
+        self.capped = 0
+        self.candidates_fetched = 0
+
+    # ===============================
+    # POLÍTICA
+    # ===============================
+
+    def describe(self) -> Dict[str, float]:
+        """Parámetros que cambian los resultados (parte de la clave de la caché)."""
+        return {
+            "initial_factor": self.initial_factor,
+            "growth": self.growth,
+            "max_factor": self.max_factor,
+            "min_distinct_ratio": self.min_distinct_ratio
+        }
+
+    def initial_fetch(self, n_results: int) -> int:
+        return max(n_results, math.ceil(n_results * self.initial_factor))
+
+    def next_fetch(self, fetch: int, n_results: int) -> Optional[int]:
+        """Siguiente tamaño de candidatos, o None si ya se llegó al máximo."""
+        limit = math.ceil(n_results * self.max_factor)
+        if fetch >= limit:
+            return None
+        return min(limit, math.ceil(fetch * self.growth))
+
+    def is_sufficient(self, results: List[Dict], returned: int, fetch: int, n_results: int) -> bool:
+        # Menos candidatos de los pedidos: el filtro/la colección no tiene más
+        if returned < fetch:
+            return True
+        distinct = len({r["metadata"].get("doc_id", "unknown") for r in results})
+        return distinct >= math.ceil(n_results * self.min_distinct_ratio)
+
+    # ===============================
+    # MÉTRICAS
+    # ===============================
+
+    def record(self, fetch: int, n_results: int, rounds: int, fetched: int, exhausted: bool, capped: bool):
+        """Una consulta resuelta: tamaño final de candidatos y rondas usadas."""
+        with self._lock:
+            self.queries += 1
+            self.rounds += rounds
+            self.expansions += rounds - 1
+            self.exhausted += int(exhausted)
+            self.capped += int(capped)
+            self.candidates_fetched += fetched
+            self._needed.append(fetch / max(1, n_results))
+
+    def suggested_factor(self, quantile: float = 0.9) -> Optional[float]:
+        """Factor inicial que habría bastado en ese cuantil de las consultas registradas."""
+        with self._lock:
+            if not self._needed:
+                return None
+            return round(float(np.quantile(np.asarray(self._needed), quantile)), 2)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            needed = np.asarray(self._needed) if self._needed else None
+            return {
+                "queries": self.queries,
+                "avg_rounds": round(self.rounds / self.queries, 3) if self.queries else 0.0,
+                "expansions": self.expansions,
+                "exhausted": self.exhausted,
+                "capped": self.capped,
+                "avg_candidates": round(self.candidates_fetched / self.queries, 1) if self.queries else 0.0,
+                "needed_factor_p50": round(float(np.quantile(needed, 0.5)), 2) if needed is not None else None,
+                "needed_factor_p90": round(float(np.quantile(needed, 0.9)), 2) if needed is not None else None,
+                "needed_factor_max": round(float(needed.max()), 2) if needed is not None else None
+            }
@@ -1,6 +1,16 @@
+import os
 import numpy as np
-from datetime import datetime
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from retrieval.query_cache import QueryEmbeddingCache
+from retrieval.bm25_index import BM25Index
+from retrieval.rerank_engine import RerankEngine
+from retrieval.result_cache import CollectionVersions, SearchResultCache
+from retrieval.fetch_policy import AdaptiveFetchPolicy
+from retrieval.section_index import SectionIndex
+from embedding.factory import build_embedder
+from vectorstore.factory import build_vector_store, build_companion_store, storage_path
 
 class HybridRetriever:
     """
@@ -14,35 +24,76 @@ class HybridRetriever:
     def __init__(
         self,
         embedder,
-        vector_store,
+        vector_store=None,
         semantic_weight: float = 0.50,    # Peso de la relevancia del texto
         structural_weight: float = 0.20,  # Peso de la jerarquía académica (Results > Abstract)
         recency_weight: float = 0.15,     # Peso de la actualidad del paper
-        diversity_weight: float = 0.15    # Peso para variar fuentes bibliográficas
+        diversity_weight: float = 0.15,   # Peso para variar fuentes bibliográficas
+        query_cache_size: int = 256,      # LRU de embeddings de consulta (0 = desactivado)
+        query_cache_ttl: Optional[float] = None,
+        lexical_index: Optional[BM25Index] = None,  # BM25 de search_hybrid (por defecto {persist_directory}/bm25_index/<colección>)
+        mmr_lambda: Optional[float] = None,         # MMR sobre embeddings (None = solo penalización por paper)
+        mmr_doc_penalty: bool = True,               # Con MMR, mantener también la penalización por paper
+        result_cache_size: int = 512,               # LRU de resultados de search2/search3/search_many (0 = desactivado)
+        result_cache_path: Optional[str] = "{persist_directory}/search_cache.sqlite",  # Versiones de colección (las sube la ingesta)
+        result_cache_shared: bool = False,          # Compartir resultados entre procesos en ese mismo SQLite
+        fetch_policy: Optional[AdaptiveFetchPolicy] = None,  # Over-fetch adaptativo (None = factor fijo del perfil)
+        section_index: Optional[SectionIndex] = None  # Índice de secciones de search_two_stage (por defecto <colección>__sections)
     ):
-        self.embedder = embedder
-        self.vector_store = vector_store
+        # Sin embedder/vector store explícitos usamos los backends de config/models.yaml
+        self.embedder = embedder if embedder is not None else build_embedder()
+        self.vector_store = vector_store if vector_store is not None else build_vector_store()
+
+        # La dimensión de las consultas debe coincidir con la de la colección
+        query_dim = getattr(self.embedder, "dimensions", None)
+        index_dim = getattr(self.vector_store, "embedding_dim", None)
+        if query_dim is not None and index_dim is not None and query_dim != index_dim:
+            raise ValueError(
+                f"Embedder produces {query_dim}-dim vectors but the collection "
+                f"stores {index_dim}-dim embeddings"
+            )
         
+        # El score semántico depende del espacio de distancia de la colección
+        self.space = getattr(self.vector_store, "space", "l2")
+
         self.semantic_weight = semantic_weight
         self.structural_weight = structural_weight
         self.recency_weight = recency_weight
         self.diversity_weight = diversity_weight
+        self.mmr_lambda = mmr_lambda
+        self.mmr_doc_penalty = mmr_doc_penalty
+        self.fetch_policy = fetch_policy
 
-    # --------------------------------------------------
-    # Cálculo de Recencia No-Lineal (Prioridad a lo último)
-    # --------------------------------------------------
-    def _compute_recency_score(self, year: int) -> float:
-        if not year or year == 0:
-            return 0.5 # Default para papers sin año detectado
+        self.query_cache = QueryEmbeddingCache(max_size=query_cache_size, ttl=query_cache_ttl)
+        # Resultados completos; se invalidan cuando la ingesta sube la versión de la colección
+        # (mismo fichero de versiones que los pipelines: junto al vector store)
+        result_cache_path = storage_path(result_cache_path, self._storage_directory())
+        self.result_cache = SearchResultCache(
+            versions=CollectionVersions(result_cache_path) if result_cache_size > 0 and result_cache_path else None,
+            max_size=result_cache_size,
+            shared=result_cache_shared
+        )
 
-        current_year = datetime.now().year
-        age = current_year - year
+        # Índice léxico y el hilo que lo consulta en paralelo al denso (se crean al primer uso)
+        self._lexical_index = lexical_index
+        self._lexical_executor: Optional[ThreadPoolExecutor] = None
+        self._section_index = section_index
 
-        if age <= 1: return 1.0     # 2025-2026 (Estado del arte)
-        elif age <= 3: return 0.85  # 2023-2024
-        elif age <= 5: return 0.65  # 2021-2022
-        elif age <= 8: return 0.45  # 2018-2020
-        else: return 0.30           # < 2018 (Contexto histórico)
+    # --------------------------------------------------
+    # Motor de re-ranking (pesos actuales del retriever)
+    # --------------------------------------------------
+    @property
+    def rerank_engine(self) -> RerankEngine:
+        # Se construye en cada búsqueda: los pesos pueden ajustarse tras crear el retriever
+        return RerankEngine(
+            semantic_weight=self.semantic_weight,
+            structural_weight=self.structural_weight,
+            recency_weight=self.recency_weight,
+            diversity_weight=self.diversity_weight,
+            space=self.space,
+            mmr_lambda=self.mmr_lambda,
+            mmr_doc_penalty=self.mmr_doc_penalty
+        )
 
     # --------------------------------------------------
     # Método Principal de Búsqueda (Híbrido)
@@ -52,75 +103,7 @@ class HybridRetriever:
         Realiza una búsqueda semántica y aplica el re-ranking basado en 
         metadatos académicos.
         """
-        # 1. Generar embedding de la consulta
-        query_embedding = self.embedder.embed_text(query_text)
-
-        # 2. Query inicial a Chroma (pedimos más para filtrar después)
-        raw_results = self.vector_store.query(
-            query_embedding=query_embedding,
-            n_results=n_results * 2,
-            where_filter=where_filter
-        )
-
-        documents = raw_results["documents"][0]
-        metadatas = raw_results["metadatas"][0]
-        distances = raw_results["distances"][0]
-
-        scored_results = []
-        doc_counts = {} # Registro para diversidad
-
-        for doc, metadata, distance in zip(documents, metadatas, distances):
-            # A. Score Semántico (Invertimos la distancia para que menor sea mejor)
-            semantic_score = 1 / (1 + distance)
-            
-            # B. Score Estructural (Priorizamos secciones clave)
-            # Recuperamos el structural_weight calculado en la ingesta
-            structural_score = metadata.get("structural_weight", 0.6)
-            
-            # Bonus por patrones de Taxonomía o Tablas detectados por el Chunker
-            if metadata.get("has_taxonomy_pattern"):
-                structural_score += 0.15
-            if metadata.get("has_structured_table"):
-                structural_score += 0.10
-            
-            # C. Score de Recencia
-            year = metadata.get("year", 0)
-            recency_score = self._compute_recency_score(year)
-
-            # D. Score de Diversidad (Penalizamos si traemos demasiados chunks del mismo paper)
-            doc_id = metadata.get("doc_id", "unknown")
-            doc_counts[doc_id] = doc_counts.get(doc_id, 0) + 1
-            
-            if doc_counts[doc_id] == 1:
-                diversity_score = 1.0
-            elif doc_counts[doc_id] == 2:
-                diversity_score = 0.7
-            else:
-                diversity_score = 0.4 # Penalización fuerte al tercer chunk del mismo doc
-
-            # --- CÁLCULO DEL FINAL SCORE PONDERADO ---
-            final_score = (
-                self.semantic_weight * semantic_score +
-                self.structural_weight * min(structural_score, 1.5) +
-                self.recency_weight * recency_score +
-                self.diversity_weight * diversity_score
-            )
-
-            scored_results.append({
-                "text": doc,
-                "metadata": metadata,
-                "final_score": final_score,
-                "breakdown": {
-                    "semantic": round(semantic_score, 3),
-                    "structural": round(structural_score, 3),
-                    "recency": round(recency_score, 3),
-                    "diversity": round(diversity_score, 3)
-                }
-            })
-
-        # 3. Ordenar por el score final y recortar al Top K deseado
-        scored_results.sort(key=lambda x: x["final_score"], reverse=True)
-        return scored_results[:n_results]
+        return self._search_one(query_text, n_results, where_filter, profile="search2")
    
     # --------------------------------------------------
     # Método Principal de Búsqueda (Híbrido) tiene metadat de investigacion TRL, contradicciones y entidades
@@ -130,91 +113,410 @@ class HybridRetriever:
         Realiza una búsqueda semántica y aplica el re-ranking basado en 
         metadatos académicos e inteligencia estratégica (TRL, Contradicciones).
         """
-        # 1. Generar embedding de la consulta
-        query_embedding = self.embedder.embed_text(query_text)
+        return self._search_one(query_text, n_results, where_filter, profile="search3")
 
-        # 2. Query inicial a Chroma
-        # Pedimos n_results * 3 para tener margen de maniobra con el re-ranking de diversidad
-        raw_results = self.vector_store.query(
-            query_embedding=query_embedding,
-            n_results=n_results * 3,
-            where_filter=where_filter
-        )
+    def _search_one(self, query_text: str, n_results: int, where_filter: dict, profile: str) -> List[Dict]:
+        # 0. Misma búsqueda sobre la misma versión de la colección: resultado cacheado
+        cache_key, version = self._result_cache_lookup_key(query_text, n_results, where_filter, profile)
+        if cache_key is not None:
+            cached = self.result_cache.get(cache_key, version)
+            if cached is not None:
+                return cached
+
+        # 1. Generar embedding de la consulta (con caché LRU)
+        query_embedding = self.embed_query(query_text)
+
+        # 2. Candidatos (más de n_results: margen para el re-ranking de diversidad)
+        #    y re-ranking vectorizado con recorte al Top K.
+        #    Sin textos: solo se cargan los del top-k final
+        results = self._fetch_and_rerank([query_embedding], n_results, where_filter, profile)
+        results = self._attach_texts(results[0] if results else [])
+
+        if cache_key is not None:
+            self.result_cache.put(cache_key, self.vector_store.collection_name, version, results)
+        return results
+
+    # --------------------------------------------------
+    # Búsqueda Multi-Consulta (dashboards y reportes por pilar)
+    # --------------------------------------------------
+    # Perfiles de search2 / search3 (over-fetch, diversidad, redondeo, metadata)
+    SEARCH_PROFILES = RerankEngine.PROFILES
+
+    # El re-ranking solo necesita metadata y distancias; los textos de los
+    # candidatos descartados nunca se leen del vector store
+    RERANK_INCLUDE = ["metadatas", "distances"]
 
-        # Validación de seguridad si no hay resultados
-        if not raw_results or not raw_results["documents"]:
+    # Raíz del índice BM25 por defecto (la misma que usan los pipelines de ingesta)
+    LEXICAL_INDEX_PATH = "{persist_directory}/bm25_index"
+
+    @property
+    def rerank_include(self) -> List[str]:
+        # MMR compara los candidatos entre sí: necesita sus embeddings
+        if self.mmr_lambda is None:
+            return self.RERANK_INCLUDE
+        return self.RERANK_INCLUDE + ["embeddings"]
+
+    def search_many(
+        self,
+        queries: List[str],
+        n_results: int = 10,
+        where_filter: dict = None,
+        profile: str = "search3"
+    ) -> List[List[Dict]]:
+        """
+        Igual que search3 (o search2 con profile="search2") para N consultas:
+        un solo batch de embeddings, una sola query al vector store y un
+        re-ranking vectorizado de todos los conjuntos de resultados.
+        Devuelve una lista de resultados por consulta, en el mismo orden.
+        """
+        if profile not in self.SEARCH_PROFILES:
+            raise ValueError(f"Unknown profile '{profile}'. Use one of {list(self.SEARCH_PROFILES)}")
+        if not queries:
             return []
 
-        documents = raw_results["documents"][0]
-        metadatas = raw_results["metadatas"][0]
-        distances = raw_results["distances"][0]
-
-        scored_results = []
-        doc_counts = {} 
-
-        for doc, metadata, distance in zip(documents, metadatas, distances):
-            # A. Score Semántico (Similitud del vector)
-            semantic_score = 1 / (1 + distance)
-            
-            # B. Score Estructural (Prioridad de secciones)
-            structural_score = float(metadata.get("structural_weight", 0.6))
-            
-            # Bonus por patrones de Taxonomía o Tablas
-            if metadata.get("has_taxonomy_pattern"):
-                structural_score += 0.15
-            if metadata.get("has_structured_table"):
-                structural_score += 0.10
-            
-            # C. Score de Recencia (Usa el año del paper)
-            year = metadata.get("year", 0)
-            recency_score = self._compute_recency_score(year)
-
-            # D. Score de Diversidad 
-            doc_id = metadata.get("doc_id", "unknown")
-            doc_counts[doc_id] = doc_counts.get(doc_id, 0) + 1
-            
-            if doc_counts[doc_id] == 1:
-                diversity_score = 1.0
-            elif doc_counts[doc_id] == 2:
-                diversity_score = 0.6
+        queries = list(queries)
+
+        # 0. Consultas ya resueltas sobre la versión actual de la colección
+        all_results: List[Optional[List[Dict]]] = [None] * len(queries)
+        cache_keys, version = [None] * len(queries), None
+        if self.result_cache.enabled:
+            version = self.result_cache.version(self.vector_store.collection_name)
+            for i, query_text in enumerate(queries):
+                cache_keys[i] = self._result_cache_key(query_text, n_results, where_filter, profile)
+                all_results[i] = self.result_cache.get(cache_keys[i], version)
+
+        missing = [i for i, results in enumerate(all_results) if results is None]
+        if not missing:
+            return all_results
+
+        # 1. Embeddings de las consultas pendientes (solo las que faltan en caché)
+        query_embeddings = self.embed_queries([queries[i] for i in missing])
+
+        # 2. Una sola llamada al vector store (por ronda, con over-fetch adaptativo)
+        #    y re-ranking vectorizado de todas las consultas
+        fresh = self._fetch_and_rerank(query_embeddings, n_results, where_filter, profile) or [[] for _ in missing]
+
+        # 3. Textos del top-k de todas las consultas en una sola lectura
+        self._attach_texts([r for results in fresh for r in results])
+
+        for i, results in zip(missing, fresh):
+            all_results[i] = results
+            if cache_keys[i] is not None:
+                self.result_cache.put(cache_keys[i], self.vector_store.collection_name, version, results)
+        return all_results
+
+    def _fetch_and_rerank(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int,
+        where_filter: dict,
+        profile: str,
+        ids: Optional[List[str]] = None
+    ) -> List[List[Dict]]:
+        """
+        Candidatos del vector store (solo entre `ids` si se indican) +
+        re-ranking. Sin fetch_policy se piden n_results * fetch_factor del
+        perfil; con ella se empieza con menos y solo se vuelve a consultar,
+        con más candidatos, para las consultas cuyo top-k no quedó resuelto.
+        """
+        if self.fetch_policy is None:
+            fetch = n_results * self.SEARCH_PROFILES[profile]["fetch_factor"]
+            if len(query_embeddings) == 1:
+                raw_results = self.vector_store.query(
+                    query_embedding=query_embeddings[0], n_results=fetch,
+                    where_filter=where_filter, include=self.rerank_include, ids=ids
+                )
             else:
-                diversity_score = 0.3 
-
-            # --- CÁLCULO DEL FINAL SCORE PONDERADO ---
-            # Asegúrate de que los atributos (self.semantic_weight, etc) existan en el __init__
-            final_score = (
-                self.semantic_weight * semantic_score +
-                self.structural_weight * min(structural_score, 1.5) +
-                self.recency_weight * recency_score +
-                self.diversity_weight * diversity_score
+                raw_results = self.vector_store.query_many(
+                    query_embeddings=query_embeddings, n_results=fetch,
+                    where_filter=where_filter, include=self.rerank_include, ids=ids
+                )
+            return self._rerank_many(raw_results, n_results, profile)
+
+        policy = self.fetch_policy
+        all_results: List[List[Dict]] = [[] for _ in query_embeddings]
+        fetched = [0] * len(query_embeddings)
+        pending = list(range(len(query_embeddings)))
+        fetch, rounds = policy.initial_fetch(n_results), 0
+
+        while pending:
+            rounds += 1
+            raw_results = self.vector_store.query_many(
+                query_embeddings=[query_embeddings[i] for i in pending],
+                n_results=fetch,
+                where_filter=where_filter,
+                include=self.rerank_include,
+                ids=ids
+            )
+            reranked = self._rerank_many(raw_results, n_results, profile) or [[] for _ in pending]
+            next_fetch = policy.next_fetch(fetch, n_results)
+
+            unresolved = []
+            for j, i in enumerate(pending):
+                returned = len(raw_results["ids"][j]) if raw_results.get("ids") else 0
+                all_results[i] = reranked[j]
+                fetched[i] += returned
+                sufficient = policy.is_sufficient(reranked[j], returned, fetch, n_results)
+                if sufficient or next_fetch is None:
+                    policy.record(
+                        fetch, n_results, rounds, fetched[i],
+                        exhausted=returned < fetch, capped=not sufficient
+                    )
+                else:
+                    unresolved.append(i)
+
+            pending, fetch = unresolved, next_fetch
+
+        return all_results
+
+    def _result_cache_key(self, query_text: str, n_results: int, where_filter: dict, profile: str) -> str:
+        """Todo lo que determina el resultado de una búsqueda densa re-rankeada."""
+        return SearchResultCache.make_key({
+            "collection": self.vector_store.collection_name,
+            "store": [
+                type(self.vector_store).__name__,
+                os.path.abspath(getattr(self.vector_store, "persist_directory", "") or ""),
+                getattr(self.vector_store, "quantization", None)
+            ],
+            "embedder": getattr(self.embedder, "cache_key", type(self.embedder).__name__),
+            "query": query_text,
+            "n_results": n_results,
+            "where": where_filter,
+            "profile": profile,
+            "space": self.space,
+            "weights": [self.semantic_weight, self.structural_weight, self.recency_weight, self.diversity_weight],
+            "mmr": [self.mmr_lambda, self.mmr_doc_penalty],
+            "fetch": self.fetch_policy.describe() if self.fetch_policy is not None else None
+        })
+
+    def _result_cache_lookup_key(self, query_text: str, n_results: int, where_filter: dict, profile: str):
+        if not self.result_cache.enabled:
+            return None, None
+        version = self.result_cache.version(self.vector_store.collection_name)
+        return self._result_cache_key(query_text, n_results, where_filter, profile), version
+
+    def _rerank_many(
+        self,
+        raw_results: Dict[str, List],
+        n_results: int,
+        profile: str,
+        relevance: Optional[List[List[float]]] = None
+    ) -> List[List[Dict]]:
+        """
+        Pasa los candidatos de una respuesta del vector store al RerankEngine.
+        `relevance` sustituye al score semántico derivado de la distancia
+        (p. ej. el score RRF normalizado de search_hybrid).
+        """
+        ids_per_query = (raw_results or {}).get("ids") or []
+        if not ids_per_query:
+            return []
+        return self.rerank_engine.rerank_many(
+            ids_per_query,
+            raw_results["metadatas"],
+            raw_results["distances"],
+            n_results,
+            profile,
+            relevance=relevance,
+            embeddings_per_query=raw_results.get("embeddings")
+        )
+
+    # --------------------------------------------------
+    # Búsqueda Híbrida Real: Denso + Léxico (BM25) con RRF
+    # --------------------------------------------------
+    def search_hybrid(
+        self,
+        query_text: str,
+        n_results: int = 10,
+        where_filter: dict = None,
+        profile: str = "search3",
+        rrf_k: int = 60
+    ) -> List[Dict]:
+        """
+        Recupera candidatos densos (vector store) y léxicos (BM25) en
+        paralelo, los fusiona con Reciprocal Rank Fusion y aplica después el
+        re-ranking estructural/recencia/diversidad del perfil indicado.
+        El componente "semantic" del breakdown es el score RRF normalizado a
+        [0, 1]; "ranks" indica la posición del chunk en cada lista.
+        """
+        if profile not in self.SEARCH_PROFILES:
+            raise ValueError(f"Unknown profile '{profile}'. Use one of {list(self.SEARCH_PROFILES)}")
+
+        fetch = n_results * self.SEARCH_PROFILES[profile]["fetch_factor"]
+
+        # 1. BM25 en un hilo aparte mientras se embebe la consulta y se consulta el índice denso.
+        #    Con filtro se piden más candidatos léxicos: parte no lo cumplirá
+        lexical_future = self._get_lexical_executor().submit(
+            self.lexical_index.search, query_text, fetch * (4 if where_filter else 1)
+        )
+        dense = self.vector_store.query(
+            query_embedding=self.embed_query(query_text),
+            n_results=fetch,
+            where_filter=where_filter,
+            include=self.rerank_include
+        )
+        lexical_hits = lexical_future.result()
+
+        dense_ids = dense["ids"][0] if dense["ids"] else []
+        metadata_of = dict(zip(dense_ids, dense["metadatas"][0])) if dense_ids else {}
+        distance_of = dict(zip(dense_ids, dense["distances"][0])) if dense_ids else {}
+
+        # 2. Metadata de los candidatos solo léxicos (y filtro estructural sobre ellos)
+        lexical_ids = [chunk_id for chunk_id, _ in lexical_hits]
+        metadata_of.update(self.vector_store.get_metadatas(
+            [c for c in lexical_ids if c not in metadata_of], where_filter=where_filter
+        ))
+        lexical_ids = [c for c in lexical_ids if c in metadata_of][:fetch]
+
+        # 3. Reciprocal Rank Fusion
+        fused, ranks = {}, {}
+        for source, ranking in (("dense", dense_ids), ("lexical", lexical_ids)):
+            for rank, chunk_id in enumerate(ranking, start=1):
+                fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (rrf_k + rank)
+                ranks.setdefault(chunk_id, {"dense": None, "lexical": None})[source] = rank
+
+        if not fused:
+            return []
+
+        # Orden estable: a igual RRF, primero el orden denso
+        candidates = sorted(fused, key=lambda c: -fused[c])
+        # Máximo teórico: primer puesto en ambas listas
+        max_rrf = 2.0 / (rrf_k + 1)
+
+        raw_results = {
+            "ids": [candidates],
+            "metadatas": [[metadata_of[c] for c in candidates]],
+            "distances": [[distance_of.get(c, np.nan) for c in candidates]]
+        }
+        if self.mmr_lambda is not None:
+            # Los candidatos solo léxicos no traen embedding de la query densa
+            embedding_of = dict(zip(dense_ids, dense["embeddings"][0])) if dense_ids else {}
+            embedding_of.update(self.vector_store.get_embeddings([c for c in candidates if c not in embedding_of]))
+            raw_results["embeddings"] = [[embedding_of[c] for c in candidates]]
+        results = self._rerank_many(
+            raw_results, n_results, profile,
+            relevance=[[fused[c] / max_rrf for c in candidates]]
+        )[0]
+
+        for r in results:
+            r["ranks"] = ranks[r["id"]]
+        return self._attach_texts(results)
+
+    # --------------------------------------------------
+    # Búsqueda en Dos Etapas: Secciones -> Chunks
+    # --------------------------------------------------
+    def search_two_stage(
+        self,
+        query_text: str,
+        n_results: int = 10,
+        where_filter: dict = None,
+        profile: str = "search3",
+        n_sections: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Elige primero las n_sections secciones (doc_id, sección) más cercanas
+        en el índice grueso y busca después chunks solo dentro de ellas, con
+        el re-ranking del perfil indicado. El espacio de búsqueda fino se
+        reduce a los chunks de esas secciones (por defecto 4 * n_results
+        secciones: más secciones = más recall frente a la búsqueda plana).
+        Se hace la búsqueda plana equivalente si el filtro usa campos que solo
+        tienen los chunks (la etapa gruesa no puede aplicarlo), si el índice de
+        secciones no devuelve nada (p. ej. aún no se ha construido) o si las
+        secciones elegidas no llegan a n_results chunks que cumplan el filtro.
+        """
+        if profile not in self.SEARCH_PROFILES:
+            raise ValueError(f"Unknown profile '{profile}'. Use one of {list(self.SEARCH_PROFILES)}")
+
+        query_embedding = self.embed_query(query_text)
+
+        results = []
+        if SectionIndex.applies_to_sections(where_filter):
+            # 1. Etapa gruesa: secciones más cercanas (con el mismo filtro)
+            sections = self.section_index.select(
+                query_embedding, n_sections or max(20, 4 * n_results), where_filter=where_filter
+            )
+            chunk_ids = [c for section in sections for c in section["chunk_ids"]]
+
+            # 2. Etapa fina: solo los chunks de esas secciones (+ filtro del usuario), re-ranking del top-k
+            if chunk_ids:
+                results = self._fetch_and_rerank(
+                    [query_embedding], n_results, where_filter, profile, ids=chunk_ids
+                )
+                results = results[0] if results else []
+
+        if len(results) < n_results:
+            results = self._fetch_and_rerank([query_embedding], n_results, where_filter, profile)
+            results = results[0] if results else []
+        return self._attach_texts(results)
+
+    @property
+    def section_index(self) -> SectionIndex:
+        if self._section_index is None:
+            # Mismo backend, directorio y dimensión que la colección de chunks
+            self._section_index = SectionIndex(build_companion_store(
+                self.vector_store, SectionIndex.collection_name(self.vector_store.collection_name)
+            ))
+        return self._section_index
+
+    @property
+    def lexical_index(self) -> BM25Index:
+        if self._lexical_index is None:
+            directory = storage_path(self.LEXICAL_INDEX_PATH, self._storage_directory())
+            self._lexical_index = BM25Index(
+                BM25Index.collection_path(self.vector_store.collection_name, directory or "./bm25_index")
             )
+        return self._lexical_index
+
+    def _storage_directory(self) -> Optional[str]:
+        # Directorio raíz del vector store (el de build_vector_store o, si se creó a mano, el suyo)
+        return (
+            getattr(self.vector_store, "storage_directory", None)
+            or getattr(self.vector_store, "persist_directory", None)
+        )
+
+    def _get_lexical_executor(self) -> ThreadPoolExecutor:
+        if self._lexical_executor is None:
+            self._lexical_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bm25")
+        return self._lexical_executor
+
+    def _attach_texts(self, results: List[Dict]) -> List[Dict]:
+        """
+        Carga perezosa de textos: una sola lectura al vector store para los
+        resultados finales (ya re-rankeados y recortados).
+        """
+        texts = self.vector_store.get_documents([r["id"] for r in results])
+        for r in results:
+            r["text"] = texts.get(r["id"])
+        return results
 
-            # E. Inyección de Metadata Estratégica
-            # Aquí nos aseguramos de que los campos que el Dashboard necesita estén presentes
-            enriched_metadata = {
-                **metadata,
-                "trl": metadata.get("trl", 0),
-                "trl_justification": metadata.get("trl_justification", "No analizado"),
-                "contradictions": metadata.get("contradictions", ""),
-                "entities": metadata.get("entities", "[]")
-            }
-
-            scored_results.append({
-                "text": doc,
-                "metadata": enriched_metadata,
-                "final_score": round(final_score, 4),
-                "breakdown": {
-                    "semantic": round(semantic_score, 3),
-                    "structural": round(structural_score, 3),
-                    "recency": round(recency_score, 3),
-                    "diversity": round(diversity_score, 3)
-                }
-            })
-
-        # 3. Re-ordenar por el score ponderado y recortar
-        scored_results.sort(key=lambda x: x["final_score"], reverse=True)
-        return scored_results[:n_results]
-    
     def embed_query(self, text: str):
         """Helper para obtener el embedding de una consulta"""
-        return self.embedder.embed_text(text)
\ No newline at end of file
+        embedding = self.query_cache.get(text)
+        if embedding is None:
+            embedding = self.embedder.embed_text(text)
+            self.query_cache.put(text, embedding)
+        return embedding
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeddings de varias sub-consultas en una sola llamada.
+        Con AsyncOllamaEmbedder se resuelven de forma concurrente.
+        Solo se envían al embedder las consultas que no están en caché.
+        """
+        embeddings = [self.query_cache.get(t) for t in texts]
+        missing = [i for i, e in enumerate(embeddings) if e is None]
+
+        if missing:
+            new_embeddings = self.embedder.embed_batch([texts[i] for i in missing])
+            for i, emb in zip(missing, new_embeddings):
+                embeddings[i] = emb
+                self.query_cache.put(texts[i], emb)
+
+        return embeddings
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas internas del retriever."""
+        return {
+            "query_cache": self.query_cache.stats(),
+            "result_cache": self.result_cache.stats(),
+            "fetch_policy": self.fetch_policy.stats() if self.fetch_policy is not None else None
+        }
\ No newline at end of file
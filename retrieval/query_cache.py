@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Optional
+
+
+class QueryEmbeddingCache:
+    """
+    LRU en memoria (thread-safe) de texto de consulta -> embedding.
+    Las apps de Streamlit repiten las mismas consultas por pilar en cada
+    rerun; con esta caché no vuelven a pasar por Ollama.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl  # segundos; None = sin expiración
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, query: str) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._entries.get(query)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            embedding, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[query]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(query)
+            self.hits += 1
+            return embedding
+
+    def put(self, query: str, embedding: List[float]):
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[query] = (embedding, time.monotonic())
+            self._entries.move_to_end(query)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
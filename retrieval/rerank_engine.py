@@ -0,0 +1,338 @@
+import numpy as np
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+
+class RerankEngine:
+    """
+    Re-ranking académico vectorizado (semántico + estructural + recencia +
+    diversidad), compartido por search2, search3, search_many y search_hybrid.
+
+    Los candidatos de todas las consultas se cargan en arrays 1D contiguos
+    (consulta a consulta); los cuatro componentes y la suma ponderada se
+    calculan en bloque, el top-k sale de argpartition y los dicts de
+    resultado (con su breakdown) solo se construyen para el top-k.
+
+    Con mmr_lambda, el top-k se elige con Maximal Marginal Relevance sobre los
+    embeddings de los candidatos: chunks casi duplicados de papers distintos
+    dejan de copar el top-k.
+    """
+
+    # Perfiles: factor de over-fetch, penalización de diversidad para el 1er,
+    # 2º y 3er+ chunk del mismo paper, redondeo del score y metadata enriquecida
+    PROFILES = {
+        "search2": {"fetch_factor": 2, "diversity": (1.0, 0.7, 0.4), "round_scores": False, "enrich_metadata": False},
+        "search3": {"fetch_factor": 3, "diversity": (1.0, 0.6, 0.3), "round_scores": True, "enrich_metadata": True}
+    }
+
+    def __init__(
+        self,
+        semantic_weight: float = 0.50,
+        structural_weight: float = 0.20,
+        recency_weight: float = 0.15,
+        diversity_weight: float = 0.15,
+        space: str = "l2",
+        current_year: Optional[int] = None,
+        mmr_lambda: Optional[float] = None,
+        mmr_doc_penalty: bool = True
+    ):
+        if mmr_lambda is not None and not 0.0 <= mmr_lambda <= 1.0:
+            raise ValueError(f"mmr_lambda must be in [0, 1], got {mmr_lambda}")
+
+        self.semantic_weight = semantic_weight
+        self.structural_weight = structural_weight
+        self.recency_weight = recency_weight
+        self.diversity_weight = diversity_weight
+        self.space = space
+        self.current_year = current_year
+        # MMR: None = desactivado (top-k por score). 1.0 = solo relevancia,
+        # 0.0 = solo novedad frente a los chunks ya elegidos
+        self.mmr_lambda = mmr_lambda
+        # Con MMR, mantener además la penalización por paper (en orden de selección)
+        self.mmr_doc_penalty = mmr_doc_penalty
+
+    # ==========================================
+    # API
+    # ==========================================
+
+    def rerank(
+        self,
+        ids: List[str],
+        metadatas: List[Dict[str, Any]],
+        distances: List[float],
+        n_results: int,
+        profile: str = "search3",
+        relevance: Optional[List[float]] = None,
+        embeddings: Optional[Any] = None
+    ) -> List[Dict]:
+        """Re-ranking de los candidatos de una consulta."""
+        return self.rerank_many(
+            [ids], [metadatas], [distances], n_results, profile,
+            relevance=[relevance] if relevance is not None else None,
+            embeddings_per_query=[embeddings] if embeddings is not None else None
+        )[0]
+
+    def rerank_many(
+        self,
+        ids_per_query: List[List[str]],
+        metadatas_per_query: List[List[Dict[str, Any]]],
+        distances_per_query: List[List[float]],
+        n_results: int,
+        profile: str = "search3",
+        relevance: Optional[List[List[float]]] = None,
+        embeddings_per_query: Optional[List[Any]] = None
+    ) -> List[List[Dict]]:
+        """
+        Devuelve, por consulta, el top n_results ordenado por final_score
+        (mismo orden que un sort estable descendente). `relevance` sustituye
+        al score semántico derivado de la distancia (p. ej. RRF normalizado).
+        Con MMR activo hacen falta los embeddings de los candidatos y el
+        orden devuelto es el de selección.
+        """
+        if profile not in self.PROFILES:
+            raise ValueError(f"Unknown profile '{profile}'. Use one of {list(self.PROFILES)}")
+        if self.mmr_lambda is not None and embeddings_per_query is None:
+            raise ValueError("MMR re-ranking needs the candidate embeddings (include 'embeddings' in the query)")
+        settings = self.PROFILES[profile]
+
+        sizes = [len(ids) for ids in ids_per_query]
+        bounds = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        total = int(bounds[-1])
+        if total == 0:
+            return [[] for _ in sizes]
+
+        metadatas = [m for query_metadatas in metadatas_per_query for m in query_metadatas]
+
+        # A. Semántico
+        if relevance is None:
+            distance = np.fromiter(
+                (d for query_distances in distances_per_query for d in query_distances),
+                dtype=np.float64, count=total
+            )
+            semantic = self.semantic_scores(distance)
+        else:
+            semantic = np.fromiter((r for scores in relevance for r in scores), dtype=np.float64, count=total)
+
+        # B. Estructural (peso de sección + bonus de taxonomía/tabla)
+        structural = (
+            np.fromiter((m.get("structural_weight", 0.6) for m in metadatas), dtype=np.float64, count=total)
+            + 0.15 * np.fromiter((bool(m.get("has_taxonomy_pattern")) for m in metadatas), dtype=bool, count=total)
+            + 0.10 * np.fromiter((bool(m.get("has_structured_table")) for m in metadatas), dtype=bool, count=total)
+        )
+
+        # C. Recencia
+        year = np.fromiter((m.get("year", 0) or 0 for m in metadatas), dtype=np.float64, count=total)
+        recency = self.recency_scores(year)
+
+        # D. Diversidad por orden de aparición del paper dentro de cada consulta
+        doc_codes = self._doc_codes(metadatas, sizes)
+        first, second, rest = settings["diversity"]
+
+        # Relevancia sin el componente de diversidad (con MMR se recalcula en orden de selección)
+        relevance_score = (
+            self.semantic_weight * semantic +
+            self.structural_weight * np.minimum(structural, 1.5) +
+            self.recency_weight * recency
+        )
+        if self.mmr_lambda is None:
+            occurrence = self._occurrence(doc_codes)
+            diversity = np.select([occurrence == 1, occurrence == 2], [first, second], default=rest)
+            final = relevance_score + self.diversity_weight * diversity
+            if settings["round_scores"]:
+                final = self._round4(final)
+
+        all_results = []
+        for q in range(len(sizes)):
+            start, end = bounds[q], bounds[q + 1]
+            redundancy = None
+            if self.mmr_lambda is None:
+                picked = self._top_k(final[start:end], n_results)
+                query_final = final[start:end][picked]
+                query_diversity = diversity[start:end][picked]
+            else:
+                picked, query_diversity, redundancy = self._mmr_select(
+                    relevance_score[start:end], doc_codes[start:end],
+                    embeddings_per_query[q], n_results, settings["diversity"]
+                )
+                query_final = relevance_score[start:end][picked] + self.diversity_weight * query_diversity
+                if settings["round_scores"]:
+                    query_final = self._round4(query_final)
+
+            results = []
+            for rank, local in enumerate(picked.tolist()):
+                c = start + local
+                metadata = metadatas[c]
+                if settings["enrich_metadata"]:
+                    metadata = self.enrich_metadata(metadata)
+                result = {
+                    "id": ids_per_query[q][local],
+                    "text": None,
+                    "metadata": metadata,
+                    "final_score": float(query_final[rank]),
+                    "breakdown": {
+                        "semantic": round(float(semantic[c]), 3),
+                        "structural": round(float(structural[c]), 3),
+                        "recency": round(float(recency[c]), 3),
+                        "diversity": round(float(query_diversity[rank]), 3)
+                    }
+                }
+                if redundancy is not None:
+                    # Similitud máxima con los chunks elegidos antes que este
+                    result["breakdown"]["redundancy"] = round(float(redundancy[rank]), 3)
+                results.append(result)
+            all_results.append(results)
+
+        return all_results
+
+    # ==========================================
+    # COMPONENTES
+    # ==========================================
+
+    def semantic_scores(self, distance: np.ndarray) -> np.ndarray:
+        """
+        l2: 1 / (1 + d) (d es la distancia L2 al cuadrado de Chroma).
+        cosine / ip: d = 1 - similitud, el score es la similitud en [0, 1].
+        """
+        if self.space == "l2":
+            return 1 / (1 + distance)
+        return np.clip(1 - distance, 0.0, 1.0)
+
+    def recency_scores(self, year: np.ndarray) -> np.ndarray:
+        """Tramos de antigüedad (0.5 si el paper no tiene año)."""
+        current_year = self.current_year or datetime.now().year
+        age = current_year - year
+        return np.select(
+            [year == 0, age <= 1, age <= 3, age <= 5, age <= 8],
+            [0.5, 1.0, 0.85, 0.65, 0.45],
+            default=0.30
+        )
+
+    @staticmethod
+    def enrich_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Campos estratégicos que el Dashboard espera siempre presentes."""
+        return {
+            **metadata,
+            "trl": metadata.get("trl", 0),
+            "trl_justification": metadata.get("trl_justification", "No analizado"),
+            "contradictions": metadata.get("contradictions", ""),
+            "entities": metadata.get("entities", "[]")
+        }
+
+    # ==========================================
+    # INTERNOS
+    # ==========================================
+
+    @staticmethod
+    def _doc_codes(metadatas: List[Dict[str, Any]], sizes: List[int]) -> np.ndarray:
+        """Código entero por (consulta, doc_id): mismo paper en la misma consulta = mismo código."""
+        codes_of: Dict[tuple, int] = {}
+        query_of = np.repeat(np.arange(len(sizes)), sizes)
+        return np.fromiter(
+            (codes_of.setdefault((q, m.get("doc_id", "unknown")), len(codes_of)) for q, m in zip(query_of.tolist(), metadatas)),
+            dtype=np.int64, count=len(metadatas)
+        )
+
+    @staticmethod
+    def _occurrence(codes: np.ndarray) -> np.ndarray:
+        """
+        Nº de aparición (1, 2, 3...) de cada candidato entre los de su mismo
+        paper y consulta, en el orden en que llegaron.
+        """
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        group_starts = np.flatnonzero(np.concatenate([[True], sorted_codes[1:] != sorted_codes[:-1]]))
+        group_sizes = np.diff(np.concatenate([group_starts, [len(codes)]]))
+        occurrence = np.empty(len(codes), dtype=np.int64)
+        occurrence[order] = np.arange(len(codes)) - np.repeat(group_starts, group_sizes) + 1
+        return occurrence
+
+    def _mmr_select(
+        self,
+        relevance: np.ndarray,
+        codes: np.ndarray,
+        embeddings: Any,
+        k: int,
+        diversity_levels: tuple
+    ):
+        """
+        Selección voraz MMR: en cada paso se elige el candidato que maximiza
+        lambda * score - (1 - lambda) * max_sim(candidato, ya elegidos), con
+        similitud coseno. Cada paso es un producto (n, dim) x (dim,), así que
+        el coste total es O(k·n·dim) sobre la matriz de candidatos.
+
+        score = relevancia + peso_diversidad * diversidad, con la penalización
+        por paper calculada en orden de selección (o fija en el nivel máximo si
+        mmr_doc_penalty=False). Devuelve (índices, diversidad, redundancia).
+        """
+        n = len(relevance)
+        k = min(k, n)
+        first, second, rest = diversity_levels
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(n, -1)
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+        # Similitud máxima con lo ya elegido (0 al inicio: el primero no se penaliza)
+        max_sim = np.zeros(n)
+        taken = np.zeros(n, dtype=bool)
+        doc_seen = np.zeros(n, dtype=np.int64)  # chunks ya elegidos del mismo paper
+        diversity = np.full(n, first)
+
+        picked, picked_diversity, picked_redundancy = [], [], []
+        for _ in range(k):
+            if self.mmr_doc_penalty:
+                diversity = np.select([doc_seen == 0, doc_seen == 1], [first, second], default=rest)
+            mmr = (
+                self.mmr_lambda * (relevance + self.diversity_weight * diversity)
+                - (1 - self.mmr_lambda) * max_sim
+            )
+            mmr[taken] = -np.inf
+            # argmax devuelve el primero: a igualdad gana el que llegó antes
+            best = int(np.argmax(mmr))
+
+            picked.append(best)
+            picked_diversity.append(diversity[best])
+            picked_redundancy.append(max_sim[best])
+
+            taken[best] = True
+            doc_seen[codes == codes[best]] += 1
+            np.maximum(max_sim, vectors @ vectors[best], out=max_sim)
+
+        return np.asarray(picked, dtype=np.int64), np.asarray(picked_diversity), np.asarray(picked_redundancy)
+
+    @staticmethod
+    def _round4(values: np.ndarray) -> np.ndarray:
+        """
+        Igual que round(v, 4) de Python: np.round solo puede discrepar cuando
+        v * 1e4 cae justo en un .5; esos casos se redondean con round().
+        """
+        rounded = np.round(values, 4)
+        scaled = values * 1e4
+        edge = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+        if edge.any():
+            rounded[edge] = [round(v, 4) for v in values[edge].tolist()]
+        return rounded
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """
+        Índices del top-k en orden descendente; a igual score gana el
+        candidato anterior (como list.sort(reverse=True), que es estable).
+        """
+        n = len(scores)
+        if k <= 0 or n == 0:
+            return np.empty(0, dtype=np.int64)
+
+        keys = -scores
+        if k < n:
+            kth = np.partition(keys, k - 1)[k - 1]
+            above = np.flatnonzero(keys < kth)
+            # Empates en el umbral: solo los primeros por orden de llegada
+            tied = np.flatnonzero(keys == kth)[:k - len(above)]
+            selected = np.concatenate([above, tied])
+            selected.sort()
+        else:
+            selected = np.arange(n)
+
+        return selected[np.argsort(keys[selected], kind="stable")]
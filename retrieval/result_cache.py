@@ -0,0 +1,271 @@
+import os
+import json
+import pickle
+import sqlite3
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+
+class CollectionVersions:
+    """
+    Contador monótono por colección en un SQLite pequeño. Los pipelines de
+    ingesta lo incrementan tras cada upsert/delete ya persistido; los
+    resultados cacheados con una versión anterior dejan de ser válidos.
+    Al estar en disco, lo ven también otros procesos (p. ej. Streamlit).
+    """
+
+    def __init__(self, path: str = "./search_cache.sqlite"):
+        self.path = path
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS collection_versions (
+                collection TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, collection: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM collection_versions WHERE collection = ?", (collection,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, collection: str) -> int:
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO collection_versions (collection, version, updated_at) VALUES (?, 1, ?)
+                ON CONFLICT(collection) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+                """,
+                (collection, time.time())
+            )
+            # Los resultados compartidos de versiones anteriores ya no sirven
+            if self._has_results_table():
+                self._conn.execute("DELETE FROM search_results WHERE collection = ?", (collection,))
+            self._conn.commit()
+            return self._conn.execute(
+                "SELECT version FROM collection_versions WHERE collection = ?", (collection,)
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _has_results_table(self) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_results'"
+        ).fetchone() is not None
+
+
+class SearchResultCache:
+    """
+    Caché de resultados completos de búsqueda (ya re-rankeados y con textos).
+
+    - Clave: hash de consulta, filtro, pesos, n_results, perfil, colección y
+      modelo de embedding (ver make_key).
+    - Validez: cada entrada guarda la versión de la colección con que se
+      calculó; si la versión actual es otra, la entrada se descarta.
+    - Memoria acotada: LRU por nº de entradas y por bytes (los resultados se
+      guardan serializados, así que cada get devuelve una copia independiente).
+    - shared=True: además se guardan en una tabla del SQLite de versiones,
+      visible para otros procesos (acotada por max_shared_bytes, se descartan
+      primero las más antiguas).
+    """
+
+    def __init__(
+        self,
+        versions: Optional[CollectionVersions] = None,
+        max_size: int = 512,
+        max_bytes: int = 64 * 1024 * 1024,
+        shared: bool = False,
+        max_shared_bytes: int = 256 * 1024 * 1024
+    ):
+        self.versions = versions
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.max_shared_bytes = max_shared_bytes
+        self.shared = shared and versions is not None
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+        if self.shared:
+            with self.versions._lock:
+                self.versions._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS search_results (
+                        key TEXT PRIMARY KEY,
+                        collection TEXT NOT NULL,
+                        version INTEGER NOT NULL,
+                        payload BLOB NOT NULL,
+                        size INTEGER NOT NULL,
+                        stored_at REAL NOT NULL
+                    )
+                    """
+                )
+                self.versions._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_search_results_stored_at ON search_results (stored_at)"
+                )
+                self.versions._conn.commit()
+
+    # ===============================
+    # CLAVES Y VERSIONES
+    # ===============================
+
+    @staticmethod
+    def make_key(parts: Dict[str, Any]) -> str:
+        """Huella estable de todo lo que determina el resultado de una búsqueda."""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def version(self, collection: str) -> int:
+        # Sin almacén de versiones (un solo proceso, sin ingesta concurrente) la versión es fija
+        return self.versions.get(collection) if self.versions is not None else 0
+
+    # ===============================
+    # PUBLIC API
+    # ===============================
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: str, version: int) -> Optional[List[Dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, entry_version = entry
+                if entry_version == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return pickle.loads(payload)
+                self._drop(key)
+                self.invalidations += 1
+
+        if self.shared:
+            payload = self._shared_get(key, version)
+            if payload is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                    self._store(key, payload, version)
+                return pickle.loads(payload)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, collection: str, version: int, results: List[Dict]):
+        if not self.enabled:
+            return
+
+        payload = pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._store(key, payload, version)
+        if self.shared:
+            self._shared_put(key, collection, version, payload)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.shared_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.shared_hits) / total, 4) if total else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions
+            }
+
+    # ===============================
+    # INTERNOS
+    # ===============================
+
+    def _store(self, key: str, payload: bytes, version: int):
+        # Una entrada mayor que todo el presupuesto de memoria no se guarda
+        if len(payload) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (payload, version)
+        self._bytes += len(payload)
+
+        while len(self._entries) > self.max_size or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        payload, _ = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def _shared_get(self, key: str, version: int) -> Optional[bytes]:
+        conn = self.versions._conn
+        with self.versions._lock:
+            row = conn.execute(
+                "SELECT version, payload FROM search_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] != version:
+                conn.execute("DELETE FROM search_results WHERE key = ?", (key,))
+                conn.commit()
+                with self._lock:
+                    self.invalidations += 1
+                return None
+            return row[1]
+
+    def _shared_put(self, key: str, collection: str, version: int, payload: bytes):
+        conn = self.versions._conn
+        with self.versions._lock:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO search_results (key, collection, version, payload, size, stored_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, collection, version, sqlite3.Binary(payload), len(payload), time.time())
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM search_results").fetchone()[0]
+            if total > self.max_shared_bytes:
+                # Se borran las más antiguas hasta volver a la mitad del presupuesto
+                conn.execute(
+                    """
+                    DELETE FROM search_results WHERE key IN (
+                        SELECT key FROM (
+                            SELECT key, SUM(size) OVER (ORDER BY stored_at DESC) AS running
+                            FROM search_results
+                        ) WHERE running > ?
+                    )
+                    """,
+                    (self.max_shared_bytes // 2,)
+                )
+            conn.commit()
@@ -0,0 +1,179 @@
+import json
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+
+from vectorstore.base_vector_store import BaseVectorStore
+
+
+class SectionIndex:
+    """
+    Índice grueso para la búsqueda en dos etapas: un embedding por
+    (doc_id, sección) en una colección aparte (<colección>__sections).
+
+    El embedding de una sección es la media de los embeddings de sus chunks
+    (re-escalada a la norma media de éstos), así que construirlo no requiere
+    llamadas extra al modelo. Cada entrada guarda los IDs de sus chunks: la
+    consulta elige primero las secciones más cercanas y después busca solo
+    entre esos chunks (query con ids=).
+    """
+
+    COLLECTION_SUFFIX = "__sections"
+
+    # Campos de la metadata del chunk que son constantes dentro de una sección
+    # (se copian a la entrada de la sección; un filtro solo sobre ellos puede
+    # aplicarse ya en la etapa gruesa)
+    SECTION_FIELDS = (
+        "doc_id", "title", "authors", "year", "journal", "doi", "collection",
+        "root_collection", "research_question", "section", "structural_weight"
+    )
+
+    def __init__(self, vector_store: BaseVectorStore):
+        self.vector_store = vector_store
+
+    @classmethod
+    def collection_name(cls, chunk_collection: str) -> str:
+        return f"{chunk_collection}{cls.COLLECTION_SUFFIX}"
+
+    @staticmethod
+    def section_id(doc_id: str, section: str) -> str:
+        return f"{doc_id}::{section}"
+
+    # ==========================================
+    # CONSTRUCCIÓN (pipelines de ingesta)
+    # ==========================================
+
+    def replace_document(
+        self,
+        doc_id: str,
+        chunk_ids: List[str],
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Sustituye las secciones de un paper a partir de sus chunks ya
+        embebidos. Devuelve el número de secciones almacenadas.
+        """
+        ids, section_texts, section_embeddings, section_metadatas = self._build_sections(
+            doc_id, chunk_ids, texts, embeddings, metadatas
+        )
+        self.vector_store.replace_document(
+            doc_id, texts=section_texts, embeddings=section_embeddings, metadatas=section_metadatas, ids=ids
+        )
+        return len(ids)
+
+    def add(
+        self,
+        chunk_ids: List[str],
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Upsert de secciones para chunks sin doc_id (mismo contrato que
+        add_documents en el vector store de chunks: no borra entradas previas).
+        Cada chunk se agrupa por el doc_id de su metadata o, si no tiene, por
+        el prefijo de su ID ("<doc>_ch<i>"), para no mezclar papers distintos.
+        """
+        ids, section_texts, section_embeddings, section_metadatas = self._build_sections(
+            None, chunk_ids, texts, embeddings, metadatas
+        )
+        if ids:
+            self.vector_store.add_documents(
+                texts=section_texts, embeddings=section_embeddings, metadatas=section_metadatas, ids=ids
+            )
+        return len(ids)
+
+    # ==========================================
+    # CONSULTA
+    # ==========================================
+
+    @classmethod
+    def applies_to_sections(cls, where_filter: Optional[Dict[str, Any]]) -> bool:
+        """¿El filtro usa solo campos que las entradas de sección también tienen?"""
+        return all(field in cls.SECTION_FIELDS for field in cls._filter_fields(where_filter))
+
+    def select(
+        self,
+        query_embedding: List[float],
+        n_sections: int,
+        where_filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Las n_sections secciones más cercanas a la consulta:
+        [{"doc_id", "section", "chunk_ids"}, ...] por orden de distancia.
+        """
+        result = self.vector_store.query(
+            query_embedding=query_embedding,
+            n_results=n_sections,
+            where_filter=where_filter if self.applies_to_sections(where_filter) else None,
+            include=["metadatas"]
+        )
+        if not result["ids"]:
+            return []
+        return [
+            {
+                "doc_id": m.get("doc_id", ""),
+                "section": m.get("section", ""),
+                "chunk_ids": json.loads(m.get("chunk_ids") or "[]")
+            }
+            for m in result["metadatas"][0]
+        ]
+
+    def count(self) -> int:
+        return self.vector_store.count()
+
+    def flush(self):
+        self.vector_store.flush()
+
+    def _build_sections(
+        self,
+        doc_id: Optional[str],
+        chunk_ids: List[str],
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]]
+    ) -> Tuple[List[str], List[str], List[List[float]], List[Dict[str, Any]]]:
+        # doc_id=None: el paper de cada chunk sale de su metadata o de su ID
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        for i, (chunk_id, metadata) in enumerate(zip(chunk_ids, metadatas)):
+            owner = doc_id if doc_id is not None else (metadata.get("doc_id") or chunk_id.rsplit("_", 1)[0])
+            groups.setdefault((owner, metadata.get("section", "")), []).append(i)
+
+        ids, section_texts, section_embeddings, section_metadatas = [], [], [], []
+        if groups:
+            matrix = np.asarray(embeddings, dtype=np.float32)
+            for (owner, section), rows in groups.items():
+                vectors = matrix[rows]
+                mean = vectors.mean(axis=0)
+                # La media de vectores no alineados es más corta: misma escala que los chunks (l2)
+                norm = np.linalg.norm(mean)
+                if norm > 0:
+                    mean *= np.linalg.norm(vectors, axis=1).mean() / norm
+
+                first = metadatas[rows[0]]
+                metadata = {key: first[key] for key in self.SECTION_FIELDS if key in first}
+                metadata.update({
+                    # Sin doc_id la entrada sigue sin él (vacuum_index solo limpia por doc_id)
+                    "doc_id": doc_id if doc_id is not None else first.get("doc_id", ""),
+                    "section": section,
+                    "chunk_count": len(rows),
+                    "chunk_ids": json.dumps([chunk_ids[r] for r in rows])
+                })
+
+                ids.append(self.section_id(owner, section))
+                section_texts.append(texts[rows[0]][:500])
+                section_embeddings.append(mean.tolist())
+                section_metadatas.append(metadata)
+        return ids, section_texts, section_embeddings, section_metadatas
+
+    @classmethod
+    def _filter_fields(cls, where_filter: Optional[Dict[str, Any]]) -> List[str]:
+        fields = []
+        for key, value in (where_filter or {}).items():
+            if key in ("$and", "$or"):
+                for condition in value:
+                    fields.extend(cls._filter_fields(condition))
+            else:
+                fields.append(key)
+        return fields
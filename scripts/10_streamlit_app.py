@@ -2,7 +2,6 @@ import sys
 import os
 import json
 import re
-import requests
 import numpy as np
 import matplotlib.pyplot as plt
 import streamlit as st
@@ -10,9 +9,10 @@ import streamlit as st
 # 1. CONFIGURACIÓN DE RUTAS
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from embedding.ollama_embedder import OllamaEmbedder
-from vectorstore.chroma_vector_store import ChromaVectorStore
+from embedding.factory import build_embedder
+from vectorstore.factory import build_vector_store
 from retrieval.hybrid_retriever import HybridRetriever
+from clients.ollama_client import get_ollama_client
 
 # --- CONFIGURACIÓN DE PÁGINA ---
 st.set_page_config(page_title="Blockchain Research Advisor", layout="wide", page_icon="📚")
@@ -21,14 +21,15 @@ st.set_page_config(page_title="Blockchain Research Advisor", layout="wide", page
 @st.cache_resource
 def init_retriever():
     try:
-        embedder = OllamaEmbedder(model="nomic-embed-text")
-        vector_store = ChromaVectorStore()
+        embedder = build_embedder()
+        vector_store = build_vector_store()
         return HybridRetriever(embedder, vector_store)
     except Exception as e:
         st.error(f"Error de inicialización: {e}")
         return None
 
 retriever = init_retriever()
+ollama = get_ollama_client()
 
 # --- FUNCIONES DE INTELIGENCIA ESTRATÉGICA ---
 
@@ -68,8 +69,9 @@ def get_dynamic_tradeoffs(pilar):
     ]
     """
     try:
-        res = requests.post("http://localhost:11434/api/generate", 
-                            json={"model": "llama3.1", "prompt": prompt, "stream": False, "format": "json"})
+        res = ollama.post("/api/generate",
+                          {"model": "llama3.1", "prompt": prompt, "stream": False, "format": "json"},
+                          timeout=120)
         return json.loads(res.json()['response'])
     except:
         return []
@@ -149,10 +151,15 @@ else:
         # --- SECCIÓN DE EVIDENCIA CON CITAS FORMALES ---
         st.header("📚 Evidencia Científica de Respaldo")
         
-        for pilar in stats.keys():
+        # Evidencia de todos los pilares en una sola búsqueda multi-consulta
+        pilares = list(stats.keys())
+        docs_por_pilar = retriever.search_many(
+            [f"critical requirements for blockchain {pilar}" for pilar in pilares], n_results=2
+        ) if retriever else [[] for _ in pilares]
+
+        for pilar, docs in zip(pilares, docs_por_pilar):
             with st.expander(f"📖 Referencias Bibliográficas para: {pilar}"):
                 if retriever:
-                    docs = retriever.search3(query_text=f"critical requirements for blockchain {pilar}", n_results=2)
                     for d in docs:
                         m = d['metadata']
                         st.markdown(f"**Cita:** {m.get('author', 'N.N.')} ({m.get('year', 's.f.')}). *{m.get('title')}*.")
@@ -185,9 +192,9 @@ if prompt := st.chat_input("Pregunta sobre un paper específico o criterio técn
             Contexto científico:\n{context}"""
             
             try:
-                res = requests.post(
-                    "http://localhost:11434/api/generate",
-                    json={"model": "llama3.1", "prompt": f"{sys_prompt}\n\nPregunta: {prompt}", "stream": False},
+                res = ollama.post(
+                    "/api/generate",
+                    {"model": "llama3.1", "prompt": f"{sys_prompt}\n\nPregunta: {prompt}", "stream": False},
                     timeout=90
                 )
                 answer = res.json().get("response", "Error en generación.")
@@ -2,7 +2,6 @@ import sys
 import os
 import json
 import re
-import requests
 import numpy as np
 import matplotlib.pyplot as plt
 import streamlit as st
@@ -10,9 +9,10 @@ import streamlit as st
 # 1. CONFIGURACIÓN DE RUTAS
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from embedding.ollama_embedder import OllamaEmbedder
-from vectorstore.chroma_vector_store import ChromaVectorStore
+from embedding.factory import build_embedder
+from vectorstore.factory import build_vector_store
 from retrieval.hybrid_retriever import HybridRetriever
+from clients.ollama_client import get_ollama_client
 
 # --- CONFIGURACIÓN DE PÁGINA ---
 st.set_page_config(page_title="Blockchain Research Advisor", layout="wide", page_icon="📚")
@@ -21,14 +21,15 @@ st.set_page_config(page_title="Blockchain Research Advisor", layout="wide", page
 @st.cache_resource
 def init_retriever():
     try:
-        embedder = OllamaEmbedder(model="nomic-embed-text")
-        vector_store = ChromaVectorStore()
+        embedder = build_embedder()
+        vector_store = build_vector_store()
         return HybridRetriever(embedder, vector_store)
     except Exception as e:
         st.error(f"Error de inicialización: {e}")
         return None
 
 retriever = init_retriever()
+ollama = get_ollama_client()
 
 # --- FUNCIONES DE INTELIGENCIA ESTRATÉGICA ---
 
@@ -87,9 +88,9 @@ def get_dynamic_tradeoffs(pilar, phase1_answers, questions_ref):
     """
     
     try:
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
+        response = ollama.post(
+            "/api/generate",
+            {
                 "model": "llama3.1",
                 "prompt": prompt,
                 "stream": False,
@@ -159,9 +160,9 @@ def render_strategic_roadmap(user_answers, docs_context, initial_stats):
     """
     
     try:
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={"model": "llama3.1", "prompt": prompt, "stream": False},
+        response = ollama.post(
+            "/api/generate",
+            {"model": "llama3.1", "prompt": prompt, "stream": False},
             timeout=180
         )
         roadmap_md = response.json().get("response", "Error al generar el roadmap.")
@@ -260,9 +261,13 @@ else:
 
         # --- SECCIÓN DE EVIDENCIA CON METADATA ---
         st.header("📚 Inteligencia Bibliográfica (Zotero)")
-        for pilar in st.session_state.stats.keys():
+        # Evidencia de todos los pilares en una sola búsqueda multi-consulta
+        pilares = list(st.session_state.stats.keys())
+        docs_por_pilar = retriever.search_many(
+            [f"blockchain {pilar} requirements" for pilar in pilares], n_results=2
+        )
+        for pilar, docs in zip(pilares, docs_por_pilar):
             with st.expander(f"📖 Evidencia para {pilar}"):
-                docs = retriever.search3(query_text=f"blockchain {pilar} requirements", n_results=2)
                 for d in docs:
                     m = d['metadata']
                     st.markdown(f"**{m.get('title')}** ({m.get('author')}, {m.get('year')})")
@@ -352,9 +357,9 @@ if prompt := st.chat_input("Pregunta sobre un paper específico o criterio técn
             Contexto científico:\n{context}"""
             
             try:
-                res = requests.post(
-                    "http://localhost:11434/api/generate",
-                    json={"model": "llama3.1", "prompt": f"{sys_prompt}\n\nPregunta: {prompt}", "stream": False},
+                res = ollama.post(
+                    "/api/generate",
+                    {"model": "llama3.1", "prompt": f"{sys_prompt}\n\nPregunta: {prompt}", "stream": False},
                     timeout=90
                 )
                 answer = res.json().get("response", "Error en generación.")
@@ -2,7 +2,6 @@ import sys
 import os
 import json
 import re
-import requests
 import sqlite3
 import numpy as np
 import matplotlib.pyplot as plt
@@ -1,6 +1,6 @@
 from retrieval.hybrid_retriever import HybridRetriever
-from embedding.ollama_embedder import OllamaEmbedder
-from vectorstore.chroma_vector_store import ChromaVectorStore
+from embedding.factory import build_embedder
+from vectorstore.factory import build_vector_store
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -30,8 +30,10 @@ def generar_investigacion_final(retriever, queries):
     scores_globales = []
     evidencia_detallada = [] # Para el CSV
     
-    for dimension, query in queries.items():
-        resultados_k = retriever.search3(query, n_results=5)
+    # Todas las dimensiones en un solo batch de embeddings + una sola query al índice
+    resultados_por_dimension = retriever.search_many(list(queries.values()), n_results=5)
+
+    for dimension, resultados_k in zip(queries.keys(), resultados_por_dimension):
         
         if resultados_k:
             avg, std = analizar_dimension_completa(resultados_k)
@@ -102,8 +104,8 @@ def generar_investigacion_final(retriever, queries):
         print(f"✅ PDF ejecutivo generado: Reporte_Ejecutivo_Factibilidad.pdf")
 
 if __name__ == "__main__":
-    embedder = OllamaEmbedder()
-    vector_store = ChromaVectorStore()
+    embedder = build_embedder()
+    vector_store = build_vector_store()
     retriever = HybridRetriever(embedder, vector_store)
     evidencia_total = []
     query_prueba_1 = (
@@ -0,0 +1,67 @@
+"""
+Limpieza del índice: elimina chunks huérfanos (papers que ya no están en
+data/raw o restos de ingestas anteriores) y compacta el persist_directory.
+
+Uso:
+    python scripts/13_vacuum_index.py --dry-run
+    python scripts/13_vacuum_index.py --collection academic_research
+    python scripts/13_vacuum_index.py --section-index   (con el índice de search_two_stage)
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ingestion.ingestion_manifest import IngestionManifest
+from retrieval.bm25_index import BM25Index
+from retrieval.result_cache import CollectionVersions
+from retrieval.section_index import SectionIndex
+from vectorstore.factory import build_vector_store, build_companion_store, storage_path
+from vectorstore.maintenance import live_doc_ids, vacuum_index
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--collection", default="academic_research")
+    parser.add_argument("--persist-directory", default="./chroma_db")
+    parser.add_argument("--data-dir", default="data/raw")
+    parser.add_argument("--manifest", default="{persist_directory}/ingestion_manifest.sqlite")
+    parser.add_argument("--bm25", default="{persist_directory}/bm25_index")
+    parser.add_argument("--search-cache", default="{persist_directory}/search_cache.sqlite")
+    parser.add_argument("--section-index", action="store_true", help="limpiar también <colección>__sections")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    # Ficheros auxiliares junto al vector store (mismos valores por defecto que los pipelines)
+    args.manifest = storage_path(args.manifest, args.persist_directory)
+    args.bm25 = storage_path(args.bm25, args.persist_directory)
+    args.search_cache = storage_path(args.search_cache, args.persist_directory)
+
+    vector_store = build_vector_store(
+        collection_name=args.collection,
+        persist_directory=args.persist_directory
+    )
+    manifest = IngestionManifest(args.manifest) if os.path.exists(args.manifest) else None
+    live_ids = live_doc_ids(args.data_dir) if os.path.isdir(args.data_dir) else None
+    bm25_path = BM25Index.collection_path(args.collection, args.bm25)
+    lexical_index = BM25Index(bm25_path) if os.path.isdir(bm25_path) else None
+    collection_versions = CollectionVersions(args.search_cache) if os.path.exists(args.search_cache) else None
+    section_index = SectionIndex(
+        build_companion_store(vector_store, SectionIndex.collection_name(args.collection))
+    ) if args.section_index else None
+
+    print(f"🧹 Vacuuming '{args.collection}' ({vector_store.count()} chunks)")
+    report = vacuum_index(
+        vector_store, manifest=manifest, live_ids=live_ids,
+        dry_run=args.dry_run, lexical_index=lexical_index,
+        collection_versions=collection_versions,
+        section_index=section_index
+    )
+
+    for key, value in report.items():
+        print(f"   {key}: {value}")
+    print(f"✅ Done. Chunks now: {vector_store.count()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Snapshots de una colección en Parquet (ids, embeddings, textos y metadata):
+arranque en caliente de réplicas sin re-ingestar ni llamar a Ollama.
+
+Uso:
+    python scripts/14_snapshot.py export --path snapshots/academic_research.parquet
+    python scripts/14_snapshot.py import --path snapshots/academic_research.parquet
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from retrieval.result_cache import CollectionVersions
+from vectorstore.factory import build_vector_store, storage_path
+from vectorstore.snapshot import export_snapshot, import_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("--path", required=True)
+    parser.add_argument("--collection", default="academic_research")
+    parser.add_argument("--persist-directory", default="./chroma_db")
+    parser.add_argument("--batch-size", type=int, default=2048)
+    parser.add_argument("--search-cache", default="{persist_directory}/search_cache.sqlite")
+    args = parser.parse_args()
+    # Ficheros auxiliares junto al vector store (mismos valores por defecto que los pipelines)
+    args.search_cache = storage_path(args.search_cache, args.persist_directory)
+
+    vector_store = build_vector_store(
+        collection_name=args.collection,
+        persist_directory=args.persist_directory
+    )
+
+    if args.command == "export":
+        print(f"📦 Exporting '{args.collection}' ({vector_store.count()} chunks) -> {args.path}")
+        report = export_snapshot(vector_store, args.path, row_group_size=args.batch_size)
+    else:
+        print(f"📥 Importing {args.path} -> '{args.collection}'")
+        report = import_snapshot(args.path, vector_store, batch_size=args.batch_size)
+        # Las búsquedas cacheadas de la colección dejan de ser válidas
+        if os.path.exists(args.search_cache):
+            CollectionVersions(args.search_cache).bump(args.collection)
+
+    for key, value in report.items():
+        print(f"   {key}: {value}")
+    vector_store.close()
+    print(f"✅ Done. Chunks now: {vector_store.count()}")
+
+
+if __name__ == "__main__":
+    main()
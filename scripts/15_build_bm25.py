@@ -0,0 +1,59 @@
+"""
+Construye (o reconstruye) el índice BM25 a partir de los chunks ya
+almacenados en el vector store, sin re-ingestar los PDFs.
+
+Uso:
+    python scripts/15_build_bm25.py
+    python scripts/15_build_bm25.py --collection academic_research --output ./chroma_db/bm25_index
+"""
+import argparse
+import os
+import shutil
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from retrieval.bm25_index import BM25Index
+from vectorstore.factory import build_vector_store, storage_path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--collection", default="academic_research")
+    parser.add_argument("--persist-directory", default="./chroma_db")
+    parser.add_argument("--output", default="{persist_directory}/bm25_index")
+    parser.add_argument("--batch-size", type=int, default=2048)
+    args = parser.parse_args()
+    args.output = storage_path(args.output, args.persist_directory)
+
+    vector_store = build_vector_store(
+        collection_name=args.collection,
+        persist_directory=args.persist_directory
+    )
+    print(f"🔤 Building BM25 index from '{args.collection}' ({vector_store.count()} chunks)")
+
+    # Un índice por colección: <output>/<colección>
+    output = BM25Index.collection_path(args.collection, args.output)
+    shutil.rmtree(output, ignore_errors=True)
+    lexical_index = BM25Index(output)
+
+    # Agrupamos por paper para registrar cada doc_id como indexado
+    chunks_by_doc = {}
+    for batch in vector_store.iter_batches(batch_size=args.batch_size):
+        for chunk_id, text, metadata in zip(batch["ids"], batch["documents"], batch["metadatas"]):
+            ids, texts = chunks_by_doc.setdefault(metadata.get("doc_id", ""), ([], []))
+            ids.append(chunk_id)
+            texts.append(text or "")
+
+    for doc_id, (ids, texts) in chunks_by_doc.items():
+        if doc_id:
+            lexical_index.replace_document(doc_id, ids, texts)
+        else:
+            lexical_index.add(ids, texts)
+
+    lexical_index.save()
+    print(f"✅ Done. {lexical_index.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,10 @@
 from retrieval.hybrid_retriever import HybridRetriever
 from qa.academic_qa_engine import AcademicQAEngine
-from embedding.ollama_embedder import OllamaEmbedder
-from vectorstore.chroma_vector_store import ChromaVectorStore
+from embedding.factory import build_embedder
+from vectorstore.factory import build_vector_store
 
-embedder = OllamaEmbedder()
-vector_store = ChromaVectorStore()
+embedder = build_embedder()
+vector_store = build_vector_store()
 retriever = HybridRetriever(embedder, vector_store)
 
 qa_engine = AcademicQAEngine(
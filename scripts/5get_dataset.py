@@ -1,5 +1,4 @@
 import csv
-import requests
 import json
 import sys
 import os
@@ -8,8 +7,9 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from retrieval.hybrid_retriever import HybridRetriever
-from embedding.ollama_embedder import OllamaEmbedder
-from vectorstore.chroma_vector_store import ChromaVectorStore
+from embedding.factory import build_embedder
+from vectorstore.factory import build_vector_store
+from clients.ollama_client import get_ollama_client
 
 # CONFIGURATION
 TOP_K = 10
@@ -25,9 +25,10 @@ ADOPTION_PILLARS = {
 }
 
 # Initialize Components
-embedder = OllamaEmbedder(model="nomic-embed-text")
-vector_store = ChromaVectorStore()
+embedder = build_embedder()
+vector_store = build_vector_store()
 retriever = HybridRetriever(embedder, vector_store)
+ollama = get_ollama_client()
 
 def generate_optimized_queries(pillar_name, description):
     """
@@ -54,8 +55,9 @@ def generate_optimized_queries(pillar_name, description):
     """
     
     try:
-        response = requests.post("http://localhost:11434/api/generate", 
-                                 json={"model": OLLAMA_MODEL, "prompt": prompt, "stream": False})
+        response = ollama.post("/api/generate",
+                               {"model": OLLAMA_MODEL, "prompt": prompt, "stream": False},
+                               timeout=120)
         return response.json().get("response", "").strip().strip('"')
     except:
         return f"Blockchain {pillar_name} adoption factors"
@@ -72,8 +74,9 @@ def generate_business_rule(pillar, snippet):
     [/INST]
     """
     try:
-        res = requests.post("http://localhost:11434/api/generate", 
-                            json={"model": OLLAMA_MODEL, "prompt": prompt, "stream": False})
+        res = ollama.post("/api/generate",
+                          {"model": OLLAMA_MODEL, "prompt": prompt, "stream": False},
+                          timeout=120)
         return res.json().get("response", "").strip()
     except:
         return "Generation Error"
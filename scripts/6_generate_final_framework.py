@@ -1,6 +1,10 @@
 import pandas as pd
-import requests
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from clients.ollama_client import get_ollama_client
 
 # Configuración
 INPUT_CSV = "blockchain_business_framework.csv"
@@ -40,9 +44,9 @@ def ask_ollama_to_synthesize(pilar, data_rows):
     """
     
     try:
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
+        response = get_ollama_client().post(
+            "/api/generate",
+            {
                 "model": OLLAMA_MODEL, 
                 "prompt": prompt, 
                 "stream": False,
@@ -1,10 +1,13 @@
 import sys
 import os
 import json
-import requests
 import re
 import random
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from clients.ollama_client import get_ollama_client
+
 # Configuración
 FRAMEWORK_FILE = "FRAMEWORK_FINAL_BLOCKCHAIN.md"
 QUESTIONS_FILE = "assessment_questions.json"
@@ -68,9 +71,9 @@ def generate_questions_pro():
             """
 
             try:
-                response = requests.post(
-                    "http://localhost:11434/api/generate",
-                    json={"model": OLLAMA_MODEL, "prompt": prompt, "stream": False, "format": "json"},
+                response = get_ollama_client().post(
+                    "/api/generate",
+                    {"model": OLLAMA_MODEL, "prompt": prompt, "stream": False, "format": "json"},
                     timeout=90
                 )
                 
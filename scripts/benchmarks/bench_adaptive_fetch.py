@@ -0,0 +1,123 @@
+"""
+Over-fetch fijo (n_results * 3 de search3) frente a AdaptiveFetchPolicy:
+candidatos transferidos por consulta, latencia, papers distintos en el
+top-k, solapamiento con el top-k del factor fijo y top-k completos en
+consultas con filtro selectivo. Usa HashingEmbedder (sin Ollama).
+
+Los chunks de un paper comparten vocabulario (se parecen entre sí) y los
+papers se agrupan en temas; con --papers-per-topic 1 cada consulta apunta
+a un único paper: el caso en que la penalización de diversidad necesita
+más candidatos.
+
+Uso:
+    python scripts/benchmarks/bench_adaptive_fetch.py --papers 1000
+    python scripts/benchmarks/bench_adaptive_fetch.py --backend chroma --k 10
+    python scripts/benchmarks/bench_adaptive_fetch.py --papers-per-topic 1
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from embedding.hashing_embedder import HashingEmbedder
+from retrieval.fetch_policy import AdaptiveFetchPolicy
+from retrieval.hybrid_retriever import HybridRetriever
+from vectorstore.factory import build_vector_store
+
+
+def synthetic_papers(papers: int, chunks_per_paper: int, papers_per_topic: int, seed: int = 13):
+    """
+    Papers agrupados en temas (papers_per_topic por tema): los chunks de un
+    paper comparten vocabulario propio y del tema. Con papers_per_topic=1
+    cada paper es su propio tema (peor caso para la diversidad).
+    """
+    rng = np.random.default_rng(seed)
+    shared = [f"w{i}" for i in range(400)]
+    texts, metadatas, topics = [], [], []
+    for p in range(papers):
+        topic = [f"topic{p // papers_per_topic}_{i}" for i in range(12)]
+        own = [f"t{p}_{i}" for i in range(12)]
+        topics.append(topic)
+        # Años repartidos de forma desigual: year >= 2025 es un filtro selectivo
+        year = int(rng.choice([2014, 2017, 2019, 2021, 2022, 2023, 2024, 2025], p=[.15, .15, .15, .15, .13, .12, .1, .05]))
+        for c in range(int(rng.integers(max(1, chunks_per_paper // 2), chunks_per_paper * 3 // 2 + 1))):
+            words = rng.choice(topic, size=10).tolist() + rng.choice(own, size=10).tolist() + rng.choice(shared, size=20).tolist()
+            texts.append(" ".join(rng.permutation(words)))
+            metadatas.append({"doc_id": f"doc{p}", "year": year, "structural_weight": 1.0})
+    return texts, metadatas, topics
+
+
+def run(retriever, queries, k, where_filter):
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(retriever.search3(q, k, where_filter=where_filter))
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--papers", type=int, default=1000)
+    parser.add_argument("--chunks-per-paper", type=int, default=20)
+    parser.add_argument("--papers-per-topic", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--backend", choices=["numpy", "chroma"], default="numpy")
+    args = parser.parse_args()
+
+    texts, metadatas, topics = synthetic_papers(args.papers, args.chunks_per_paper, args.papers_per_topic)
+    ids = [f"c{i}" for i in range(len(texts))]
+
+    workdir = tempfile.mkdtemp(prefix="bench_fetch_")
+    embedder = HashingEmbedder(dimensions=args.dim)
+    store = build_vector_store({"vector_backend": args.backend}, "bench_fetch", workdir)
+    for s in range(0, len(texts), 2000):
+        store.add_documents(texts[s:s + 2000], embedder.embed_batch(texts[s:s + 2000]), metadatas[s:s + 2000], ids[s:s + 2000])
+
+    rng = np.random.default_rng(5)
+    queries = [" ".join(rng.choice(topics[p], size=4)) for p in rng.choice(args.papers, size=args.queries)]
+
+    print(
+        f"📐 papers={args.papers} chunks={len(texts)} papers/topic={args.papers_per_topic} "
+        f"queries={args.queries} k={args.k} backend={args.backend}"
+    )
+
+    for label, where_filter in (("no filter", None), ("year >= 2025", {"year": {"$gte": 2025}})):
+        fixed = HybridRetriever(embedder, store, result_cache_size=0)
+        policy = AdaptiveFetchPolicy()
+        adaptive = HybridRetriever(embedder, store, result_cache_size=0, fetch_policy=policy)
+
+        fixed_ms, fixed_results = run(fixed, queries, args.k, where_filter)
+        adaptive_ms, adaptive_results = run(adaptive, queries, args.k, where_filter)
+
+        overlap = np.mean([
+            len({r["id"] for r in a} & {r["id"] for r in f}) / max(1, len(f))
+            for a, f in zip(adaptive_results, fixed_results)
+        ])
+        distinct = lambda results: np.mean([len({r["metadata"]["doc_id"] for r in rs}) for rs in results])
+        full = lambda results: np.mean([len(rs) == args.k for rs in results])
+        stats = policy.stats()
+
+        print(f"\n🔎 {label}")
+        print(f"   {'mode':<9} | {'candidates':>10} | {'p50 ms':>7} | {'p95 ms':>7} | {'distinct docs':>13} | full top-k")
+        print(
+            f"   {'fixed 3x':<9} | {args.k * 3:>10} | {np.percentile(fixed_ms, 50):>7.2f} | "
+            f"{np.percentile(fixed_ms, 95):>7.2f} | {distinct(fixed_results):>13.2f} | {full(fixed_results):.3f}"
+        )
+        print(
+            f"   {'adaptive':<9} | {stats['avg_candidates']:>10} | {np.percentile(adaptive_ms, 50):>7.2f} | "
+            f"{np.percentile(adaptive_ms, 95):>7.2f} | {distinct(adaptive_results):>13.2f} | {full(adaptive_results):.3f}"
+        )
+        print(f"   top-{args.k} overlap with fixed: {overlap:.3f} | suggested initial_factor (p90): {policy.suggested_factor()}")
+        print(f"   policy: {stats}")
+
+
+if __name__ == "__main__":
+    main()
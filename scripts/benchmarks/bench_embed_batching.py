@@ -0,0 +1,94 @@
+"""
+Benchmark de throughput: embedding por-texto (/api/embeddings) vs
+multi-input (/api/embed) vs async concurrente, contra un servidor stub local.
+
+Uso:
+    python scripts/benchmarks/bench_embed_batching.py --texts 512
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from embedding.ollama_embedder import OllamaEmbedder
+from embedding.async_ollama_embedder import AsyncOllamaEmbedder
+from scripts.benchmarks.ollama_stub import OllamaStubServer
+
+
+def run_mode(base_url: str, texts, use_batch_endpoint: bool, batch_size: int, concurrency: int = 0):
+    if concurrency:
+        embedder = AsyncOllamaEmbedder(
+            base_url=base_url,
+            batch_size=batch_size,
+            use_batch_endpoint=use_batch_endpoint,
+            max_concurrency=concurrency
+        )
+    else:
+        embedder = OllamaEmbedder(
+            base_url=base_url,
+            batch_size=batch_size,
+            use_batch_endpoint=use_batch_endpoint
+        )
+    embedder.logger.setLevel("WARNING")
+
+    start = time.perf_counter()
+    embeddings = embedder.embed_batch(texts)
+    elapsed = time.perf_counter() - start
+    embedder.close()
+
+    return embeddings, elapsed, embedder.scheduler.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--request-latency", type=float, default=0.01)
+    parser.add_argument("--item-latency", type=float, default=0.002)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    texts = [f"chunk {i}: permissioned blockchain throughput and latency" for i in range(args.texts)]
+
+    with OllamaStubServer(
+        request_latency=args.request_latency,
+        item_latency=args.item_latency
+    ) as server:
+        results = {}
+        modes = [
+            ("per-text", False, 0),
+            ("batched", True, 0),
+            ("async", True, args.concurrency)
+        ]
+        for label, batched, concurrency in modes:
+            before = server.request_count
+            embeddings, elapsed, scheduler_stats = run_mode(
+                server.base_url, texts, batched, args.batch_size, concurrency
+            )
+            results[label] = embeddings
+            print(
+                f"{label:<10} {len(texts)} texts | {elapsed:7.2f}s | "
+                f"{len(texts) / elapsed:8.1f} texts/s | {server.request_count - before} requests | "
+                f"token budget {scheduler_stats['token_budget']}"
+            )
+
+    # Todos los modos deben producir los mismos vectores y en el mismo orden
+    same = all(
+        max(abs(a - b) for a, b in zip(x, y)) < 1e-9
+        for label in ("batched", "async")
+        for x, y in zip(results["per-text"], results[label])
+    )
+    print(f"Identical output: {same}")
+
+    # Fallback en servidor legacy (sin /api/embed)
+    with OllamaStubServer(legacy=True) as legacy:
+        embedder = OllamaEmbedder(base_url=legacy.base_url, batch_size=args.batch_size)
+        embedder.logger.setLevel("ERROR")
+        embedder.embed_batch(texts[:args.batch_size])
+        print(f"Legacy server fallback -> use_batch_endpoint={embedder.use_batch_endpoint}")
+
+
+if __name__ == "__main__":
+    main()
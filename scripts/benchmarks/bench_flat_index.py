@@ -0,0 +1,99 @@
+"""
+Benchmark de latencia y recall: Chroma (HNSW) vs NumpyFlatVectorStore
+(búsqueda exacta sobre .npy memory-mapped) vs NumpyFlatVectorStore con
+quantization="int8" (scan cuantizado + rescoring float32), con y sin
+where_filter.
+
+Uso:
+    python scripts/benchmarks/bench_flat_index.py --n 30000 --dim 768
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from vectorstore.chroma_vector_store import ChromaVectorStore
+from vectorstore.numpy_vector_store import NumpyFlatVectorStore
+from scripts.benchmarks.bench_quantization import synthetic_vectors
+
+
+SECTIONS = ["Abstract", "Introduction", "Methodology", "Results", "Discussion", "Conclusion"]
+
+
+def fill(store, vectors, metadatas, ids, page: int = 5000):
+    start = time.perf_counter()
+    for s in range(0, len(ids), page):
+        store.add_documents(
+            texts=[f"chunk {i}" for i in ids[s:s + page]],
+            embeddings=vectors[s:s + page],
+            metadatas=metadatas[s:s + page],
+            ids=ids[s:s + page]
+        )
+    store.flush()
+    return time.perf_counter() - start
+
+
+def run_queries(store, queries, k: int, where):
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        res = store.query(q.tolist(), n_results=k, where_filter=where)
+        latencies.append(time.perf_counter() - start)
+        results.append(res["ids"][0])
+    return np.array(latencies) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=30000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.n, args.dim)
+    queries = synthetic_vectors(args.queries, args.dim, seed=11)
+    ids = [str(i) for i in range(args.n)]
+    metadatas = [
+        {"doc_id": f"doc{i // 40}", "year": 2012 + i % 14, "section": SECTIONS[i % len(SECTIONS)]}
+        for i in range(args.n)
+    ]
+
+    workdir = tempfile.mkdtemp(prefix="bench_flat_")
+    stores = {
+        "chroma_hnsw": ChromaVectorStore("bench_flat", os.path.join(workdir, "chroma")),
+        "numpy_flat": NumpyFlatVectorStore("bench_flat", os.path.join(workdir, "numpy")),
+        "numpy_int8": NumpyFlatVectorStore("bench_flat", os.path.join(workdir, "numpy_int8"), quantization="int8")
+    }
+
+    print(f"📐 n={args.n} dim={args.dim} queries={args.queries} k={args.k}")
+    for name, store in stores.items():
+        print(f"   {name:<12} ingest {fill(store, vectors, metadatas, ids):.2f}s")
+
+    filters = {
+        "no filter": None,
+        "year >= 2022": {"year": {"$gte": 2022}},
+        "section=Results": {"section": "Results"}
+    }
+
+    for label, where in filters.items():
+        print(f"\n🔎 {label}")
+        # El flat store es exacto: sus resultados son la referencia de recall
+        flat_ms, truth = run_queries(stores["numpy_flat"], queries, args.k, where)
+        print(f"   {'numpy_flat':<12} p50 {np.percentile(flat_ms, 50):7.2f} ms | p95 {np.percentile(flat_ms, 95):7.2f} ms")
+        for name in ("chroma_hnsw", "numpy_int8"):
+            ms, found = run_queries(stores[name], queries, args.k, where)
+            recall = np.mean([len(set(f) & set(t)) / max(1, len(t)) for f, t in zip(found, truth)])
+            print(
+                f"   {name:<12} p50 {np.percentile(ms, 50):7.2f} ms | p95 {np.percentile(ms, 95):7.2f} ms"
+                f" | recall@{args.k} vs exact: {recall:.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Barrido de parámetros HNSW de Chroma: recall@k frente a búsqueda exacta
+(NumpyFlatVectorStore con la misma métrica) y latencia p50/p95 por consulta.
+
+Para cada espacio y cada (ef_construction, max_neighbors) se construye una
+colección; ef_search se barre sobre la misma colección (no requiere re-indexar).
+
+Uso:
+    python scripts/benchmarks/bench_hnsw.py --n 20000 --dim 384
+    python scripts/benchmarks/bench_hnsw.py --spaces l2 cosine --ef-search 10 50 100 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+from chromadb.api.client import SharedSystemClient
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from vectorstore.chroma_vector_store import ChromaVectorStore
+from vectorstore.numpy_vector_store import NumpyFlatVectorStore
+from scripts.benchmarks.bench_quantization import synthetic_vectors
+from scripts.benchmarks.bench_flat_index import fill, run_queries
+
+
+def reopen(name: str, persist: str, space: str, ef_search: int) -> ChromaVectorStore:
+    """
+    Cambia ef_search y vuelve a abrir la colección. Chroma cachea el índice
+    HNSW cargado por proceso: hay que vaciar esa caché para que el nuevo
+    ef_search se aplique (equivale a reiniciar el proceso).
+    """
+    SharedSystemClient.clear_system_cache()
+    ChromaVectorStore(name, persist, space=space, hnsw_params={"ef_search": ef_search})
+    SharedSystemClient.clear_system_cache()
+    return ChromaVectorStore(name, persist, space=space)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--spaces", nargs="+", default=["l2", "cosine"])
+    parser.add_argument("--ef-construction", nargs="+", type=int, default=[64, 100, 200])
+    parser.add_argument("--max-neighbors", nargs="+", type=int, default=[8, 16, 32])
+    parser.add_argument("--ef-search", nargs="+", type=int, default=[10, 50, 100, 200])
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.n, args.dim)
+    # Consultas fijas (misma semilla en todas las configuraciones)
+    queries = synthetic_vectors(args.queries, args.dim, seed=11)
+    ids = [str(i) for i in range(args.n)]
+    metadatas = [{"doc_id": f"doc{i // 40}"} for i in range(args.n)]
+
+    workdir = tempfile.mkdtemp(prefix="bench_hnsw_")
+    print(f"📐 n={args.n} dim={args.dim} queries={args.queries} k={args.k}")
+
+    for space in args.spaces:
+        exact = NumpyFlatVectorStore(f"exact_{space}", os.path.join(workdir, "numpy"), metric=space)
+        fill(exact, vectors, metadatas, ids)
+        _, truth = run_queries(exact, queries, args.k, None)
+
+        print(f"\n🧭 space={space}")
+        print(f"   {'ef_c':>5} {'M':>4} {'ef_s':>5} | {'build s':>8} | {'recall@' + str(args.k):>9} | {'p50 ms':>7} | {'p95 ms':>7}")
+
+        for ef_construction in args.ef_construction:
+            for max_neighbors in args.max_neighbors:
+                name = f"hnsw_{space}_{ef_construction}_{max_neighbors}"
+                persist = os.path.join(workdir, "chroma")
+                store = ChromaVectorStore(
+                    name, persist, space=space,
+                    hnsw_params={"ef_construction": ef_construction, "max_neighbors": max_neighbors}
+                )
+                build_s = fill(store, vectors, metadatas, ids)
+
+                for ef_search in args.ef_search:
+                    # Solo cambia el parámetro de búsqueda: no se re-indexa
+                    store = reopen(name, persist, space, ef_search)
+                    ms, found = run_queries(store, queries, args.k, None)
+                    recall = np.mean([len(set(f) & set(t)) / max(1, len(t)) for f, t in zip(found, truth)])
+                    print(
+                        f"   {ef_construction:>5} {max_neighbors:>4} {ef_search:>5} | {build_s:>8.2f} | "
+                        f"{recall:>9.4f} | {np.percentile(ms, 50):>7.2f} | {np.percentile(ms, 95):>7.2f}"
+                    )
+
+                store.delete_collection()
+
+
+if __name__ == "__main__":
+    main()
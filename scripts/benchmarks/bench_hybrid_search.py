@@ -0,0 +1,111 @@
+"""
+Latencia de la búsqueda híbrida (denso + BM25 con RRF) frente a la búsqueda
+solo densa (search3) y al BM25 aislado, con HashingEmbedder (sin Ollama).
+
+Cada chunk sintético lleva un término exacto único (p. ej. "iso-20022-417");
+se mide también qué fracción de las consultas por término exacto recupera
+su chunk en el top-k.
+
+Uso:
+    python scripts/benchmarks/bench_hybrid_search.py --n 20000
+    python scripts/benchmarks/bench_hybrid_search.py --backend chroma --n 10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from embedding.hashing_embedder import HashingEmbedder
+from retrieval.bm25_index import BM25Index
+from retrieval.hybrid_retriever import HybridRetriever
+from vectorstore.factory import build_vector_store
+
+
+def synthetic_corpus(n: int, words_per_chunk: int = 120, vocabulary: int = 5000, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    vocab = [f"w{i}" for i in range(vocabulary)]
+    # Zipf: pocas palabras muy frecuentes, cola larga de palabras raras
+    probs = 1.0 / np.arange(1, vocabulary + 1)
+    probs /= probs.sum()
+
+    texts, exact_terms = [], []
+    for i in range(n):
+        words = rng.choice(vocab, size=words_per_chunk, p=probs).tolist()
+        term = f"iso-{20000 + i % 997}-{i}"
+        words.insert(int(rng.integers(0, words_per_chunk)), term)
+        texts.append(" ".join(words))
+        exact_terms.append(term)
+    return texts, exact_terms
+
+
+def timed(fn, queries):
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(fn(q))
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--backend", choices=["numpy", "chroma"], default="numpy")
+    args = parser.parse_args()
+
+    texts, exact_terms = synthetic_corpus(args.n)
+    ids = [f"c{i}" for i in range(args.n)]
+    metadatas = [
+        {"doc_id": f"doc{i // 20}", "year": 2012 + i % 14, "structural_weight": 1.0}
+        for i in range(args.n)
+    ]
+
+    workdir = tempfile.mkdtemp(prefix="bench_hybrid_")
+    embedder = HashingEmbedder(dimensions=args.dim)
+    store = build_vector_store({"vector_backend": args.backend}, "bench_hybrid", workdir)
+    lexical_index = BM25Index(os.path.join(workdir, "bm25"))
+
+    start = time.perf_counter()
+    for s in range(0, args.n, 2000):
+        store.add_documents(texts[s:s + 2000], embedder.embed_batch(texts[s:s + 2000]), metadatas[s:s + 2000], ids[s:s + 2000])
+    dense_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for s in range(0, args.n, 2000):
+        lexical_index.add(ids[s:s + 2000], texts[s:s + 2000], [m["doc_id"] for m in metadatas[s:s + 2000]])
+    lexical_index.save()
+    lexical_s = time.perf_counter() - start
+
+    print(f"📐 n={args.n} dim={args.dim} queries={args.queries} k={args.k} backend={args.backend}")
+    print(f"   dense ingest {dense_s:.2f}s | bm25 ingest+save {lexical_s:.2f}s | {lexical_index.stats()}")
+
+    rng = np.random.default_rng(3)
+    picks = rng.choice(args.n, size=args.queries, replace=False)
+    # Consulta = término exacto + algo de contexto del propio chunk
+    queries = [f"{exact_terms[i]} {' '.join(texts[i].split()[:4])}" for i in picks]
+    targets = [ids[i] for i in picks]
+
+    retriever = HybridRetriever(embedder, store, lexical_index=lexical_index, query_cache_size=0)
+    modes = {
+        "search3 (dense)": lambda q: [r["id"] for r in retriever.search3(q, args.k)],
+        "bm25 only": lambda q: [c for c, _ in lexical_index.search(q, args.k)],
+        "search_hybrid (RRF)": lambda q: [r["id"] for r in retriever.search_hybrid(q, args.k)]
+    }
+
+    print(f"\n   {'mode':<22} | {'p50 ms':>7} | {'p95 ms':>7} | exact-term hit@{args.k}")
+    for name, fn in modes.items():
+        ms, found = timed(fn, queries)
+        hit = np.mean([t in f for t, f in zip(targets, found)])
+        print(f"   {name:<22} | {np.percentile(ms, 50):>7.2f} | {np.percentile(ms, 95):>7.2f} | {hit:.3f}")
+
+
+if __name__ == "__main__":
+    main()
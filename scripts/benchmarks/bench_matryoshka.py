@@ -0,0 +1,96 @@
+"""
+Benchmark recall/latencia de dimensiones Matryoshka (768/512/256/128) para
+nomic-embed-text.
+
+Toma los embeddings de dimensión completa de la colección Chroma (o los
+recalcula con Ollama si la colección está truncada), embebe un set fijo de
+consultas y compara el top-k de cada dimensión contra el top-k a 768 dims.
+
+Requiere Ollama en marcha y una colección indexada.
+
+Uso:
+    python scripts/benchmarks/bench_matryoshka.py --k 10
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from embedding.ollama_embedder import OllamaEmbedder
+from vectorstore.chroma_vector_store import ChromaVectorStore
+from vectorstore.quantization import exact_distances, top_k_smallest
+
+
+QUERIES = [
+    "blockchain interoperability mechanisms",
+    "consensus algorithm performance comparison",
+    "smart contract security vulnerabilities",
+    "zero knowledge proof scalability limitations",
+    "decentralized governance models in blockchain",
+    "ISO 20022 compliance in financial messaging",
+    "Hyperledger Fabric throughput and latency benchmarks",
+    "KYC/AML automation with distributed ledgers",
+    "organizational readiness for blockchain adoption in banks",
+    "data sovereignty and GDPR in permissioned ledgers",
+]
+
+DIMENSIONS = [768, 512, 256, 128]
+
+
+def truncate(matrix: np.ndarray, dim: int) -> np.ndarray:
+    out = matrix[:, :dim]
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return out / norms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--collection", default="academic_research")
+    parser.add_argument("--persist-directory", default="./chroma_db")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    embedder = OllamaEmbedder()
+    embedder.logger.setLevel("WARNING")
+    store = ChromaVectorStore(collection_name=args.collection, persist_directory=args.persist_directory)
+
+    data = store.collection.get(include=["embeddings", "documents"])
+    corpus = np.asarray(data["embeddings"], dtype=np.float32)
+    if corpus.shape[1] < max(DIMENSIONS):
+        print(f"Collection stores {corpus.shape[1]} dims; re-embedding documents at full size...")
+        corpus = np.asarray(embedder.embed_batch(data["documents"]), dtype=np.float32)
+
+    queries = np.asarray(embedder.embed_batch(QUERIES), dtype=np.float32)
+
+    full = truncate(corpus, max(DIMENSIONS))
+    truth = [top_k_smallest(exact_distances(q, full, "cosine"), args.k) for q in truncate(queries, max(DIMENSIONS))]
+
+    print(f"{len(corpus)} chunks | {len(QUERIES)} queries | recall@{args.k} vs {max(DIMENSIONS)} dims")
+    print(f"{'dims':>6} {'index MB':>10} {'recall':>8} {'p50 ms':>8} {'p95 ms':>8}")
+
+    for dim in DIMENSIONS:
+        index = truncate(corpus, dim)
+        q_dim = truncate(queries, dim)
+
+        recalls, latencies = [], []
+        for q, t in zip(q_dim, truth):
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                found = top_k_smallest(exact_distances(q, index, "cosine"), args.k)
+                latencies.append((time.perf_counter() - start) * 1000)
+            recalls.append(len(set(found.tolist()) & set(t.tolist())) / len(t))
+
+        print(
+            f"{dim:>6} {index.nbytes / 1e6:>10.2f} {np.mean(recalls):>8.3f} "
+            f"{np.percentile(latencies, 50):>8.3f} {np.percentile(latencies, 95):>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
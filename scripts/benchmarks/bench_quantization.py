@@ -0,0 +1,104 @@
+"""
+Benchmark memoria vs recall de la representación cuantizada de embeddings
+(float32 / float16 / int8), con y sin rescoring en precisión completa.
+
+Usa vectores sintéticos agrupados (clusters) para imitar embeddings reales,
+o los embeddings de una colección Chroma existente con --from-chroma.
+
+La columna "vs f32" es la latencia p50 relativa a float32: el scan en
+float16 es bastante más lento (NumPy convierte float16 -> float32 sin ruta
+vectorizada rápida), así que float16 ahorra memoria a costa de latencia.
+
+Uso:
+    python scripts/benchmarks/bench_quantization.py --n 20000 --dim 768
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from vectorstore.quantization import QuantizedIndex, exact_distances, top_k_smallest
+
+
+def synthetic_vectors(n: int, dim: int, n_clusters: int = 50, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, size=n)
+    vectors = centers[labels] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def chroma_vectors(collection_name: str, persist_directory: str):
+    from vectorstore.chroma_vector_store import ChromaVectorStore
+
+    store = ChromaVectorStore(collection_name=collection_name, persist_directory=persist_directory)
+    data = store.collection.get(include=["embeddings"])
+    return np.asarray(data["embeddings"], dtype=np.float32)
+
+
+def recall_at_k(found, truth) -> float:
+    return len(set(found.tolist()) & set(truth.tolist())) / len(truth)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    parser.add_argument("--from-chroma", action="store_true")
+    parser.add_argument("--collection", default="academic_research")
+    parser.add_argument("--persist-directory", default="./chroma_db")
+    args = parser.parse_args()
+
+    if args.from_chroma:
+        vectors = chroma_vectors(args.collection, args.persist_directory)
+    else:
+        vectors = synthetic_vectors(args.n, args.dim)
+
+    rng = np.random.default_rng(11)
+    # Consultas = vectores del corpus con ruido (simula preguntas cercanas)
+    picks = rng.integers(0, len(vectors), size=args.queries)
+    queries = vectors[picks] + 0.3 * rng.normal(size=(args.queries, vectors.shape[1])).astype(np.float32)
+
+    truth = [top_k_smallest(exact_distances(q, vectors, "cosine"), args.k) for q in queries]
+
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims | {args.queries} queries | recall@{args.k}")
+    print(f"{'mode':<20} {'RAM (MB)':>10} {'recall':>8} {'p50 ms':>8} {'p95 ms':>8} {'vs f32':>7}")
+
+    tmpdir = tempfile.mkdtemp()
+    baseline_p50 = None
+    for dtype in ("float32", "float16", "int8"):
+        for rescore in ([False] if dtype == "float32" else [False, True]):
+            index = QuantizedIndex(
+                dtype=dtype,
+                metric="cosine",
+                rescore_factor=args.rescore_factor,
+                # float32 completo en disco (memmap) para no contarlo como RAM
+                full_precision_path=None if dtype == "float32" else os.path.join(tmpdir, f"{dtype}.npy")
+            ).build(vectors)
+
+            recalls, latencies = [], []
+            for q, t in zip(queries, truth):
+                start = time.perf_counter()
+                rows, _ = index.search(q, args.k, rescore=rescore)
+                latencies.append((time.perf_counter() - start) * 1000)
+                recalls.append(recall_at_k(rows, t))
+
+            p50 = np.percentile(latencies, 50)
+            baseline_p50 = baseline_p50 or p50
+            label = f"{dtype}{' + rescore' if rescore else ''}"
+            print(
+                f"{label:<20} {index.nbytes / 1e6:>10.1f} {np.mean(recalls):>8.3f} "
+                f"{p50:>8.2f} {np.percentile(latencies, 95):>8.2f} {p50 / baseline_p50:>6.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Re-ranking de search2/search3: bucle por candidato (implementación previa,
+un dict de breakdown por candidato y sort completo) frente al RerankEngine
+vectorizado (arrays NumPy + argpartition, dicts solo para el top-k).
+
+Se comprueba además que ambos devuelvan exactamente el mismo ranking.
+
+Uso:
+    python scripts/benchmarks/bench_rerank.py
+    python scripts/benchmarks/bench_rerank.py --candidates 10 100 1000 10000 --k 10
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from retrieval.rerank_engine import RerankEngine
+
+
+def synthetic_candidates(n: int, seed: int = 5):
+    rng = np.random.default_rng(seed)
+    ids = [f"c{i}" for i in range(n)]
+    distances = np.sort(rng.uniform(0.2, 1.6, n)).tolist()
+    metadatas = [
+        {
+            "doc_id": f"doc{int(d)}",
+            "year": int(y),
+            "structural_weight": float(w),
+            "has_taxonomy_pattern": bool(t),
+            "has_structured_table": bool(s)
+        }
+        for d, y, w, t, s in zip(
+            rng.integers(0, max(1, n // 4), n),
+            rng.choice([0, 2012, 2016, 2019, 2021, 2023, 2025], n),
+            rng.choice([0.6, 0.8, 1.0, 1.2], n),
+            rng.random(n) < 0.1,
+            rng.random(n) < 0.1
+        )
+    ]
+    return ids, metadatas, distances
+
+
+def recency_score(year: int, current_year: int) -> float:
+    if not year:
+        return 0.5
+    age = current_year - year
+    if age <= 1: return 1.0
+    elif age <= 3: return 0.85
+    elif age <= 5: return 0.65
+    elif age <= 8: return 0.45
+    else: return 0.30
+
+
+def loop_rerank(engine: RerankEngine, ids, metadatas, distances, n_results, profile):
+    """Re-ranking candidato a candidato, como el search3 original (espacio l2)."""
+    settings = engine.PROFILES[profile]
+    first, second, rest = settings["diversity"]
+    current_year = datetime.now().year
+    scored, doc_counts = [], {}
+    for chunk_id, metadata, distance in zip(ids, metadatas, distances):
+        semantic = 1 / (1 + distance)
+        structural = float(metadata.get("structural_weight", 0.6))
+        if metadata.get("has_taxonomy_pattern"):
+            structural += 0.15
+        if metadata.get("has_structured_table"):
+            structural += 0.10
+        recency = recency_score(metadata.get("year", 0), current_year)
+        doc_id = metadata.get("doc_id", "unknown")
+        doc_counts[doc_id] = doc_counts.get(doc_id, 0) + 1
+        diversity = first if doc_counts[doc_id] == 1 else second if doc_counts[doc_id] == 2 else rest
+
+        final = (
+            engine.semantic_weight * semantic +
+            engine.structural_weight * min(structural, 1.5) +
+            engine.recency_weight * recency +
+            engine.diversity_weight * diversity
+        )
+        scored.append({
+            "id": chunk_id,
+            "text": None,
+            "metadata": engine.enrich_metadata(metadata) if settings["enrich_metadata"] else metadata,
+            "final_score": round(final, 4) if settings["round_scores"] else final,
+            "breakdown": {
+                "semantic": round(semantic, 3),
+                "structural": round(structural, 3),
+                "recency": round(recency, 3),
+                "diversity": round(diversity, 3)
+            }
+        })
+    scored.sort(key=lambda x: x["final_score"], reverse=True)
+    return scored[:n_results]
+
+
+def timed(fn, repeats: int) -> np.ndarray:
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", nargs="+", type=int, default=[10, 100, 1000, 10000])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--profile", choices=list(RerankEngine.PROFILES), default="search3")
+    args = parser.parse_args()
+
+    engine = RerankEngine()
+    print(f"📐 k={args.k} profile={args.profile} repeats={args.repeats}")
+    print(f"\n   {'candidates':>10} | {'loop p50 ms':>11} | {'engine p50 ms':>13} | {'speedup':>7} | same ranking")
+
+    for n in args.candidates:
+        ids, metadatas, distances = synthetic_candidates(n)
+        loop = lambda: loop_rerank(engine, ids, metadatas, distances, args.k, args.profile)
+        vectorized = lambda: engine.rerank(ids, metadatas, distances, args.k, args.profile)
+
+        same = loop() == vectorized()
+        loop_ms = np.percentile(timed(loop, args.repeats), 50)
+        engine_ms = np.percentile(timed(vectorized, args.repeats), 50)
+        print(f"   {n:>10} | {loop_ms:>11.3f} | {engine_ms:>13.3f} | {loop_ms / engine_ms:>6.1f}x | {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Búsqueda en dos etapas (secciones -> chunks, HybridRetriever.search_two_stage)
+frente a la búsqueda plana sobre todos los chunks (search3): latencia,
+recall@k respecto a la búsqueda plana y tamaño del espacio de búsqueda fino
+(chunks de las secciones elegidas / chunks totales). Usa HashingEmbedder.
+
+Cada paper sintético tiene varias secciones con vocabulario propio (tema del
+paper + tipo de sección); las consultas apuntan a una sección concreta.
+
+Uso:
+    python scripts/benchmarks/bench_two_stage.py --papers 2000
+    python scripts/benchmarks/bench_two_stage.py --backend chroma --n-sections 10 20 40
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from embedding.hashing_embedder import HashingEmbedder
+from retrieval.hybrid_retriever import HybridRetriever
+from retrieval.section_index import SectionIndex
+from vectorstore.factory import build_vector_store
+
+SECTIONS = ["abstract", "introduction", "methodology", "results", "discussion", "conclusion"]
+
+
+def synthetic_library(papers: int, chunks_per_section: int, seed: int = 17):
+    rng = np.random.default_rng(seed)
+    shared = [f"w{i}" for i in range(500)]
+    section_vocab = {s: [f"{s}_{i}" for i in range(30)] for s in SECTIONS}
+    library = []
+    for p in range(papers):
+        topic = [f"t{p}_{i}" for i in range(15)]
+        year = int(rng.integers(2012, 2026))
+        chunks = []
+        for section in SECTIONS:
+            for c in range(int(rng.integers(1, 2 * chunks_per_section))):
+                words = (
+                    rng.choice(topic, size=10).tolist()
+                    + rng.choice(section_vocab[section], size=10).tolist()
+                    + rng.choice(shared, size=20).tolist()
+                )
+                chunks.append({
+                    "id": f"doc{p}_{section}_{c}",
+                    "text": " ".join(rng.permutation(words)),
+                    "metadata": {"doc_id": f"doc{p}", "section": section, "year": year, "structural_weight": 1.0}
+                })
+        library.append((f"doc{p}", topic, chunks))
+    return library, section_vocab
+
+
+def timed(fn, queries):
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(fn(q))
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--papers", type=int, default=2000)
+    parser.add_argument("--chunks-per-section", type=int, default=4)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--n-sections", nargs="+", type=int, default=[10, 20, 40])
+    parser.add_argument("--backend", choices=["numpy", "chroma"], default="numpy")
+    args = parser.parse_args()
+
+    library, section_vocab = synthetic_library(args.papers, args.chunks_per_section)
+    workdir = tempfile.mkdtemp(prefix="bench_two_stage_")
+    config = {"vector_backend": args.backend}
+    embedder = HashingEmbedder(dimensions=args.dim)
+    chunk_store = build_vector_store(config, "bench_chunks", workdir)
+    section_index = SectionIndex(build_vector_store(config, SectionIndex.collection_name("bench_chunks"), workdir))
+
+    # Mismo flujo que los pipelines: chunks del paper + sus secciones a partir de los mismos embeddings
+    start = time.perf_counter()
+    for doc_id, _, chunks in library:
+        texts = [c["text"] for c in chunks]
+        metadatas = [c["metadata"] for c in chunks]
+        embeddings = embedder.embed_batch(texts)
+        chunk_store.replace_document(doc_id, texts=texts, embeddings=embeddings, metadatas=metadatas, ids=[c["id"] for c in chunks])
+        section_index.replace_document(doc_id, [c["id"] for c in chunks], texts, embeddings, metadatas)
+    build_s = time.perf_counter() - start
+
+    total_chunks = chunk_store.count()
+    print(
+        f"📐 papers={args.papers} chunks={total_chunks} sections={section_index.count()} "
+        f"queries={args.queries} k={args.k} backend={args.backend} (ingest {build_s:.1f}s)"
+    )
+
+    rng = np.random.default_rng(3)
+    queries = []
+    for p in rng.choice(args.papers, size=args.queries):
+        _, topic, _ = library[p]
+        section = SECTIONS[int(rng.integers(len(SECTIONS)))]
+        queries.append(" ".join(rng.choice(topic, size=3).tolist() + rng.choice(section_vocab[section], size=3).tolist()))
+
+    retriever = HybridRetriever(embedder, chunk_store, result_cache_size=0, section_index=section_index)
+    flat_ms, flat = timed(lambda q: [r["id"] for r in retriever.search3(q, args.k)], queries)
+
+    print(f"\n   {'mode':<18} | {'p50 ms':>7} | {'p95 ms':>7} | {'recall@' + str(args.k):>9} | fine search space")
+    print(f"   {'flat (search3)':<18} | {np.percentile(flat_ms, 50):>7.2f} | {np.percentile(flat_ms, 95):>7.2f} | {1.0:>9.3f} | {total_chunks} chunks (100%)")
+
+    for n_sections in args.n_sections:
+        ms, found = timed(
+            lambda q: [r["id"] for r in retriever.search_two_stage(q, args.k, n_sections=n_sections)], queries
+        )
+        recall = np.mean([len(set(f) & set(t)) / max(1, len(t)) for f, t in zip(found, flat)])
+        space = np.mean([
+            sum(len(s["chunk_ids"]) for s in section_index.select(retriever.embed_query(q), n_sections))
+            for q in queries
+        ])
+        print(
+            f"   {'two-stage s=' + str(n_sections):<18} | {np.percentile(ms, 50):>7.2f} | {np.percentile(ms, 95):>7.2f} | "
+            f"{recall:>9.3f} | {space:.0f} chunks ({100 * space / total_chunks:.2f}%)"
+        )
+
+
+if __name__ == "__main__":
+    main()
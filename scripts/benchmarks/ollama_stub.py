@@ -0,0 +1,106 @@
+import json
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class OllamaStubServer:
+    """
+    Servidor HTTP local que imita la API de embeddings de Ollama.
+    Simula latencia fija por petición + coste por texto para poder
+    medir throughput sin un modelo real.
+    """
+
+    def __init__(
+        self,
+        dim: int = 768,
+        request_latency: float = 0.01,
+        item_latency: float = 0.002,
+        legacy: bool = False,
+        port: int = 0
+    ):
+        self.dim = dim
+        self.request_latency = request_latency
+        self.item_latency = item_latency
+        self.legacy = legacy  # True = sin /api/embed (Ollama < 0.3.4)
+
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def vector_for(self, text: str):
+        """Vector determinista derivado del hash del texto."""
+        seed = hashlib.sha256(text.encode("utf-8")).digest()
+        return [((seed[i % len(seed)] + i) % 256) / 255.0 - 0.5 for i in range(self.dim)]
+
+    def unit_vector_for(self, text: str):
+        vector = self.vector_for(text)
+        norm = sum(x * x for x in vector) ** 0.5
+        return [x / norm for x in vector]
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body):
+                payload = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._reply(200, {"models": []})
+                else:
+                    self._reply(404, b"404 page not found")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+
+                with server._lock:
+                    server.request_count += 1
+
+                if self.path == "/api/embeddings":
+                    time.sleep(server.request_latency + server.item_latency)
+                    self._reply(200, {"embedding": server.vector_for(body["prompt"])})
+
+                elif self.path == "/api/embed" and not server.legacy:
+                    inputs = body["input"]
+                    if isinstance(inputs, str):
+                        inputs = [inputs]
+                    time.sleep(server.request_latency + server.item_latency * len(inputs))
+                    # /api/embed de Ollama devuelve vectores normalizados (L2)
+                    self._reply(200, {"embeddings": [server.unit_vector_for(t) for t in inputs]})
+
+                else:
+                    self._reply(404, b"404 page not found")
+
+        return Handler
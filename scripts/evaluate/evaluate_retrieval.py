@@ -1,6 +1,6 @@
 from retrieval.backup.hybrid_retriever import HybridRetriever
-from embedding.ollama_embedder import OllamaEmbedder
-from vectorstore.chroma_vector_store import ChromaVectorStore
+from embedding.factory import build_embedder
+from vectorstore.factory import build_vector_store
 
 
 EVALUATION_QUERIES = [
@@ -14,8 +14,8 @@ EVALUATION_QUERIES = [
 TOP_K = 5
 
 
-embedder = OllamaEmbedder()
-vector_store = ChromaVectorStore()
+embedder = build_embedder()
+vector_store = build_vector_store()
 retriever = HybridRetriever(embedder, vector_store)
 
 
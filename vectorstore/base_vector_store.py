@@ -0,0 +1,165 @@
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Iterator
+
+
+# Tipos de metadata que aceptan todos los backends (los de Chroma)
+ALLOWED_METADATA_TYPES = (str, int, float, bool, type(None))
+
+# Campos que devuelve query por defecto (los ids siempre se devuelven)
+DEFAULT_INCLUDE = ("documents", "metadatas", "distances")
+
+
+class BaseVectorStore(ABC):
+    """
+    Interfaz común de los backends de vector store.
+    Pipelines y HybridRetriever solo dependen de estos métodos/atributos;
+    `query` devuelve siempre el formato de Chroma
+    ({"ids": [[...]], "documents": [[...]], "metadatas": [[...]], "distances": [[...]]});
+    con `include` se proyectan solo algunos campos (los demás valen None),
+    con `ids` se busca solo entre esos chunks y
+    con "embeddings" se añaden los vectores de los candidatos (p. ej. para MMR).
+    """
+
+    collection_name: str = ""
+    embedding_dim: Optional[int] = None
+    # Espacio de distancia: l2 (cuadrática) | cosine (1 - cos) | ip (1 - producto)
+    space: str = "l2"
+    # persist_directory con que lo creó build_vector_store (raíz común de todos los
+    # backends; ahí viven también cachés, manifiesto e índice BM25 de la colección)
+    storage_directory: Optional[str] = None
+    # Configuración (config/models.yaml) con que lo creó build_vector_store
+    build_config: Optional[Dict[str, Any]] = None
+
+    @abstractmethod
+    def add_documents(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+        ids: Optional[List[str]] = None
+    ):
+        """Inserta o actualiza (upsert por ID) documentos con su embedding."""
+
+    @abstractmethod
+    def query(
+        self,
+        query_embedding: List[float],
+        n_results: int = 10,
+        where_filter: Dict[str, Any] = None,
+        include: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None
+    ) -> Dict[str, List]:
+        """
+        Top-k por distancia con filtro opcional de metadata. `ids` restringe
+        los candidatos a esos IDs (los que no existan se ignoran).
+        """
+
+    def query_many(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 10,
+        where_filter: Dict[str, Any] = None,
+        include: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None
+    ) -> Dict[str, List]:
+        """
+        Varias consultas a la vez; una lista de resultados por consulta.
+        Implementación por defecto: una llamada a `query` por vector.
+        """
+        fields = DEFAULT_INCLUDE if include is None else include
+        merged = {"ids": [], "documents": None, "metadatas": None, "distances": None}
+        for key in fields:
+            merged[key] = []
+
+        for embedding in query_embeddings:
+            result = self.query(embedding, n_results=n_results, where_filter=where_filter, include=include, ids=ids)
+            for key in ["ids", *fields]:
+                merged[key].extend(result[key])
+        return merged
+
+    @abstractmethod
+    def get_documents(self, ids: List[str]) -> Dict[str, str]:
+        """Textos almacenados por ID (carga diferida tras el re-ranking)."""
+
+    @abstractmethod
+    def get_metadatas(self, ids: List[str], where_filter: Dict[str, Any] = None) -> Dict[str, Dict[str, Any]]:
+        """Metadata por ID de los que existen y cumplen el filtro (candidatos léxicos)."""
+
+    @abstractmethod
+    def get_embeddings(self, ids: List[str]) -> Dict[str, List[float]]:
+        """Embeddings almacenados por ID (los que no existan se omiten)."""
+
+    @abstractmethod
+    def iter_batches(self, batch_size: int = 2048) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre la colección completa por lotes:
+        {"ids": [...], "embeddings": ndarray (n, dim) float32, "documents": [...], "metadatas": [...]}.
+        """
+
+    @abstractmethod
+    def get_ids(self, where_filter: Dict[str, Any] = None) -> List[str]:
+        """IDs que cumplen el filtro (todos si no hay filtro)."""
+
+    @abstractmethod
+    def delete(self, ids: Optional[List[str]] = None, where_filter: Dict[str, Any] = None):
+        """Borra por IDs o por filtro de metadata."""
+
+    @abstractmethod
+    def doc_id_counts(self) -> Dict[str, int]:
+        """Número de chunks almacenados por doc_id."""
+
+    def compact(self) -> Dict[str, int]:
+        """Recupera el espacio en disco liberado por los deletes."""
+        return {}
+
+    def replace_document(
+        self,
+        doc_id: str,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str]
+    ) -> int:
+        """
+        Sustituye el conjunto de chunks de un documento: upsert de los nuevos
+        y después delete de los IDs antiguos que ya no existen. El documento
+        nunca queda sin chunks durante la re-ingesta.
+        Devuelve el número de chunks obsoletos eliminados.
+        """
+        previous = set(self.get_ids({"doc_id": doc_id}))
+        self.add_documents(texts=texts, embeddings=embeddings, metadatas=metadatas, ids=ids)
+
+        stale = sorted(previous - set(ids))
+        self.delete(ids=stale)
+        return len(stale)
+
+    @abstractmethod
+    def count(self) -> int:
+        """Número de documentos en la colección."""
+
+    @abstractmethod
+    def delete_collection(self):
+        """Elimina la colección y sus datos persistidos."""
+
+    def flush(self):
+        """Espera a escrituras pendientes (no-op en backends síncronos)."""
+
+    def close(self):
+        self.flush()
+
+    # ==========================================
+    # VALIDACIÓN COMPARTIDA
+    # ==========================================
+
+    def _validate_metadatas(self, metadatas: List[Dict[str, Any]]):
+        # Un único barrido por tipo de valor en lugar de isinstance por campo
+        types = {type(v) for m in metadatas for v in m.values()}
+        invalid = [t for t in types if not issubclass(t, ALLOWED_METADATA_TYPES)]
+        if not invalid:
+            return
+
+        for i, m in enumerate(metadatas):
+            for k, v in m.items():
+                if type(v) in invalid:
+                    self.logger.error(f"❌ INVALID METADATA at index {i} | Key: {k} | Type: {type(v)}")
+                    raise ValueError(f"ChromaDB only supports str, int, float, bool. Got {type(v)} for key '{k}'")
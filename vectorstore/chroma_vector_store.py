@@ -1,11 +1,24 @@
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+import os
 import uuid
+import queue
+import sqlite3
 import logging
+import threading
 
+import numpy as np
 
-class ChromaVectorStore:
+from vectorstore.base_vector_store import BaseVectorStore, DEFAULT_INCLUDE
+
+
+# Espacios de distancia de Chroma y parámetros HNSW configurables
+HNSW_SPACES = ("l2", "cosine", "ip")
+HNSW_PARAMS = ("ef_construction", "max_neighbors", "ef_search")
+
+
+class ChromaVectorStore(BaseVectorStore):
     """
     Vector Store académico basado en ChromaDB.
     Diseñado para investigación estructurada + metadata rica.
@@ -14,10 +27,37 @@ class ChromaVectorStore:
     def __init__(
         self,
         collection_name: str = "academic_research",
-        persist_directory: str = "./chroma_db"
+        persist_directory: str = "./chroma_db",
+        embedding_dim: Optional[int] = None,
+        max_batch_bytes: int = 32 * 1024 * 1024,
+        background_writes: bool = False,
+        space: Optional[str] = None,
+        hnsw_params: Optional[Dict[str, int]] = None
     ):
+        """
+        space: l2 | cosine | ip (None = el de la colección, l2 si es nueva).
+        hnsw_params: ef_construction, max_neighbors (M) y ef_search. Los dos
+        primeros solo se aplican al crear la colección; ef_search se puede
+        cambiar sobre una colección existente (Chroma lo aplica al volver a
+        cargar el índice, p. ej. en el siguiente arranque del proceso).
+        """
+        if space is not None and space not in HNSW_SPACES:
+            raise ValueError(f"Unsupported space '{space}'. Use one of {HNSW_SPACES}")
+        unknown = set(hnsw_params or {}) - set(HNSW_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown HNSW parameters {sorted(unknown)}. Use {HNSW_PARAMS}")
+
         self.collection_name = collection_name
         self.persist_directory = persist_directory
+        # Presupuesto aproximado por upsert (textos + vectores + metadata)
+        self.max_batch_bytes = max_batch_bytes
+        # Escritura en un hilo aparte: el embedding de la siguiente página
+        # se solapa con el upsert de la actual
+        self.background_writes = background_writes
+
+        self._write_queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._write_error: Optional[BaseException] = None
 
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
@@ -29,9 +69,24 @@ class ChromaVectorStore:
             )
         )
 
+        # La configuración HNSW se persiste con la colección al crearla
+        hnsw = {k: v for k, v in (hnsw_params or {}).items() if v is not None}
+        if space is not None:
+            hnsw["space"] = space
         self.collection = self.client.get_or_create_collection(
-            name=self.collection_name
+            name=self.collection_name,
+            configuration={"hnsw": hnsw} if hnsw else None
         )
+        self.space, self.hnsw_params = self._resolve_index_config(space, hnsw)
+
+        # Dimensión registrada en la colección (Matryoshka: 768/512/256/128)
+        self.embedding_dim = self._resolve_embedding_dim(embedding_dim)
+
+        # Límite de registros por llamada que impone el servidor/SQLite de Chroma
+        try:
+            self.max_batch_size = int(self.client.get_max_batch_size())
+        except Exception:
+            self.max_batch_size = 5000
 
     # ==========================================
     # INSERT / UPDATE DOCUMENTS
@@ -46,31 +101,66 @@ class ChromaVectorStore:
     ):
         """
         Inserta o actualiza documentos con embeddings y metadata rica.
+        El upsert se pagina por max_batch_size de Chroma y por max_batch_bytes.
+        Con background_writes=True las páginas se escriben en un hilo aparte;
+        flush() espera a que terminen.
         """
 
         if not (len(texts) == len(embeddings) == len(metadatas)):
             raise ValueError("texts, embeddings y metadatas deben tener el mismo tamaño")
 
+        if not texts:
+            return
+
+        self._raise_write_error()
+
+        # Una sola conversión a matriz: valida dimensiones sin recorrer vector a vector
+        try:
+            matrix = np.asarray(embeddings, dtype=np.float32)
+        except ValueError:
+            raise ValueError("All embeddings must have the same dimension")
+        if matrix.ndim != 2:
+            raise ValueError("embeddings must be a 2D list (n, dim)")
+
+        # La primera inserción fija la dimensión de la colección
+        if self.embedding_dim is None:
+            self.embedding_dim = matrix.shape[1]
+            self._set_collection_metadata(embedding_dim=self.embedding_dim)
+
+        self._check_dimensions(matrix)
+
         # ✨ Si no se pasan IDs, generamos UUIDs. Si se pasan, los usamos.
         final_ids = ids if ids is not None else [str(uuid.uuid4()) for _ in texts]
 
         # Validación de tipos de metadata para evitar errores en Chroma
-        for i, m in enumerate(metadatas):
-            for k, v in m.items():
-                if not isinstance(v, (str, int, float, bool)) and v is not None:
-                    self.logger.error(f"❌ INVALID METADATA at index {i} | Key: {k} | Type: {type(v)}")
-                    raise ValueError(f"ChromaDB only supports str, int, float, bool. Got {type(v)} for key '{k}'")
+        self._validate_metadatas(metadatas)
 
         # ✨ Usamos UPSERT en lugar de ADD para permitir actualizaciones por ID
-        self.collection.upsert(
-            documents=texts,
-            embeddings=embeddings,
-            metadatas=metadatas,
-            ids=final_ids
-        )
+        for start, end in self._page_spans(texts, metadatas, matrix.shape[1]):
+            page = (final_ids[start:end], texts[start:end], matrix[start:end], metadatas[start:end])
+            if self.background_writes:
+                self._enqueue_write(self._upsert_page, *page)
+            else:
+                self._upsert_page(*page)
 
         self.logger.info(f"Successfully upserted {len(texts)} documents into '{self.collection_name}'")
 
+    def flush(self):
+        """
+        Espera a que el hilo de escritura vacíe la cola y propaga sus errores.
+        """
+        if self._write_queue is not None:
+            self._write_queue.join()
+        self._raise_write_error()
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._write_queue.put(None)
+            self._writer.join()
+            self._writer = None
+            self._write_queue = None
+
     # ==========================================
     # QUERY
     # ==========================================
@@ -79,21 +169,350 @@ class ChromaVectorStore:
         self,
         query_embedding: List[float],
         n_results: int = 10,
-        where_filter: Dict[str, Any] = None
+        where_filter: Dict[str, Any] = None,
+        include: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None
     ):
         """
         Query semántico con filtros estructurales opcionales.
+        `include` proyecta los campos a devolver; include=[] devuelve solo ids.
+        `ids` restringe la búsqueda a esos chunks.
         """
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
+        return self.query_many([query_embedding], n_results=n_results, where_filter=where_filter, include=include, ids=ids)
+
+    def query_many(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 10,
+        where_filter: Dict[str, Any] = None,
+        include: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None
+    ):
+        """
+        Varias consultas en un solo collection.query (un round trip para N consultas).
+        """
+        if len(query_embeddings) == 0:
+            return {"ids": [], "documents": [], "metadatas": [], "distances": []}
+
+        self._check_dimensions(query_embeddings)
+        self.flush()
+
+        fields = list(DEFAULT_INCLUDE if include is None else include)
+        if ids is not None:
+            # Chroma falla con IDs inexistentes: solo se pasan los que existen
+            ids = self.collection.get(ids=list(dict.fromkeys(ids)), include=[])["ids"] if ids else []
+            if not ids:
+                empty = {"ids": [[] for _ in query_embeddings]}
+                for key in ("documents", "metadatas", "distances", "embeddings"):
+                    empty[key] = [[] for _ in query_embeddings] if key in fields else None
+                return empty
+
+        return self.collection.query(
+            query_embeddings=list(query_embeddings),
+            ids=ids,
             n_results=n_results,
-            where=where_filter
+            where=where_filter,
+            include=fields
         )
-        return results
+
+    def get_documents(self, ids: List[str]) -> Dict[str, str]:
+        """
+        Textos por ID (los que no existan se omiten).
+        """
+        if not ids:
+            return {}
+
+        self.flush()
+        result = self.collection.get(ids=list(dict.fromkeys(ids)), include=["documents"])
+        return dict(zip(result["ids"], result["documents"]))
+
+    def get_metadatas(self, ids: List[str], where_filter: Dict[str, Any] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Metadata por ID; con where_filter solo se devuelven los que lo cumplen.
+        """
+        if not ids:
+            return {}
+
+        self.flush()
+        result = self.collection.get(ids=list(dict.fromkeys(ids)), where=where_filter, include=["metadatas"])
+        return {doc_id: metadata or {} for doc_id, metadata in zip(result["ids"], result["metadatas"])}
+
+    def get_embeddings(self, ids: List[str]) -> Dict[str, List[float]]:
+        """
+        Embeddings ya almacenados por ID (los que no existan se omiten).
+        """
+        if not ids:
+            return {}
+
+        self.flush()
+        result = self.collection.get(ids=list(dict.fromkeys(ids)), include=["embeddings"])
+        return {
+            doc_id: list(map(float, emb))
+            for doc_id, emb in zip(result["ids"], result["embeddings"])
+        }
 
     def count(self) -> int:
+        self.flush()
         return self.collection.count()
 
+    def iter_batches(self, batch_size: int = 2048) -> Iterator[Dict[str, Any]]:
+        """
+        Lectura completa paginada con limit/offset (exportación de snapshots).
+        """
+        self.flush()
+        offset = 0
+        while True:
+            page = self.collection.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=batch_size,
+                offset=offset
+            )
+            if not page["ids"]:
+                return
+
+            yield {
+                "ids": page["ids"],
+                "embeddings": np.asarray(page["embeddings"], dtype=np.float32),
+                "documents": page["documents"],
+                "metadatas": [m or {} for m in page["metadatas"]]
+            }
+            if len(page["ids"]) < batch_size:
+                return
+            offset += batch_size
+
+    # ==========================================
+    # DELETE / MAINTENANCE
+    # ==========================================
+
+    def get_ids(self, where_filter: Dict[str, Any] = None, page_size: int = 5000) -> List[str]:
+        """
+        IDs que cumplen el filtro (paginado con limit/offset, sin documentos ni vectores).
+        """
+        self.flush()
+        ids = []
+        offset = 0
+        while True:
+            page = self.collection.get(where=where_filter, include=[], limit=page_size, offset=offset)["ids"]
+            ids.extend(page)
+            if len(page) < page_size:
+                return ids
+            offset += page_size
+
+    def delete(self, ids: Optional[List[str]] = None, where_filter: Dict[str, Any] = None):
+        if ids is not None and len(ids) == 0:
+            return
+        if ids is None and not where_filter:
+            raise ValueError("delete requires ids or where_filter")
+
+        if self.background_writes:
+            # En la misma cola que los upserts: se respeta el orden de escritura
+            self._enqueue_write(self._delete_now, ids, where_filter)
+        else:
+            self._delete_now(ids, where_filter)
+
+    def doc_id_counts(self, page_size: int = 5000) -> Dict[str, int]:
+        """Número de chunks por doc_id (solo lee metadata)."""
+        self.flush()
+        counts = {}
+        offset = 0
+        while True:
+            page = self.collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            for metadata in page["metadatas"]:
+                doc_id = (metadata or {}).get("doc_id", "")
+                counts[doc_id] = counts.get(doc_id, 0) + 1
+            if len(page["ids"]) < page_size:
+                return counts
+            offset += page_size
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Compacta el persist_directory: VACUUM del SQLite de Chroma para
+        devolver al disco las páginas liberadas por los deletes.
+        """
+        self.flush()
+        before = self._directory_size()
+
+        sqlite_path = os.path.join(self.persist_directory, "chroma.sqlite3")
+        if os.path.exists(sqlite_path):
+            conn = sqlite3.connect(sqlite_path)
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                conn.execute("VACUUM")
+            finally:
+                conn.close()
+
+        return {"bytes_before": before, "bytes_after": self._directory_size()}
+
     def delete_collection(self):
         self.client.delete_collection(self.collection_name)
-        self.logger.info(f"Collection '{self.collection_name}' deleted")
\ No newline at end of file
+        self.logger.info(f"Collection '{self.collection_name}' deleted")
+
+    # ==========================================
+    # EMBEDDING DIMENSION
+    # ==========================================
+
+    def _resolve_embedding_dim(self, requested: Optional[int]) -> Optional[int]:
+        """
+        Compara la dimensión pedida con la registrada en la colección.
+        Colecciones antiguas sin registro se infieren a partir de un vector.
+        """
+        stored = (self.collection.metadata or {}).get("embedding_dim")
+
+        if stored is None and self.collection.count() > 0:
+            sample = self.collection.peek(limit=1)["embeddings"]
+            stored = len(sample[0])
+            self._set_collection_metadata(embedding_dim=stored)
+
+        if stored is not None and requested is not None and int(stored) != int(requested):
+            raise ValueError(
+                f"Collection '{self.collection_name}' stores {stored}-dim embeddings, "
+                f"got embedding_dim={requested}. Use another collection or re-index."
+            )
+
+        if stored is None and requested is not None:
+            self._set_collection_metadata(embedding_dim=requested)
+            stored = requested
+
+        return int(stored) if stored is not None else None
+
+    # ==========================================
+    # HNSW CONFIGURATION
+    # ==========================================
+
+    def _resolve_index_config(self, space: Optional[str], requested: Dict[str, int]):
+        """
+        Compara la configuración pedida con la persistida en la colección
+        (get_or_create no la cambia si la colección ya existía).
+        """
+        stored = dict((self.collection.configuration or {}).get("hnsw") or {})
+        stored_space = stored.get("space") or "l2"
+
+        if space is not None and space != stored_space:
+            raise ValueError(
+                f"Collection '{self.collection_name}' uses the '{stored_space}' space, "
+                f"got space={space}. Use another collection or re-index."
+            )
+
+        # ef_search es un parámetro de búsqueda: se actualiza en la colección existente
+        ef_search = requested.get("ef_search")
+        if ef_search is not None and stored.get("ef_search") != ef_search:
+            self.collection.modify(configuration={"hnsw": {"ef_search": ef_search}})
+            self.logger.info(
+                f"ef_search of '{self.collection_name}' set to {ef_search} "
+                f"(was {stored.get('ef_search')}); applies when the index is reloaded"
+            )
+            stored["ef_search"] = ef_search
+
+        for key in ("ef_construction", "max_neighbors"):
+            if requested.get(key) is not None and stored.get(key) != requested[key]:
+                self.logger.warning(
+                    f"Collection '{self.collection_name}' was built with {key}={stored.get(key)}; "
+                    f"{key}={requested[key]} only applies to new collections"
+                )
+
+        return stored_space, {key: stored.get(key) for key in HNSW_PARAMS}
+
+    def _set_collection_metadata(self, **fields):
+        # Chroma no permite re-enviar claves hnsw:* en modify (viven en la configuración)
+        metadata = {
+            k: v for k, v in (self.collection.metadata or {}).items()
+            if not k.startswith("hnsw:")
+        }
+        metadata.update(fields)
+        self.collection.modify(metadata=metadata)
+
+    def _check_dimensions(self, embeddings):
+        if self.embedding_dim is None:
+            return
+        if isinstance(embeddings, np.ndarray):
+            dims = {embeddings.shape[1]}
+        else:
+            dims = {len(emb) for emb in embeddings}
+        for dim in dims:
+            if dim != self.embedding_dim:
+                raise ValueError(
+                    f"Embedding dimension {dim} does not match collection "
+                    f"'{self.collection_name}' dimension {self.embedding_dim}"
+                )
+
+    # ==========================================
+    # PAGED / BACKGROUND WRITES
+    # ==========================================
+
+    def _page_spans(self, texts: List[str], metadatas: List[Dict[str, Any]], dim: int) -> List[Tuple[int, int]]:
+        """
+        Particiona en páginas que respetan max_batch_size y max_batch_bytes.
+        """
+        row_bytes = np.fromiter(
+            (
+                len(t) + dim * 4 + sum(len(k) + len(str(v)) for k, v in m.items())
+                for t, m in zip(texts, metadatas)
+            ),
+            dtype=np.int64,
+            count=len(texts)
+        )
+        cumulative = np.cumsum(row_bytes)
+
+        spans = []
+        start = 0
+        while start < len(texts):
+            offset = cumulative[start - 1] if start else 0
+            # Última fila que cabe en el presupuesto (al menos una por página)
+            end = int(np.searchsorted(cumulative, offset + self.max_batch_bytes, side="right"))
+            end = min(max(end, start + 1), start + self.max_batch_size, len(texts))
+            spans.append((start, end))
+            start = end
+        return spans
+
+    def _upsert_page(self, ids, texts, embeddings, metadatas):
+        self.collection.upsert(
+            documents=texts,
+            embeddings=embeddings,
+            metadatas=metadatas,
+            ids=ids
+        )
+
+    def _enqueue_write(self, operation, *args):
+        """
+        Encola una escritura (upsert o delete); el hilo las ejecuta en orden.
+        """
+        if self._writer is None:
+            # Cola acotada: como mucho dos páginas en memoria esperando escritura
+            self._write_queue = queue.Queue(maxsize=2)
+            self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+            self._writer.start()
+        self._write_queue.put((operation, args))
+
+    def _writer_loop(self):
+        while True:
+            item = self._write_queue.get()
+            try:
+                if item is None:
+                    return
+                if self._write_error is None:
+                    operation, args = item
+                    operation(*args)
+            except BaseException as e:
+                self.logger.error(f"❌ Background write failed: {e}")
+                self._write_error = e
+            finally:
+                self._write_queue.task_done()
+
+    def _delete_now(self, ids, where_filter):
+        if ids is not None:
+            # Mismo límite de registros por llamada que en los upserts
+            for start in range(0, len(ids), self.max_batch_size):
+                self.collection.delete(ids=ids[start:start + self.max_batch_size])
+        else:
+            self.collection.delete(where=where_filter)
+
+    def _directory_size(self) -> int:
+        total = 0
+        for root, _, files in os.walk(self.persist_directory):
+            total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+        return total
+
+    def _raise_write_error(self):
+        if self._write_error is not None:
+            error, self._write_error = self._write_error, None
+            raise error
\ No newline at end of file
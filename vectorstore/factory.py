@@ -0,0 +1,127 @@
+import os
+from typing import Dict, Any, Optional
+
+from embedding.factory import load_models_config
+from vectorstore.base_vector_store import BaseVectorStore
+
+
+VECTOR_BACKENDS = ("chroma", "numpy")
+
+
+def build_vector_store(
+    config: Optional[Dict[str, Any]] = None,
+    collection_name: str = "academic_research",
+    persist_directory: str = "./chroma_db",
+    embedding_dim: Optional[int] = None,
+    **kwargs
+) -> BaseVectorStore:
+    """
+    Construye el backend de vector store indicado en la configuración:
+
+        vector_backend: chroma | numpy
+        vector_metric: l2 | cosine | ip   (espacio HNSW en Chroma, métrica en numpy)
+        vector_hnsw: {ef_construction, max_neighbors, ef_search}   (solo chroma)
+        vector_shard_key: null | root_collection   (un shard por valor del campo)
+        vector_quantization: null | int8 | float16   (solo numpy: scan cuantizado + rescoring float32)
+        vector_rescore_factor: 4                     (candidatos re-puntuados = n_results * factor)
+
+    El backend numpy guarda sus ficheros en persist_directory/numpy_flat/.
+    `kwargs` se pasan al constructor de ChromaVectorStore (p. ej. background_writes).
+    """
+    if config is None:
+        config = load_models_config()
+
+    backend = config.get("vector_backend", "chroma")
+    if backend not in VECTOR_BACKENDS:
+        raise ValueError(f"Unknown vector_backend '{backend}'. Use one of {VECTOR_BACKENDS}")
+
+    shard_key = config.get("vector_shard_key")
+    if not shard_key:
+        return _build_backend(config, backend, collection_name, persist_directory, embedding_dim, **kwargs)
+
+    from vectorstore.sharded_vector_store import ShardedVectorStore
+
+    store = ShardedVectorStore(
+        shard_factory=lambda name: _build_backend(
+            config, backend, name, persist_directory, embedding_dim, **kwargs
+        ),
+        collection_name=collection_name,
+        registry_directory=persist_directory,
+        shard_key=shard_key,
+        embedding_dim=embedding_dim,
+        space=config.get("vector_metric", "l2"),
+        max_workers=int(config.get("vector_shard_workers", 4))
+    )
+    store.storage_directory = persist_directory
+    store.build_config = config
+    return store
+
+
+def build_companion_store(vector_store: BaseVectorStore, collection_name: str) -> BaseVectorStore:
+    """
+    Otra colección con el mismo backend, directorio y dimensión que
+    `vector_store` (p. ej. <colección>__sections). Solo para stores creados
+    con build_vector_store: de uno creado a mano no se conoce la configuración.
+    """
+    if vector_store.build_config is None or vector_store.storage_directory is None:
+        raise ValueError(
+            f"Cannot derive a companion of '{vector_store.collection_name}': "
+            "it was not created with build_vector_store; pass the store explicitly"
+        )
+    return build_vector_store(
+        vector_store.build_config,
+        collection_name=collection_name,
+        persist_directory=vector_store.storage_directory,
+        embedding_dim=vector_store.embedding_dim
+    )
+
+
+def storage_path(path: Optional[str], persist_directory: Optional[str]) -> Optional[str]:
+    """
+    Ruta de un fichero auxiliar de la colección (caché de embeddings,
+    manifiesto, índice BM25, versiones de la caché de búsquedas):
+    "{persist_directory}" se sustituye por el directorio del vector store.
+    None desactiva el fichero; sin directorio no se puede resolver y también
+    queda desactivado.
+    """
+    if path is None or "{persist_directory}" not in path:
+        return path
+    if not persist_directory:
+        return None
+    return path.replace("{persist_directory}", persist_directory)
+
+
+def _build_backend(
+    config: Dict[str, Any],
+    backend: str,
+    collection_name: str,
+    persist_directory: str,
+    embedding_dim: Optional[int],
+    **kwargs
+) -> BaseVectorStore:
+    if backend == "chroma":
+        # Import diferido: el backend numpy no necesita chromadb instalado
+        from vectorstore.chroma_vector_store import ChromaVectorStore
+
+        store = ChromaVectorStore(
+            collection_name=collection_name,
+            persist_directory=persist_directory,
+            embedding_dim=embedding_dim,
+            space=config.get("vector_metric"),
+            hnsw_params=config.get("vector_hnsw"),
+            **kwargs
+        )
+    else:
+        from vectorstore.numpy_vector_store import NumpyFlatVectorStore
+
+        store = NumpyFlatVectorStore(
+            collection_name=collection_name,
+            persist_directory=os.path.join(persist_directory, "numpy_flat"),
+            embedding_dim=embedding_dim,
+            metric=config.get("vector_metric", "l2"),
+            quantization=config.get("vector_quantization"),
+            rescore_factor=int(config.get("vector_rescore_factor", 4))
+        )
+    store.storage_directory = persist_directory
+    store.build_config = config
+    return store
@@ -0,0 +1,128 @@
+import os
+import json
+from typing import Dict, Optional, Set, Any
+
+from vectorstore.base_vector_store import BaseVectorStore
+from ingestion.ingestion_manifest import IngestionManifest
+from retrieval.bm25_index import BM25Index
+from retrieval.result_cache import CollectionVersions
+from retrieval.section_index import SectionIndex
+
+
+def live_doc_ids(folder_path: str) -> Set[str]:
+    """
+    doc_ids (zotero_key) de los papers presentes en la biblioteca local:
+    folder_path/metadata/<nombre>.json con su folder_path/pdfs/<nombre>.pdf.
+    """
+    metadata_dir = os.path.join(folder_path, "metadata")
+    pdf_dir = os.path.join(folder_path, "pdfs")
+    doc_ids = set()
+
+    for name in os.listdir(metadata_dir):
+        if not name.endswith(".json"):
+            continue
+        base_name = os.path.splitext(name)[0]
+        if not os.path.exists(os.path.join(pdf_dir, f"{base_name}.pdf")):
+            continue
+        with open(os.path.join(metadata_dir, name), "r", encoding="utf-8") as f:
+            doc_id = json.load(f).get("zotero_key", "")
+        if doc_id:
+            doc_ids.add(doc_id)
+
+    return doc_ids
+
+
+def vacuum_index(
+    vector_store: BaseVectorStore,
+    manifest: Optional[IngestionManifest] = None,
+    live_ids: Optional[Set[str]] = None,
+    dry_run: bool = False,
+    lexical_index: Optional[BM25Index] = None,
+    collection_versions: Optional[CollectionVersions] = None,
+    section_index: Optional[SectionIndex] = None
+) -> Dict[str, Any]:
+    """
+    Elimina chunks huérfanos y compacta el almacenamiento.
+
+    Huérfanos:
+    - chunks de papers que ya no están en la biblioteca (`live_ids`), o que
+      nunca completaron su ingesta (no figuran en el manifiesto);
+    - papers cuyo número de chunks no coincide con el del manifiesto (restos
+      de ingestas anteriores): se borran y se quitan del manifiesto para que
+      la próxima ingesta los re-procese.
+    Los chunks sin doc_id no se tocan. Con `lexical_index` los mismos papers
+    se eliminan también del índice BM25; con `section_index`, del índice de
+    secciones (junto con las secciones de papers que ya no tienen chunks);
+    con `collection_versions` se sube la versión de la colección si se borró
+    algo (invalida búsquedas cacheadas).
+    """
+    collection = vector_store.collection_name
+    stored = vector_store.doc_id_counts()
+    stored.pop("", None)
+
+    recorded = {}
+    if manifest is not None:
+        for doc_id in manifest.doc_ids(collection):
+            entry = manifest.get(collection, doc_id)
+            recorded[doc_id] = entry["chunk_count"]
+
+    if live_ids is None:
+        live_ids = set(recorded) if manifest is not None else set(stored)
+
+    removed_docs = sorted(d for d in stored if d not in live_ids or (manifest is not None and d not in recorded))
+    mismatched_docs = sorted(
+        d for d in stored
+        if d not in removed_docs and d in recorded and stored[d] != recorded[d]
+    )
+    # Papers borrados de la biblioteca que solo quedan en el manifiesto
+    forgotten_docs = sorted(d for d in recorded if d not in live_ids)
+
+    # Secciones de papers borrados o sin chunks en la colección
+    orphan_sections = {}
+    if section_index is not None:
+        sections = section_index.vector_store.doc_id_counts()
+        sections.pop("", None)
+        gone = set(removed_docs) | set(mismatched_docs) | set(forgotten_docs)
+        orphan_sections = {d: n for d, n in sections.items() if d in gone or d not in stored}
+
+    report = {
+        "orphan_docs": len(removed_docs),
+        "orphan_chunks": sum(stored[d] for d in removed_docs),
+        "mismatched_docs": len(mismatched_docs),
+        "mismatched_chunks": sum(stored[d] for d in mismatched_docs),
+        "manifest_rows_removed": len(set(forgotten_docs) | set(mismatched_docs)),
+        "orphan_sections": sum(orphan_sections.values()),
+        "dry_run": dry_run
+    }
+    if dry_run:
+        return report
+
+    to_delete = removed_docs + mismatched_docs
+    # Por tandas para no construir filtros $in gigantes
+    for start in range(0, len(to_delete), 500):
+        vector_store.delete(where_filter={"doc_id": {"$in": to_delete[start:start + 500]}})
+    vector_store.flush()
+
+    section_docs = sorted(orphan_sections)
+    for start in range(0, len(section_docs), 500):
+        section_index.vector_store.delete(where_filter={"doc_id": {"$in": section_docs[start:start + 500]}})
+    if section_index is not None:
+        section_index.flush()
+
+    if (to_delete or section_docs) and collection_versions is not None:
+        collection_versions.bump(collection)
+
+    if manifest is not None:
+        for doc_id in set(forgotten_docs) | set(mismatched_docs):
+            manifest.remove(collection, doc_id)
+
+    if lexical_index is not None:
+        for doc_id in set(to_delete) | set(forgotten_docs):
+            lexical_index.remove_document(doc_id)
+        lexical_index.compact()
+        lexical_index.save()
+
+    report.update(vector_store.compact())
+    if section_docs:
+        section_index.vector_store.compact()
+    return report
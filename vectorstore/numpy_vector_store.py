@@ -0,0 +1,781 @@
+import os
+import json
+import uuid
+import shutil
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Iterator, Iterable
+
+import numpy as np
+
+from vectorstore.base_vector_store import BaseVectorStore, DEFAULT_INCLUDE
+from vectorstore.quantization import QuantizedIndex, top_k_smallest
+
+
+SUPPORTED_METRICS = ("cosine", "l2", "ip")
+QUANTIZATION_DTYPES = ("int8", "float16")
+
+
+class NumpyFlatVectorStore(BaseVectorStore):
+    """
+    Vector store de búsqueda exacta (fuerza bruta) sobre una matriz float32
+    contigua. Con bibliotecas de decenas de miles de chunks un producto
+    matriz-vector + argpartition es más rápido que HNSW y sin pérdida de recall.
+
+    Disco (persist_directory/collection_name/):
+    - vectors[.<id>].npy -> matriz (capacidad, dim) abierta como memmap
+    - columns.json       -> snapshot de ids, documentos y metadata por columnas
+    - columns.<gen>.log  -> upserts/deletes posteriores al snapshot (JSON lines)
+    - upsert.<id>.npy    -> vectores de un upsert que sobrescribe filas (hasta aplicarlo)
+
+    Cada escritura solo añade una línea al log (coste proporcional al lote,
+    no a la colección); cuando el log supera al snapshot se compacta en un
+    snapshot nuevo con la generación siguiente (amortizado O(1) por chunk).
+
+    La línea del log (con fsync) es el punto de commit y la matriz nunca se
+    modifica antes de que el log la describa: las filas nuevas van al final
+    (fuera de las filas en uso), las sobrescrituras se copian antes a un
+    upsert.<id>.npy que el replay vuelve a aplicar, y un delete escribe la
+    matriz compactada en un vectors.<id>.npy nuevo que el log referencia.
+
+    Distancias con la convención de Chroma:
+    cosine -> 1 - cos; l2 -> L2 al cuadrado; ip -> 1 - dot.
+    Por defecto l2, igual que una colección de Chroma sin hnsw:space, para que
+    el score semántico de HybridRetriever no cambie entre backends.
+
+    Con quantization="int8" (o "float16") el scan se hace sobre una copia
+    cuantizada en RAM (QuantizedIndex, 4x / 2x menos memoria) y los
+    n_results * rescore_factor mejores candidatos se re-puntúan en float32
+    leyendo solo esas filas del memmap. La copia cuantizada no se
+    persiste: se reconstruye desde el memmap al abrir la colección.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    COMPACTED_VECTORS_FILE = "vectors.{id}.npy"
+    UPSERT_VECTORS_FILE = "upsert.{id}.npy"
+    COLUMNS_FILE = "columns.json"
+    LOG_FILE = "columns.{generation}.log"
+    # El log se compacta cuando supera al snapshot (y al menos este tamaño)
+    MIN_COMPACT_BYTES = 1 << 20
+
+    def __init__(
+        self,
+        collection_name: str = "academic_research",
+        persist_directory: str = "./numpy_db",
+        embedding_dim: Optional[int] = None,
+        metric: str = "l2",
+        initial_capacity: int = 1024,
+        quantization: Optional[str] = None,
+        rescore_factor: int = 4
+    ):
+        if metric not in SUPPORTED_METRICS:
+            raise ValueError(f"Unsupported metric '{metric}'. Use one of {SUPPORTED_METRICS}")
+        if quantization is not None and quantization not in QUANTIZATION_DTYPES:
+            raise ValueError(f"Unsupported quantization '{quantization}'. Use one of {QUANTIZATION_DTYPES}")
+
+        self.collection_name = collection_name
+        self.persist_directory = persist_directory
+        self.path = os.path.join(persist_directory, collection_name)
+        self.metric = metric
+        # Mismo nombre que en ChromaVectorStore (HybridRetriever convierte distancia -> score según el espacio)
+        self.space = metric
+        self.initial_capacity = initial_capacity
+        self.quantization = quantization
+
+        logging.basicConfig(level=logging.INFO)
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.RLock()
+        self._vectors: Optional[np.memmap] = None
+        self._norms = np.empty(0, dtype=np.float32)
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._columns: Dict[str, List[Any]] = {}
+        self._row_of: Dict[str, int] = {}
+        # Vistas numpy de las columnas para filtros (se invalidan al escribir)
+        self._object_cache: Dict[str, np.ndarray] = {}
+        self._numeric_cache: Dict[str, np.ndarray] = {}
+        # Persistencia de columnas: snapshot + log de la generación actual
+        self._vectors_file = self.VECTORS_FILE
+        self._generation = 0
+        self._snapshot_bytes = 0
+        self._log_bytes = 0
+        # Scan cuantizado + rescoring sobre el memmap float32 (opcional)
+        self._quantized = QuantizedIndex(
+            dtype=quantization,
+            metric=metric,
+            rescore_factor=rescore_factor,
+            full_precision_loader=self._read_vectors
+        ) if quantization else None
+
+        self.embedding_dim = None
+        self._load()
+
+        if self.embedding_dim is not None and embedding_dim is not None and self.embedding_dim != int(embedding_dim):
+            raise ValueError(
+                f"Collection '{self.collection_name}' stores {self.embedding_dim}-dim embeddings, "
+                f"got embedding_dim={embedding_dim}. Use another collection or re-index."
+            )
+        if self.embedding_dim is None and embedding_dim is not None:
+            self.embedding_dim = int(embedding_dim)
+
+    # ==========================================
+    # INSERT / UPDATE DOCUMENTS
+    # ==========================================
+
+    def add_documents(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+        ids: Optional[List[str]] = None
+    ):
+        """
+        Upsert por ID: los IDs existentes se sobrescriben en su fila,
+        los nuevos se añaden al final de la matriz.
+        """
+        if not (len(texts) == len(embeddings) == len(metadatas)):
+            raise ValueError("texts, embeddings y metadatas deben tener el mismo tamaño")
+
+        if not texts:
+            return
+
+        try:
+            matrix = np.asarray(embeddings, dtype=np.float32)
+        except ValueError:
+            raise ValueError("All embeddings must have the same dimension")
+        if matrix.ndim != 2:
+            raise ValueError("embeddings must be a 2D list (n, dim)")
+
+        if self.embedding_dim is None:
+            self.embedding_dim = matrix.shape[1]
+        self._check_dimension(matrix.shape[1])
+
+        self._validate_metadatas(metadatas)
+
+        # Mismo comportamiento que ChromaVectorStore: sin IDs generamos UUIDs
+        if ids is None:
+            ids = [str(uuid.uuid4()) for _ in texts]
+
+        with self._lock:
+            used = len(self._ids)
+            rows = self._apply_upsert(ids, texts, metadatas)
+
+            self._ensure_capacity(len(self._ids))
+            row_index = np.asarray(rows, dtype=np.int64)
+            entry = {"op": "upsert", "ids": list(ids), "documents": list(texts), "metadatas": list(metadatas)}
+
+            if (row_index < used).any():
+                # Sobrescribe filas en uso: los vectores van antes a un fichero aparte
+                # que el replay re-aplica si el proceso cae tras el commit
+                entry["vectors_file"] = self.UPSERT_VECTORS_FILE.format(id=uuid.uuid4().hex)
+                self._write_durable(entry["vectors_file"], matrix)
+                self._persist(entry)
+                self._vectors[row_index] = matrix
+                self._vectors.flush()
+                os.remove(os.path.join(self.path, entry["vectors_file"]))
+            else:
+                # Solo filas nuevas (fuera de las filas en uso): se escriben antes del commit
+                self._vectors[row_index] = matrix
+                self._vectors.flush()
+                self._persist(entry)
+
+            if len(self._norms) < len(self._ids):
+                self._norms = np.concatenate(
+                    [self._norms, np.zeros(len(self._ids) - len(self._norms), dtype=np.float32)]
+                )
+            self._norms[row_index] = np.linalg.norm(matrix, axis=1)
+            if self._quantized is not None:
+                self._quantized.update(row_index, matrix)
+            self._maybe_snapshot()
+
+        self.logger.info(f"Successfully upserted {len(texts)} documents into '{self.collection_name}'")
+
+    # ==========================================
+    # QUERY
+    # ==========================================
+
+    def query(
+        self,
+        query_embedding: List[float],
+        n_results: int = 10,
+        where_filter: Dict[str, Any] = None,
+        include: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None
+    ):
+        """
+        Búsqueda exacta top-k con filtro opcional sobre la metadata.
+        Devuelve el mismo formato que collection.query de Chroma.
+        """
+        return self.query_many([query_embedding], n_results=n_results, where_filter=where_filter, include=include, ids=ids)
+
+    def query_many(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 10,
+        where_filter: Dict[str, Any] = None,
+        include: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None
+    ):
+        """
+        Varias consultas con un único producto matriz-matriz (m, dim) x (dim, n)
+        y un top-k por fila. Los campos fuera de `include` valen None.
+        """
+        if len(query_embeddings) == 0:
+            return {"ids": [], "documents": [], "metadatas": [], "distances": []}
+
+        merged = {"ids": [], "documents": None, "metadatas": None, "distances": None, "embeddings": None}
+        for key in (DEFAULT_INCLUDE if include is None else include):
+            merged[key] = []
+
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        self._check_dimension(queries.shape[1])
+
+        with self._lock:
+            rows = None
+            if ids is not None and self._ids:
+                rows = np.unique(np.fromiter(
+                    (self._row_of[i] for i in ids if i in self._row_of), dtype=np.int64
+                ))
+            if where_filter and self._ids and (rows is None or len(rows)):
+                mask = self._where_mask(where_filter)
+                rows = np.flatnonzero(mask) if rows is None else rows[mask[rows]]
+
+            if not self._ids or (rows is not None and len(rows) == 0):
+                for _ in range(len(queries)):
+                    self._merge_results(merged, [])
+                return merged
+
+            if self._quantized is not None:
+                for selected, row_distances in self._quantized.search_many(queries, n_results, rows):
+                    self._merge_results(merged, list(zip(selected.tolist(), row_distances.tolist())))
+                return merged
+
+            distances = self._distances(queries, rows)
+            for row_distances in distances:
+                best = top_k_smallest(row_distances, n_results)
+                selected = best if rows is None else rows[best]
+                self._merge_results(merged, list(zip(selected.tolist(), row_distances[best].tolist())))
+
+        return merged
+
+    def get_documents(self, ids: List[str]) -> Dict[str, str]:
+        with self._lock:
+            return {
+                doc_id: self._documents[self._row_of[doc_id]]
+                for doc_id in dict.fromkeys(ids) if doc_id in self._row_of
+            }
+
+    def get_metadatas(self, ids: List[str], where_filter: Dict[str, Any] = None) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            found = [(doc_id, self._row_of[doc_id]) for doc_id in dict.fromkeys(ids) if doc_id in self._row_of]
+            if where_filter and found:
+                mask = self._where_mask(where_filter)
+                found = [(doc_id, row) for doc_id, row in found if mask[row]]
+            return {doc_id: self._row_metadata(row) for doc_id, row in found}
+
+    def get_embeddings(self, ids: List[str]) -> Dict[str, List[float]]:
+        with self._lock:
+            found = [(doc_id, self._row_of[doc_id]) for doc_id in dict.fromkeys(ids) if doc_id in self._row_of]
+            if not found:
+                return {}
+            rows = np.asarray([row for _, row in found], dtype=np.int64)
+            vectors = np.asarray(self._vectors[rows])
+            return {doc_id: vec.tolist() for (doc_id, _), vec in zip(found, vectors)}
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def iter_batches(self, batch_size: int = 2048) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            total = len(self._ids)
+        for start in range(0, total, batch_size):
+            # Copia bajo el lock; el consumidor procesa el lote fuera de él
+            with self._lock:
+                end = min(start + batch_size, len(self._ids))
+                if start >= end:
+                    return
+                batch = {
+                    "ids": self._ids[start:end],
+                    "embeddings": np.array(self._vectors[start:end]),
+                    "documents": self._documents[start:end],
+                    "metadatas": [self._row_metadata(r) for r in range(start, end)]
+                }
+            yield batch
+
+    # ==========================================
+    # DELETE / MAINTENANCE
+    # ==========================================
+
+    def get_ids(self, where_filter: Dict[str, Any] = None) -> List[str]:
+        with self._lock:
+            if not where_filter:
+                return list(self._ids)
+            return [self._ids[r] for r in np.flatnonzero(self._where_mask(where_filter))]
+
+    def delete(self, ids: Optional[List[str]] = None, where_filter: Dict[str, Any] = None):
+        """
+        Borra filas: las filas vivas se copian (compactadas) a un fichero de
+        vectores nuevo, que pasa a ser el actual al confirmar el log.
+        """
+        if ids is not None and len(ids) == 0:
+            return
+        if ids is None and not where_filter:
+            raise ValueError("delete requires ids or where_filter")
+
+        with self._lock:
+            if ids is not None:
+                rows = [self._row_of[i] for i in ids if i in self._row_of]
+                remove = np.zeros(len(self._ids), dtype=bool)
+                remove[rows] = True
+            else:
+                remove = self._where_mask(where_filter)
+
+            if not remove.any():
+                return
+
+            removed = [self._ids[r] for r in np.flatnonzero(remove)]
+            keep = np.flatnonzero(~remove)
+
+            # La matriz actual no se toca hasta que el log confirma el delete
+            vectors_file = self.COMPACTED_VECTORS_FILE.format(id=uuid.uuid4().hex)
+            compacted = np.lib.format.open_memmap(
+                os.path.join(self.path, vectors_file), mode="w+",
+                dtype=np.float32, shape=self._vectors.shape
+            )
+            for start in range(0, len(keep), 8192):
+                block = keep[start:start + 8192]
+                compacted[start:start + len(block)] = self._vectors[block]
+            compacted.flush()
+            del compacted
+
+            self._persist({"op": "delete", "ids": removed, "vectors_file": vectors_file})
+            self._open_vectors(vectors_file)
+
+            self._norms = self._norms[keep]
+            if self._quantized is not None:
+                self._quantized.keep(keep)
+            self._apply_delete(keep)
+            self._maybe_snapshot()
+
+        self.logger.info(f"Deleted {int(remove.sum())} documents from '{self.collection_name}'")
+
+    def doc_id_counts(self) -> Dict[str, int]:
+        counts = {}
+        with self._lock:
+            for doc_id in self._columns.get("doc_id", [None] * len(self._ids)):
+                key = doc_id or ""
+                counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Recorta la matriz de vectores a las filas en uso (los deletes no lo encogen)
+        y vuelca el log de columnas en un snapshot nuevo.
+        """
+        with self._lock:
+            vectors_path = os.path.join(self.path, self._vectors_file)
+            before = os.path.getsize(vectors_path) if os.path.exists(vectors_path) else 0
+            if not self._ids:
+                self._vectors = None
+                if os.path.exists(vectors_path):
+                    os.remove(vectors_path)
+            elif self._vectors is not None and self._vectors.shape[0] > len(self._ids):
+                self._resize(len(self._ids), used=len(self._ids))
+            after = os.path.getsize(vectors_path) if os.path.exists(vectors_path) else 0
+            if self._log_bytes:
+                self._save_snapshot()
+        return {"bytes_before": before, "bytes_after": after}
+
+    def delete_collection(self):
+        with self._lock:
+            self._vectors = None
+            shutil.rmtree(self.path, ignore_errors=True)
+            self._ids, self._documents, self._columns, self._row_of = [], [], {}, {}
+            self._vectors_file = self.VECTORS_FILE
+            self._generation = self._snapshot_bytes = self._log_bytes = 0
+            self._norms = np.empty(0, dtype=np.float32)
+            if self._quantized is not None:
+                self._quantized.clear()
+            self._object_cache.clear()
+            self._numeric_cache.clear()
+            self.embedding_dim = None
+        self.logger.info(f"Collection '{self.collection_name}' deleted")
+
+    # ==========================================
+    # DISTANCES
+    # ==========================================
+
+    def _distances(self, queries: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Distancias (n_queries, n_filas) de cada consulta a cada vector.
+        """
+        n = len(self._ids)
+        if rows is None:
+            vectors, norms = self._vectors[:n], self._norms[:n]
+        else:
+            vectors, norms = self._vectors[rows], self._norms[rows]
+
+        dots = np.asarray(queries @ vectors.T, dtype=np.float32)
+
+        if self.metric == "cosine":
+            query_norms = np.linalg.norm(queries, axis=1)
+            query_norms[query_norms == 0] = 1.0
+            denom = query_norms[:, None] * norms[None, :]
+            denom = np.where(denom == 0, 1.0, denom)
+            return 1.0 - dots / denom
+        if self.metric == "l2":
+            return norms[None, :] ** 2 + (queries * queries).sum(axis=1)[:, None] - 2.0 * dots
+        return 1.0 - dots
+
+    # ==========================================
+    # WHERE FILTER ($eq $ne $gt $gte $lt $lte $in $nin $and $or)
+    # ==========================================
+
+    def _where_mask(self, where: Dict[str, Any]) -> np.ndarray:
+        n = len(self._ids)
+        mask = np.ones(n, dtype=bool)
+
+        for key, condition in where.items():
+            if key == "$and":
+                for sub in condition:
+                    mask &= self._where_mask(sub)
+            elif key == "$or":
+                any_mask = np.zeros(n, dtype=bool)
+                for sub in condition:
+                    any_mask |= self._where_mask(sub)
+                mask &= any_mask
+            elif isinstance(condition, dict):
+                for op, value in condition.items():
+                    mask &= self._compare(key, op, value)
+            else:
+                mask &= self._compare(key, "$eq", condition)
+
+        return mask
+
+    def _compare(self, field: str, op: str, value: Any) -> np.ndarray:
+        if op in ("$gt", "$gte", "$lt", "$lte"):
+            column = self._numeric_column(field)
+            with np.errstate(invalid="ignore"):
+                if op == "$gt":
+                    return column > value
+                if op == "$gte":
+                    return column >= value
+                if op == "$lt":
+                    return column < value
+                return column <= value
+
+        column = self._object_column(field)
+        if op == "$eq":
+            return np.fromiter((v == value and v is not None for v in column), dtype=bool, count=len(column))
+        if op == "$ne":
+            return np.fromiter((v != value for v in column), dtype=bool, count=len(column))
+        if op in ("$in", "$nin"):
+            values = set(value)
+            hits = np.fromiter((v in values for v in column), dtype=bool, count=len(column))
+            return hits if op == "$in" else ~hits
+
+        raise ValueError(f"Unsupported where operator '{op}'")
+
+    def _object_column(self, field: str) -> np.ndarray:
+        column = self._object_cache.get(field)
+        if column is None:
+            values = self._columns.get(field, [None] * len(self._ids))
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            self._object_cache[field] = column
+        return column
+
+    def _numeric_column(self, field: str) -> np.ndarray:
+        column = self._numeric_cache.get(field)
+        if column is None:
+            values = self._columns.get(field, [None] * len(self._ids))
+            column = np.fromiter(
+                (
+                    float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan
+                    for v in values
+                ),
+                dtype=np.float64,
+                count=len(values)
+            )
+            self._numeric_cache[field] = column
+        return column
+
+    # ==========================================
+    # PERSISTENCE
+    # ==========================================
+
+    def _load(self):
+        columns_path = os.path.join(self.path, self.COLUMNS_FILE)
+        if os.path.exists(columns_path):
+            with open(columns_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            self._ids = data["ids"]
+            self._documents = data["documents"]
+            self._columns = data["metadata"]
+            self._row_of = {doc_id: row for row, doc_id in enumerate(self._ids)}
+            self.embedding_dim = data.get("embedding_dim")
+            self._generation = data.get("generation", 0)
+            self._vectors_file = data.get("vectors_file", self.VECTORS_FILE)
+            self._snapshot_bytes = os.path.getsize(columns_path)
+
+            stored_metric = data.get("metric", "l2")
+            if stored_metric != self.metric:
+                raise ValueError(
+                    f"Collection '{self.collection_name}' uses the '{stored_metric}' metric, "
+                    f"got metric={self.metric}. Use another collection or re-index."
+                )
+
+        # Sin snapshot puede quedar el log de la generación 0 (caída antes del primero)
+        pending = self._replay_log()
+
+        if os.path.exists(os.path.join(self.path, self._vectors_file)):
+            self._open_vectors(self._vectors_file)
+            # Sobrescrituras confirmadas en el log que quizá no llegaron a la matriz
+            for rows, vectors_file in pending:
+                vectors_path = os.path.join(self.path, vectors_file)
+                if os.path.exists(vectors_path):
+                    self._vectors[rows] = np.load(vectors_path)
+                    self._vectors.flush()
+            if self.embedding_dim is None:
+                self.embedding_dim = int(self._vectors.shape[1])
+            self._norms = np.linalg.norm(self._vectors[:len(self._ids)], axis=1).astype(np.float32)
+            if self._quantized is not None:
+                # Por bloques: nunca se tiene la matriz float32 entera en RAM
+                for start in range(0, len(self._ids), 8192):
+                    end = min(start + 8192, len(self._ids))
+                    self._quantized.update(np.arange(start, end), self._vectors[start:end])
+
+        self._remove_unreferenced_files(keep=[vectors_file for _, vectors_file in pending])
+
+    def _replay_log(self) -> List[tuple]:
+        """
+        Re-aplica las operaciones del log de la generación del snapshot.
+        Una última línea incompleta (corte a mitad de escritura) se descarta.
+        Devuelve (filas, fichero) de las sobrescrituras posteriores al último
+        cambio de fichero de vectores, para re-aplicarlas sobre la matriz.
+        """
+        log_path = self._log_path()
+        if not os.path.exists(log_path):
+            return []
+
+        pending = []
+        valid = 0
+        with open(log_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if entry["op"] == "upsert":
+                    rows = self._apply_upsert(entry["ids"], entry["documents"], entry["metadatas"])
+                    if "vectors_file" in entry:
+                        pending.append((np.asarray(rows, dtype=np.int64), entry["vectors_file"]))
+                else:
+                    remove = set(entry["ids"])
+                    self._apply_delete(np.asarray(
+                        [r for r, doc_id in enumerate(self._ids) if doc_id not in remove], dtype=np.int64
+                    ))
+                    # La matriz compactada ya incluye todo lo anterior
+                    self._vectors_file = entry["vectors_file"]
+                    pending = []
+                valid += len(line)
+
+        if valid < os.path.getsize(log_path):
+            with open(log_path, "r+b") as f:
+                f.truncate(valid)
+        self._log_bytes = valid
+        return pending
+
+    def _apply_upsert(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]) -> List[int]:
+        """Columnas de un upsert; devuelve la fila de cada ID (la escritura y el replay comparten esto)."""
+        # IDs repetidos dentro del lote: gana la última aparición (como en Chroma)
+        rows = []
+        for doc_id in ids:
+            row = self._row_of.get(doc_id)
+            if row is None:
+                row = len(self._ids)
+                self._row_of[doc_id] = row
+                self._ids.append(doc_id)
+                self._documents.append("")
+                for column in self._columns.values():
+                    column.append(None)
+            rows.append(row)
+
+        for row, text, metadata in zip(rows, texts, metadatas):
+            self._documents[row] = text
+            for column in self._columns.values():
+                column[row] = None
+            for key, value in metadata.items():
+                column = self._columns.get(key)
+                if column is None:
+                    column = self._columns[key] = [None] * len(self._ids)
+                column[row] = value
+
+        self._object_cache.clear()
+        self._numeric_cache.clear()
+        return rows
+
+    def _apply_delete(self, keep: np.ndarray):
+        """Compacta las columnas a las filas `keep` (mismo orden que la matriz)."""
+        keep_list = keep.tolist()
+        self._ids = [self._ids[r] for r in keep_list]
+        self._documents = [self._documents[r] for r in keep_list]
+        self._columns = {k: [col[r] for r in keep_list] for k, col in self._columns.items()}
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self._ids)}
+
+        self._object_cache.clear()
+        self._numeric_cache.clear()
+
+    def _persist(self, entry: Dict[str, Any]):
+        """
+        Añade la operación al log y la hace durable (fsync): es el punto de
+        commit de la escritura. Debe llamarse con el lock tomado.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self._log_path(), "ab") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_bytes += len(line)
+
+    def _maybe_snapshot(self):
+        """Compacta el log si aún no hay snapshot o ya pesa más que él."""
+        if not self._snapshot_bytes or self._log_bytes > max(self.MIN_COMPACT_BYTES, self._snapshot_bytes):
+            self._save_snapshot()
+
+    def _save_snapshot(self):
+        """
+        Snapshot completo con la generación siguiente y log vacío. El
+        os.replace es el punto de commit: hasta entonces vale el par
+        snapshot + log anterior, después el nuevo.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        columns_path = os.path.join(self.path, self.COLUMNS_FILE)
+        tmp_path = columns_path + ".tmp"
+        previous_log = self._log_path()
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "embedding_dim": self.embedding_dim,
+                    "metric": self.metric,
+                    "generation": self._generation + 1,
+                    "vectors_file": self._vectors_file,
+                    "ids": self._ids,
+                    "documents": self._documents,
+                    "metadata": self._columns
+                },
+                f,
+                ensure_ascii=False
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        # Reemplazo atómico: un fallo a mitad no deja el fichero corrupto
+        os.replace(tmp_path, columns_path)
+
+        self._generation += 1
+        self._snapshot_bytes = os.path.getsize(columns_path)
+        self._log_bytes = 0
+        if os.path.exists(previous_log):
+            os.remove(previous_log)
+        self._remove_unreferenced_files()
+
+    def _remove_unreferenced_files(self, keep: Iterable[str] = ()):
+        """
+        Borra ficheros de vectores que ni el snapshot ni el log referencian
+        (matrices sustituidas por un delete o restos de una escritura sin commit).
+        """
+        if not os.path.isdir(self.path):
+            return
+        keep = set(keep) | {self._vectors_file}
+        for name in os.listdir(self.path):
+            if name.endswith(".npy") and name.startswith(("vectors", "upsert.")) and name not in keep:
+                os.remove(os.path.join(self.path, name))
+
+    def _write_durable(self, name: str, matrix: np.ndarray):
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, name), "wb") as f:
+            np.save(f, matrix)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _open_vectors(self, name: str):
+        """Abre (memmap) el fichero de vectores `name` y borra el anterior si cambia."""
+        previous = self._vectors_file
+        self._vectors = None
+        self._vectors_file = name
+        self._vectors = np.load(os.path.join(self.path, name), mmap_mode="r+")
+        if previous != name and os.path.exists(os.path.join(self.path, previous)):
+            os.remove(os.path.join(self.path, previous))
+
+    def _log_path(self) -> str:
+        return os.path.join(self.path, self.LOG_FILE.format(generation=self._generation))
+
+    def _ensure_capacity(self, rows: int):
+        """
+        Crece la matriz memory-mapped duplicando su capacidad (amortizado O(1)
+        por inserción en lugar de reescribir el .npy en cada paper).
+        """
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows <= capacity:
+            return
+
+        new_capacity = max(self.initial_capacity, capacity)
+        while new_capacity < rows:
+            new_capacity *= 2
+
+        self._resize(new_capacity, used=capacity)
+
+    def _resize(self, capacity: int, used: int):
+        """
+        Reescribe vectors.npy con la capacidad indicada copiando las `used`
+        primeras filas.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        vectors_path = os.path.join(self.path, self._vectors_file)
+        tmp_path = os.path.join(self.path, "vectors.tmp.npy")
+
+        resized = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self.embedding_dim)
+        )
+        if used and self._vectors is not None:
+            resized[:used] = self._vectors[:used]
+        resized.flush()
+        del resized
+
+        self._vectors = None
+        os.replace(tmp_path, vectors_path)
+        self._vectors = np.load(vectors_path, mmap_mode="r+")
+
+    def _read_vectors(self, rows: np.ndarray) -> np.ndarray:
+        """Filas float32 del memmap (rescoring del índice cuantizado)."""
+        return np.asarray(self._vectors[rows], dtype=np.float32)
+
+    def _check_dimension(self, dim: int):
+        if self.embedding_dim is not None and dim != self.embedding_dim:
+            raise ValueError(
+                f"Embedding dimension {dim} does not match collection "
+                f"'{self.collection_name}' dimension {self.embedding_dim}"
+            )
+
+    def _merge_results(self, merged: Dict[str, List], hits: List[tuple]):
+        rows = [row for row, _ in hits]
+        merged["ids"].append([self._ids[r] for r in rows])
+        if merged["documents"] is not None:
+            merged["documents"].append([self._documents[r] for r in rows])
+        if merged["metadatas"] is not None:
+            merged["metadatas"].append([self._row_metadata(r) for r in rows])
+        if merged["distances"] is not None:
+            merged["distances"].append([float(d) for _, d in hits])
+        if merged["embeddings"] is not None:
+            merged["embeddings"].append(np.asarray(self._vectors[np.asarray(rows, dtype=np.int64)], dtype=np.float32))
+
+    def _row_metadata(self, row: int) -> Dict[str, Any]:
+        return {
+            key: column[row]
+            for key, column in self._columns.items()
+            if column[row] is not None
+        }
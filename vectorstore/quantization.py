@@ -0,0 +1,367 @@
+import os
+from typing import List, Optional, Callable, Tuple, Sequence
+
+import numpy as np
+
+
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+
+# ==========================================
+# CODIFICACIÓN DE UN VECTOR (caché / disco)
+# ==========================================
+
+def encode_vector(vector: Sequence[float], dtype: str = "float32") -> bytes:
+    """
+    Serializa un vector. En int8 se antepone la escala (float32) del vector.
+    """
+    v = np.asarray(vector, dtype=np.float32)
+
+    if dtype == "int8":
+        scale = float(np.abs(v).max()) / 127.0 or 1.0
+        q = np.clip(np.rint(v / scale), -127, 127).astype(np.int8)
+        return np.float32(scale).tobytes() + q.tobytes()
+
+    if dtype in ("float32", "float16"):
+        return v.astype(dtype).tobytes()
+
+    raise ValueError(f"Unsupported dtype '{dtype}'. Use one of {SUPPORTED_DTYPES}")
+
+
+def decode_vector(blob: bytes, dtype: str = "float32") -> List[float]:
+    if dtype == "int8":
+        scale = np.frombuffer(blob[:4], dtype=np.float32)[0]
+        q = np.frombuffer(blob[4:], dtype=np.int8)
+        return (q.astype(np.float32) * scale).tolist()
+
+    if dtype in ("float32", "float16"):
+        return np.frombuffer(blob, dtype=dtype).astype(np.float32).tolist()
+
+    raise ValueError(f"Unsupported dtype '{dtype}'. Use one of {SUPPORTED_DTYPES}")
+
+
+# ==========================================
+# MATRIZ CUANTIZADA
+# ==========================================
+
+class QuantizedMatrix:
+    """
+    Matriz de embeddings en float16 o int8 con escala por vector.
+    float16 reduce memoria 2x; int8 reduce 4x (+4 bytes de escala por fila).
+
+    Ojo con la latencia: NumPy no tiene una ruta rápida float16 -> float32,
+    así que el scan en float16 es ~15x más lento que en float32 (int8 ~2x).
+    Para ahorrar RAM en el índice conviene int8 (ver bench_quantization.py).
+
+    Admite escrituras incrementales (set_rows / take): los buffers crecen
+    duplicando capacidad, como la matriz memory-mapped del backend numpy.
+    """
+
+    def __init__(self, data: np.ndarray, scales: Optional[np.ndarray], dtype: str):
+        self._data = data
+        self._scales = scales
+        self._size = data.shape[0]
+        self.dtype = dtype
+
+    @classmethod
+    def from_vectors(cls, vectors, dtype: str = "int8") -> "QuantizedMatrix":
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2:
+            raise ValueError("vectors must be a 2D array (n, dim)")
+        return cls(*cls._quantize(matrix, dtype), dtype)
+
+    @classmethod
+    def empty(cls, dim: int, dtype: str = "int8") -> "QuantizedMatrix":
+        return cls.from_vectors(np.empty((0, dim), dtype=np.float32), dtype)
+
+    @staticmethod
+    def _quantize(matrix: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        if dtype == "int8":
+            scales = np.abs(matrix).max(axis=1) / 127.0 if len(matrix) else np.empty(0, dtype=np.float32)
+            scales[scales == 0] = 1.0
+            data = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+            return data, scales.astype(np.float32)
+
+        if dtype in ("float32", "float16"):
+            return matrix.astype(dtype, copy=False), None
+
+        raise ValueError(f"Unsupported dtype '{dtype}'. Use one of {SUPPORTED_DTYPES}")
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._data[:self._size]
+
+    @property
+    def scales(self) -> Optional[np.ndarray]:
+        return None if self._scales is None else self._scales[:self._size]
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes + (self._scales.nbytes if self._scales is not None else 0)
+
+    def set_rows(self, rows: np.ndarray, vectors):
+        """Cuantiza `vectors` y los escribe en las filas `rows` (crece si hace falta)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return
+        data, scales = self._quantize(np.asarray(vectors, dtype=np.float32), self.dtype)
+
+        size = max(self._size, int(rows.max()) + 1)
+        self._data = grow_rows(self._data, size)
+        self._data[rows] = data
+        if self._scales is not None:
+            self._scales = grow_rows(self._scales, size)
+            self._scales[rows] = scales
+        self._size = size
+
+    def take(self, rows: np.ndarray):
+        """Se queda solo con `rows`, en ese orden (compactación tras un delete)."""
+        self._data = self.data[rows]
+        if self._scales is not None:
+            self._scales = self.scales[rows]
+        self._size = len(rows)
+
+    def dequantize(self, rows=None) -> np.ndarray:
+        data = self.data if rows is None else self.data[rows]
+        out = data.astype(np.float32)
+        if self.scales is not None:
+            scales = self.scales if rows is None else self.scales[rows]
+            out *= scales[:, None]
+        return out
+
+    def dot(self, queries: np.ndarray, rows: Optional[np.ndarray] = None, block_rows: int = 128) -> np.ndarray:
+        """
+        Productos punto aproximados (n_queries, n) contra todas las filas o
+        solo contra `rows`. La conversión a float32 se hace por bloques de
+        filas para no descuantizar la matriz entera; bloques pequeños (que
+        caben en caché) son ~4x más rápidos que bloques de miles de filas.
+        """
+        q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        data = self.data if rows is None else self.data[rows]
+
+        if self.dtype == "float32":
+            return q @ data.T
+
+        out = np.empty((q.shape[0], len(data)), dtype=np.float32)
+        for start in range(0, len(data), block_rows):
+            block = data[start:start + block_rows].astype(np.float32)
+            out[:, start:start + block_rows] = q @ block.T
+
+        if self.scales is not None:
+            out *= (self.scales if rows is None else self.scales[rows])[None, :]
+        return out
+
+
+def grow_rows(array: np.ndarray, rows: int) -> np.ndarray:
+    """
+    Devuelve `array` con capacidad para al menos `rows` filas, duplicando
+    (amortizado O(1) por fila añadida en lugar de copiar en cada escritura).
+    """
+    if rows <= array.shape[0]:
+        return array
+    capacity = max(1024, array.shape[0])
+    while capacity < rows:
+        capacity *= 2
+    grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[:array.shape[0]] = array
+    return grown
+
+
+# ==========================================
+# ÍNDICE CUANTIZADO CON RESCORING
+# ==========================================
+
+def exact_distances(query: np.ndarray, vectors: np.ndarray, metric: str = "cosine") -> np.ndarray:
+    """
+    Distancias exactas en float32 con la misma convención que Chroma:
+    cosine -> 1 - cos; l2 -> L2 al cuadrado; ip -> 1 - dot.
+    """
+    q = np.asarray(query, dtype=np.float32)
+    dots = vectors @ q
+
+    if metric == "cosine":
+        norms = np.linalg.norm(vectors, axis=1) * (np.linalg.norm(q) or 1.0)
+        norms[norms == 0] = 1.0
+        return 1.0 - dots / norms
+    if metric == "l2":
+        return (vectors * vectors).sum(axis=1) + float(q @ q) - 2.0 * dots
+    if metric == "ip":
+        return 1.0 - dots
+
+    raise ValueError(f"Unsupported metric '{metric}'")
+
+
+def top_k_smallest(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Índices de los k menores valores, ordenados (argpartition + sort parcial).
+    """
+    k = min(k, len(values))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    idx = np.argpartition(values, k - 1)[:k]
+    return idx[np.argsort(values[idx], kind="stable")]
+
+
+class QuantizedIndex:
+    """
+    Búsqueda exacta en dos fases:
+    1. Scoring aproximado sobre la matriz cuantizada (en RAM).
+    2. Rescoring en float32 de los `k * rescore_factor` mejores candidatos.
+
+    Los vectores float32 no viven en RAM: se leen de un .npy memory-mapped
+    (`full_precision_path`) o mediante `full_precision_loader(rows)`.
+    NumpyFlatVectorStore(quantization=...) lo usa con un loader sobre su
+    propio memmap de vectores y lo mantiene al día con update() / keep().
+    """
+
+    def __init__(
+        self,
+        dtype: str = "int8",
+        metric: str = "cosine",
+        rescore_factor: int = 4,
+        full_precision_path: Optional[str] = None,
+        full_precision_loader: Optional[Callable[[np.ndarray], np.ndarray]] = None
+    ):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype '{dtype}'. Use one of {SUPPORTED_DTYPES}")
+
+        self.dtype = dtype
+        self.metric = metric
+        self.rescore_factor = rescore_factor
+        self.full_precision_path = full_precision_path
+        self.full_precision_loader = full_precision_loader
+
+        self.matrix: Optional[QuantizedMatrix] = None
+        self._norms = np.empty(0, dtype=np.float32)
+        self._full = None
+
+    def build(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.matrix = QuantizedMatrix.from_vectors(vectors, self.dtype)
+        self._norms = np.linalg.norm(vectors, axis=1).astype(np.float32)
+
+        if self.full_precision_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.full_precision_path)), exist_ok=True)
+            np.save(self.full_precision_path, vectors)
+            self._full = np.load(self.full_precision_path, mmap_mode="r")
+        elif self.full_precision_loader is None:
+            # Sin almacenamiento externo mantenemos float32 en memoria
+            self._full = vectors
+
+        return self
+
+    # ==========================================
+    # ESCRITURAS INCREMENTALES (requieren full_precision_loader)
+    # ==========================================
+
+    def update(self, rows: np.ndarray, vectors):
+        """Escribe (o sobrescribe) las filas `rows`; el float32 lo guarda el dueño del loader."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.matrix is None:
+            self.matrix = QuantizedMatrix.empty(vectors.shape[1], self.dtype)
+        self.matrix.set_rows(rows, vectors)
+        self._norms = grow_rows(self._norms, len(self.matrix))
+        self._norms[np.asarray(rows, dtype=np.int64)] = np.linalg.norm(vectors, axis=1)
+
+    def keep(self, rows: np.ndarray):
+        """Compacta a las filas `rows` (mismo orden que la compactación del dueño)."""
+        if self.matrix is None:
+            return
+        self._norms = self.norms[rows]
+        self.matrix.take(rows)
+
+    def clear(self):
+        self.matrix = None
+        self._norms = np.empty(0, dtype=np.float32)
+
+    @property
+    def norms(self) -> np.ndarray:
+        return self._norms[:len(self.matrix) if self.matrix is not None else 0]
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria residente del índice (excluye el .npy memory-mapped)."""
+        if self.matrix is None:
+            return 0
+        resident = self.matrix.nbytes + self._norms.nbytes
+        if (
+            isinstance(self._full, np.ndarray)
+            and not isinstance(self._full, np.memmap)
+            and not np.shares_memory(self._full, self.matrix.data)
+        ):
+            resident += self._full.nbytes
+        return resident
+
+    # ==========================================
+    # BÚSQUEDA
+    # ==========================================
+
+    def search(self, query, k: int = 10, rescore: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Devuelve (índices de fila, distancias) de los k vecinos más cercanos.
+        """
+        return self.search_many(np.atleast_2d(np.asarray(query, dtype=np.float32)), k, rescore=rescore)[0]
+
+    def search_many(
+        self,
+        queries,
+        k: int = 10,
+        rows: Optional[np.ndarray] = None,
+        rescore: bool = True
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        (índices de fila, distancias) por consulta. Con `rows` solo se
+        consideran esas filas (filtro where / ids del vector store).
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if self.matrix is None or len(self.matrix) == 0 or (rows is not None and len(rows) == 0):
+            return [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in queries]
+
+        approx = self._approx_distances(queries, rows)
+        results = []
+        for q, row_distances in zip(queries, approx):
+            if not rescore or self.dtype == "float32":
+                best = top_k_smallest(row_distances, k)
+                results.append((best if rows is None else rows[best], row_distances[best]))
+                continue
+
+            candidates = top_k_smallest(row_distances, k * self.rescore_factor)
+            if rows is not None:
+                candidates = rows[candidates]
+            exact = exact_distances(q, self._load_full(candidates), self.metric)
+
+            order = top_k_smallest(exact, k)
+            results.append((candidates[order], exact[order]))
+        return results
+
+    # ==========================================
+    # INTERNAL METHODS
+    # ==========================================
+
+    def _approx_distances(self, queries: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        dots = self.matrix.dot(queries, rows)
+        norms = self.norms if rows is None else self.norms[rows]
+
+        if self.metric == "cosine":
+            query_norms = np.linalg.norm(queries, axis=1)
+            query_norms[query_norms == 0] = 1.0
+            denom = query_norms[:, None] * norms[None, :]
+            denom[denom == 0] = 1.0
+            return 1.0 - dots / denom
+        if self.metric == "l2":
+            return norms[None, :] ** 2 + (queries * queries).sum(axis=1)[:, None] - 2.0 * dots
+        return 1.0 - dots
+
+    def _load_full(self, rows: np.ndarray) -> np.ndarray:
+        # Lectura ordenada: acceso secuencial sobre el memmap
+        order = np.argsort(rows)
+        if self._full is not None:
+            source = self._full[rows[order]]
+        else:
+            source = self.full_precision_loader(rows[order])
+        out = np.empty((len(rows), source.shape[1]), dtype=np.float32)
+        out[order] = source
+        return out
@@ -0,0 +1,375 @@
+import os
+import re
+import json
+import logging
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Iterator
+
+from vectorstore.base_vector_store import BaseVectorStore, DEFAULT_INCLUDE
+
+
+class ShardedVectorStore(BaseVectorStore):
+    """
+    Una colección lógica repartida en shards físicos por un campo de metadata
+    (por defecto `root_collection`, la colección raíz de Zotero).
+
+    - Escritura: cada chunk va al shard de su valor de `shard_key`.
+    - Consulta: si el filtro fija `shard_key` ($eq / $in, también dentro de
+      $and) solo se consultan esos shards; si no, todos en paralelo. Los
+      top-k de cada shard se fusionan por distancia antes del re-ranking.
+
+    El registro valor -> colección física se guarda en
+    `<registry_directory>/<collection_name>.shards.json`.
+    """
+
+    DEFAULT_SHARD = "default"
+
+    def __init__(
+        self,
+        shard_factory: Callable[[str], BaseVectorStore],
+        collection_name: str = "academic_research",
+        registry_directory: str = "./chroma_db",
+        shard_key: str = "root_collection",
+        embedding_dim: Optional[int] = None,
+        space: str = "l2",
+        max_workers: int = 4
+    ):
+        self.collection_name = collection_name
+        self.shard_factory = shard_factory
+        self.shard_key = shard_key
+        self.persist_directory = registry_directory
+        self.registry_path = os.path.join(registry_directory, f"{collection_name}.shards.json")
+        self._embedding_dim = embedding_dim
+        self._space = space
+
+        logging.basicConfig(level=logging.INFO)
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shard-query")
+        # valor de shard_key -> nombre de la colección física
+        self._registry: Dict[str, str] = {}
+        self._shards: Dict[str, BaseVectorStore] = {}
+        self._load_registry()
+
+    @property
+    def embedding_dim(self) -> Optional[int]:
+        for shard in self._shards.values():
+            if shard.embedding_dim is not None:
+                return shard.embedding_dim
+        return self._embedding_dim
+
+    @property
+    def space(self) -> str:
+        # Todos los shards comparten espacio: la fusión compara distancias entre ellos
+        for shard in self._shards.values():
+            return shard.space
+        return self._space
+
+    @property
+    def background_writes(self) -> bool:
+        return any(getattr(s, "background_writes", False) for s in self._shards.values())
+
+    def shard_names(self) -> Dict[str, str]:
+        """Valor de shard_key -> colección física."""
+        return dict(self._registry)
+
+    # ==========================================
+    # INSERT / UPDATE DOCUMENTS
+    # ==========================================
+
+    def add_documents(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+        ids: Optional[List[str]] = None
+    ):
+        if not (len(texts) == len(embeddings) == len(metadatas)):
+            raise ValueError("texts, embeddings y metadatas deben tener el mismo tamaño")
+
+        for shard, rows in self._group_by_shard(metadatas).items():
+            shard.add_documents(
+                texts=[texts[i] for i in rows],
+                embeddings=[embeddings[i] for i in rows],
+                metadatas=[metadatas[i] for i in rows],
+                ids=[ids[i] for i in rows] if ids is not None else None
+            )
+
+    def replace_document(
+        self,
+        doc_id: str,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str]
+    ) -> int:
+        """
+        Como BaseVectorStore.replace_document, pero por shard: si el paper
+        cambia de colección raíz sus chunks antiguos salen del shard anterior
+        aunque conserven el mismo ID.
+        """
+        previous = {
+            name: set(shard.get_ids({"doc_id": doc_id}))
+            for name, shard in self._shards.items()
+        }
+        placed = {name: set() for name in self._shards}
+
+        for shard, rows in self._group_by_shard(metadatas).items():
+            shard.add_documents(
+                texts=[texts[i] for i in rows],
+                embeddings=[embeddings[i] for i in rows],
+                metadatas=[metadatas[i] for i in rows],
+                ids=[ids[i] for i in rows]
+            )
+            placed.setdefault(shard.collection_name, set()).update(ids[i] for i in rows)
+
+        stale_count = 0
+        for name, old_ids in previous.items():
+            stale = sorted(old_ids - placed.get(name, set()))
+            self._shards[name].delete(ids=stale)
+            stale_count += len(stale)
+        return stale_count
+
+    # ==========================================
+    # QUERY (FAN-OUT)
+    # ==========================================
+
+    def query(
+        self,
+        query_embedding: List[float],
+        n_results: int = 10,
+        where_filter: Dict[str, Any] = None,
+        include: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None
+    ) -> Dict[str, List]:
+        return self.query_many([query_embedding], n_results=n_results, where_filter=where_filter, include=include, ids=ids)
+
+    def query_many(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 10,
+        where_filter: Dict[str, Any] = None,
+        include: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None
+    ) -> Dict[str, List]:
+        """
+        Consulta en paralelo los shards relevantes y fusiona, por consulta,
+        los candidatos de todos ellos quedándose con los n_results más cercanos.
+        """
+        fields = list(DEFAULT_INCLUDE if include is None else include)
+        # La fusión necesita las distancias aunque no se hayan pedido
+        shard_include = fields if "distances" in fields else fields + ["distances"]
+
+        merged = {"ids": [], "documents": None, "metadatas": None, "distances": None, "embeddings": None}
+        for key in fields:
+            merged[key] = []
+
+        shards = self._target_shards(where_filter)
+        if len(query_embeddings) == 0 or not shards:
+            for _ in range(len(query_embeddings)):
+                for key in ["ids", *fields]:
+                    merged[key].append([])
+            return merged
+
+        futures = [
+            self._executor.submit(
+                shard.query_many, query_embeddings,
+                n_results=n_results, where_filter=where_filter, include=shard_include, ids=ids
+            )
+            for shard in shards
+        ]
+        partials = [f.result() for f in futures]
+
+        for q in range(len(query_embeddings)):
+            candidates = []
+            for partial in partials:
+                for c, distance in enumerate(partial["distances"][q]):
+                    candidates.append((distance, partial, c))
+            # sort estable: a igual distancia se respeta el orden de los shards
+            candidates.sort(key=lambda item: item[0])
+            top = candidates[:n_results]
+
+            merged["ids"].append([partial["ids"][q][c] for _, partial, c in top])
+            for key in fields:
+                merged[key].append([partial[key][q][c] for _, partial, c in top])
+
+        return merged
+
+    def get_documents(self, ids: List[str]) -> Dict[str, str]:
+        return self._fan_out_dict("get_documents", ids)
+
+    def get_metadatas(self, ids: List[str], where_filter: Dict[str, Any] = None) -> Dict[str, Dict[str, Any]]:
+        if not ids:
+            return {}
+        futures = [
+            self._executor.submit(shard.get_metadatas, ids, where_filter)
+            for shard in self._target_shards(where_filter)
+        ]
+        found = {}
+        for future in futures:
+            found.update(future.result())
+        return found
+
+    def get_embeddings(self, ids: List[str]) -> Dict[str, List[float]]:
+        return self._fan_out_dict("get_embeddings", ids)
+
+    def iter_batches(self, batch_size: int = 2048) -> Iterator[Dict[str, Any]]:
+        for shard in list(self._shards.values()):
+            yield from shard.iter_batches(batch_size=batch_size)
+
+    # ==========================================
+    # DELETE / MAINTENANCE
+    # ==========================================
+
+    def get_ids(self, where_filter: Dict[str, Any] = None) -> List[str]:
+        ids = []
+        for shard in self._target_shards(where_filter):
+            ids.extend(shard.get_ids(where_filter))
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, where_filter: Dict[str, Any] = None):
+        if ids is not None and len(ids) == 0:
+            return
+        if ids is None and not where_filter:
+            raise ValueError("delete requires ids or where_filter")
+
+        shards = list(self._shards.values()) if ids is not None else self._target_shards(where_filter)
+        for shard in shards:
+            shard.delete(ids=ids, where_filter=where_filter)
+
+    def doc_id_counts(self) -> Dict[str, int]:
+        counts = {}
+        for shard in self._shards.values():
+            for doc_id, n in shard.doc_id_counts().items():
+                counts[doc_id] = counts.get(doc_id, 0) + n
+        return counts
+
+    def count(self) -> int:
+        return sum(shard.count() for shard in self._shards.values())
+
+    def compact(self) -> Dict[str, Any]:
+        return {"shards": {name: shard.compact() for name, shard in self._shards.items()}}
+
+    def delete_collection(self):
+        for shard in self._shards.values():
+            shard.delete_collection()
+        with self._lock:
+            self._shards.clear()
+            self._registry.clear()
+            if os.path.exists(self.registry_path):
+                os.remove(self.registry_path)
+
+    def flush(self):
+        for shard in self._shards.values():
+            shard.flush()
+
+    def close(self):
+        for shard in self._shards.values():
+            shard.close()
+        self._executor.shutdown(wait=True)
+
+    # ==========================================
+    # ROUTING
+    # ==========================================
+
+    def _group_by_shard(self, metadatas: List[Dict[str, Any]]) -> Dict[BaseVectorStore, List[int]]:
+        groups: Dict[str, List[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            groups.setdefault(str(metadata.get(self.shard_key) or ""), []).append(i)
+        return {self._shard_for(value, create=True): rows for value, rows in groups.items()}
+
+    def _target_shards(self, where_filter: Optional[Dict[str, Any]]) -> List[BaseVectorStore]:
+        values = self._filter_values(where_filter) if where_filter else None
+        if values is None:
+            return list(self._shards.values())
+
+        shards = []
+        for value in values:
+            shard = self._shard_for(str(value or ""), create=False)
+            if shard is not None and shard not in shards:
+                shards.append(shard)
+        return shards
+
+    def _filter_values(self, where: Dict[str, Any]) -> Optional[set]:
+        """
+        Valores de shard_key que admite el filtro, o None si no lo acota.
+        """
+        if "$and" in where:
+            bounds = [self._filter_values(clause) for clause in where["$and"]]
+            bounds = [b for b in bounds if b is not None]
+            return set.intersection(*bounds) if bounds else None
+
+        if "$or" in where:
+            bounds = [self._filter_values(clause) for clause in where["$or"]]
+            if any(b is None for b in bounds):
+                return None
+            return set().union(*bounds)
+
+        condition = where.get(self.shard_key)
+        if condition is None:
+            return None
+        if not isinstance(condition, dict):
+            return {condition}
+        if "$eq" in condition:
+            return {condition["$eq"]}
+        if "$in" in condition:
+            return set(condition["$in"])
+        return None
+
+    def _shard_for(self, value: str, create: bool) -> Optional[BaseVectorStore]:
+        with self._lock:
+            name = self._registry.get(value)
+            if name is None:
+                if not create:
+                    return None
+                name = self._shard_collection_name(value)
+                self._registry[value] = name
+                self._save_registry()
+
+            if name not in self._shards:
+                self._shards[name] = self.shard_factory(name)
+            return self._shards[name]
+
+    def _shard_collection_name(self, value: str) -> str:
+        # Nombres válidos para Chroma: [a-zA-Z0-9._-], empezando y acabando en alfanumérico
+        ascii_value = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode()
+        slug = re.sub(r"[^a-zA-Z0-9_-]+", "_", ascii_value).strip("_-").lower() or self.DEFAULT_SHARD
+        return f"{self.collection_name}__{slug}"
+
+    def _fan_out_dict(self, method: str, ids: List[str]) -> Dict[str, Any]:
+        if not ids:
+            return {}
+        futures = [self._executor.submit(getattr(shard, method), ids) for shard in self._shards.values()]
+        found = {}
+        for future in futures:
+            found.update(future.result())
+        return found
+
+    # ==========================================
+    # REGISTRY
+    # ==========================================
+
+    def _load_registry(self):
+        if not os.path.exists(self.registry_path):
+            return
+        with open(self.registry_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if data.get("shard_key") != self.shard_key:
+            raise ValueError(
+                f"Collection '{self.collection_name}' is sharded by '{data.get('shard_key')}', "
+                f"got shard_key='{self.shard_key}'"
+            )
+        self._registry = data.get("shards", {})
+        for name in dict.fromkeys(self._registry.values()):
+            self._shards[name] = self.shard_factory(name)
+
+    def _save_registry(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.registry_path)), exist_ok=True)
+        tmp_path = f"{self.registry_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"shard_key": self.shard_key, "shards": self._registry}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.registry_path)
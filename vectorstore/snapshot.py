@@ -0,0 +1,152 @@
+import os
+import json
+import time
+from typing import Dict, Any, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from vectorstore.base_vector_store import BaseVectorStore
+
+
+# Versión del formato de snapshot (se comprueba al importar)
+SNAPSHOT_FORMAT_VERSION = "1"
+
+
+def snapshot_schema(embedding_dim: int, collection_name: str = "") -> pa.Schema:
+    """
+    Esquema del snapshot: embeddings como lista de tamaño fijo float32
+    (se leen de vuelta como una matriz (n, dim) sin copias) y la metadata
+    serializada en JSON para admitir cualquier conjunto de claves.
+    """
+    return pa.schema(
+        [
+            pa.field("id", pa.string(), nullable=False),
+            pa.field("embedding", pa.list_(pa.float32(), embedding_dim), nullable=False),
+            pa.field("document", pa.string()),
+            pa.field("metadata", pa.string())
+        ],
+        metadata={
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "collection_name": collection_name,
+            "embedding_dim": str(embedding_dim)
+        }
+    )
+
+
+def export_snapshot(
+    vector_store: BaseVectorStore,
+    path: str,
+    row_group_size: int = 2048,
+    compression: str = "zstd"
+) -> Dict[str, Any]:
+    """
+    Vuelca la colección a un fichero Parquet, un row group por lote leído
+    del vector store (memoria acotada a un lote). El fichero se escribe en
+    un temporal y se renombra al terminar: nunca queda un snapshot a medias.
+    """
+    start = time.perf_counter()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+
+    writer: Optional[pq.ParquetWriter] = None
+    schema: Optional[pa.Schema] = None
+    rows = 0
+
+    try:
+        for batch in vector_store.iter_batches(batch_size=row_group_size):
+            embeddings = batch["embeddings"]
+            if writer is None:
+                schema = snapshot_schema(embeddings.shape[1], vector_store.collection_name)
+                writer = pq.ParquetWriter(tmp_path, schema, compression=compression)
+
+            table = pa.Table.from_arrays(
+                [
+                    pa.array(batch["ids"], type=pa.string()),
+                    pa.FixedSizeListArray.from_arrays(
+                        pa.array(embeddings.ravel(), type=pa.float32()), embeddings.shape[1]
+                    ),
+                    pa.array(batch["documents"], type=pa.string()),
+                    pa.array([json.dumps(m, ensure_ascii=False) for m in batch["metadatas"]], type=pa.string())
+                ],
+                schema=schema
+            )
+            writer.write_table(table, row_group_size=row_group_size)
+            rows += table.num_rows
+
+        if writer is None:
+            # Colección vacía: snapshot válido sin filas
+            schema = snapshot_schema(vector_store.embedding_dim or 0, vector_store.collection_name)
+            writer = pq.ParquetWriter(tmp_path, schema, compression=compression)
+        writer.close()
+        writer = None
+        os.replace(tmp_path, path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return {
+        "rows": rows,
+        "embedding_dim": int(schema.metadata[b"embedding_dim"]),
+        "bytes": os.path.getsize(path),
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+
+def import_snapshot(
+    path: str,
+    vector_store: BaseVectorStore,
+    batch_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Carga un snapshot en el vector store con upserts paginados (un lote por
+    row group salvo que se indique batch_size). No llama al embedder: los
+    vectores se cargan tal cual se exportaron.
+    """
+    start = time.perf_counter()
+    parquet_file = pq.ParquetFile(path)
+    schema_metadata = parquet_file.schema_arrow.metadata or {}
+
+    version = schema_metadata.get(b"format_version", b"").decode()
+    if version != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version '{version}' (expected {SNAPSHOT_FORMAT_VERSION})")
+
+    embedding_dim = int(schema_metadata[b"embedding_dim"])
+    if vector_store.embedding_dim is not None and parquet_file.metadata.num_rows and embedding_dim != vector_store.embedding_dim:
+        raise ValueError(
+            f"Snapshot stores {embedding_dim}-dim embeddings but collection "
+            f"'{vector_store.collection_name}' expects {vector_store.embedding_dim}"
+        )
+
+    if batch_size is None:
+        batch_size = max(
+            (parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.num_row_groups)),
+            default=2048
+        )
+
+    rows = 0
+    for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+        # flatten() respeta el offset del lote; reshape sin copiar
+        embeddings = record_batch.column("embedding").flatten().to_numpy(zero_copy_only=False)
+        embeddings = embeddings.reshape(-1, embedding_dim).astype(np.float32, copy=False)
+
+        vector_store.add_documents(
+            texts=record_batch.column("document").to_pylist(),
+            embeddings=embeddings,
+            metadatas=[json.loads(m) if m else {} for m in record_batch.column("metadata").to_pylist()],
+            ids=record_batch.column("id").to_pylist()
+        )
+        rows += record_batch.num_rows
+
+    vector_store.flush()
+
+    return {
+        "rows": rows,
+        "embedding_dim": embedding_dim,
+        "source_collection": schema_metadata.get(b"collection_name", b"").decode(),
+        "seconds": round(time.perf_counter() - start, 3)
+    }